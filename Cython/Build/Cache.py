@@ -0,0 +1,287 @@
+"""
+Storage backends for the compilation cache of cythonize().
+
+Generated C files are stored under a key that is derived from the
+fingerprint of all their inputs (see DependencyTree.transitive_fingerprint),
+so entries never need to be validated, only found or evicted.
+
+The 'cache' option of cythonize() selects the backend:
+
+- a directory path uses a DirectoryCache, which keeps an SQLite index of
+  sizes, access times and hit counts next to the entries, so that lookups
+  and evictions never need to scan the directory.  Entries are written
+  atomically, so several builders can share one cache directory.
+
+- an 'http://' or 'https://' URL uses an HTTPCache, which GETs and PUTs
+  entries from/to a plain HTTP server.  Eviction is left to the server.
+
+- an instance of a CacheBackend subclass is used as is.  It must be
+  picklable to be usable from parallel builds.
+"""
+
+from __future__ import absolute_import
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+try:
+    import gzip
+    gzip_open = gzip.open
+    gzip_ext = '.gz'
+except ImportError:
+    gzip = None
+    gzip_open = open
+    gzip_ext = ''
+
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
+
+try:
+    from urllib2 import urlopen, Request, HTTPError, URLError
+except ImportError:
+    from urllib.request import urlopen, Request
+    from urllib.error import HTTPError, URLError
+
+from ..Utils import cached_function, safe_makedirs
+
+default_cache_size = 1024 * 1024 * 100
+
+
+# connections of the parent process, see DirectoryCache._get_index()
+_inherited_connections = []
+
+
+def replace_file(source, dest):
+    try:
+        os.replace(source, dest)
+    except AttributeError:
+        # Py<3.3
+        if sys.platform == 'win32' and os.path.exists(dest):
+            os.remove(dest)
+        os.rename(source, dest)
+
+
+class CacheBackend(object):
+    """
+    Interface of the cythonize() compilation cache.
+    """
+
+    def load(self, key, c_file):
+        """
+        Restore the entry 'key' into 'c_file'.  Returns True on a cache hit.
+        """
+        raise NotImplementedError()
+
+    def store(self, key, c_file):
+        """
+        Store the content of 'c_file' under 'key'.
+        """
+        raise NotImplementedError()
+
+    def cleanup(self, target_size, ratio=.85):
+        """
+        Shrink the cache to 'target_size * ratio' bytes if it has grown
+        beyond 'target_size'.
+        """
+        pass
+
+
+class DirectoryCache(CacheBackend):
+    """
+    Stores gzipped entries as files in a local (or shared) directory.
+
+    The index records the size, last access time and number of hits of
+    each entry.  Eviction removes the least recently used entries
+    ('lru', the default) or the least frequently used ones ('lfu').
+    If the sqlite3 module is not available, cleanup falls back to
+    scanning the directory.
+    """
+
+    index_file = 'index.sqlite'
+
+    def __init__(self, path, policy='lru'):
+        if policy not in ('lru', 'lfu'):
+            raise ValueError("Unknown cache eviction policy '%s'" % policy)
+        self.path = path
+        self.policy = policy
+        self._index = None
+        self._index_pid = None
+
+    def __getstate__(self):
+        # database connections cannot be shared between processes
+        state = self.__dict__.copy()
+        state['_index'] = state['_index_pid'] = None
+        return state
+
+    def _entry_path(self, key):
+        return os.path.join(self.path, key + gzip_ext)
+
+    def _get_index(self):
+        if self._index is not None and self._index_pid != os.getpid():
+            # Inherited through fork(), e.g. by the workers of a parallel
+            # cythonize().  SQLite connections must not be used (or closed)
+            # in a forked process, so keep it alive and open a new one.
+            _inherited_connections.append(self._index)
+            self._index = None
+        if self._index is None and sqlite3 is not None:
+            safe_makedirs(self.path)
+            index = sqlite3.connect(os.path.join(self.path, self.index_file), timeout=60)
+            with index:
+                index.execute(
+                    "CREATE TABLE IF NOT EXISTS entries ("
+                    "key TEXT PRIMARY KEY, size INTEGER, atime REAL, hits INTEGER)")
+            self._index = index
+            self._index_pid = os.getpid()
+        return self._index
+
+    def _update_index(self, sql, args):
+        index = self._get_index()
+        if index is not None:
+            with index:
+                index.execute(sql, args)
+
+    def load(self, key, c_file):
+        path = self._entry_path(key)
+        try:
+            g = gzip_open(path, 'rb')
+        except (IOError, OSError):
+            # possibly evicted by another builder
+            self._update_index("DELETE FROM entries WHERE key = ?", (key,))
+            return False
+        try:
+            with open(c_file, 'wb') as f:
+                shutil.copyfileobj(g, f)
+        finally:
+            g.close()
+        self._update_index(
+            "UPDATE entries SET atime = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+        return True
+
+    def store(self, key, c_file):
+        safe_makedirs(self.path)
+        fd, temp_path = tempfile.mkstemp(prefix='.tmp-', dir=self.path)
+        os.close(fd)
+        try:
+            with open(c_file, 'rb') as f:
+                g = gzip_open(temp_path, 'wb')
+                try:
+                    shutil.copyfileobj(f, g)
+                finally:
+                    g.close()
+            size = os.path.getsize(temp_path)
+            replace_file(temp_path, self._entry_path(key))
+        except:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._update_index(
+            "INSERT OR REPLACE INTO entries (key, size, atime, hits) VALUES (?, ?, ?, "
+            "COALESCE((SELECT hits FROM entries WHERE key = ?), 0))",
+            (key, size, time.time(), key))
+
+    def cleanup(self, target_size, ratio=.85):
+        index = self._get_index()
+        if index is None:
+            self._cleanup_by_scan(target_size, ratio)
+            return
+        total_size = index.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total_size < target_size:
+            return
+        if self.policy == 'lfu':
+            order = "hits, atime"
+        else:
+            order = "atime"
+        evicted = []
+        for key, size in index.execute("SELECT key, size FROM entries ORDER BY " + order).fetchall():
+            try:
+                os.remove(self._entry_path(key))
+            except OSError:
+                pass
+            evicted.append((key,))
+            total_size -= size
+            if total_size < target_size * ratio:
+                break
+        with index:
+            index.executemany("DELETE FROM entries WHERE key = ?", evicted)
+
+    def _cleanup_by_scan(self, target_size, ratio):
+        total_size = 0
+        all = []
+        for file in os.listdir(self.path):
+            path = os.path.join(self.path, file)
+            s = os.stat(path)
+            total_size += s.st_size
+            all.append((s.st_atime, s.st_size, path))
+        if total_size > target_size:
+            for time, size, file in sorted(all):
+                os.unlink(file)
+                total_size -= size
+                if total_size < target_size * ratio:
+                    break
+
+
+class HTTPCache(CacheBackend):
+    """
+    Keeps the entries on an HTTP server that supports GET and PUT
+    requests, e.g. a shared cache for a fleet of build machines.
+    Failing requests are treated as cache misses.
+    """
+
+    def __init__(self, url, timeout=30):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def _entry_url(self, key):
+        return '%s/%s%s' % (self.url, key, gzip_ext)
+
+    def load(self, key, c_file):
+        try:
+            response = urlopen(self._entry_url(key), timeout=self.timeout)
+            try:
+                data = response.read()
+            finally:
+                response.close()
+        except (HTTPError, URLError, IOError):
+            return False
+        if gzip is not None:
+            data = gzip.GzipFile(fileobj=io.BytesIO(data), mode='rb').read()
+        with open(c_file, 'wb') as f:
+            f.write(data)
+        return True
+
+    def store(self, key, c_file):
+        with open(c_file, 'rb') as f:
+            data = f.read()
+        if gzip is not None:
+            buffer = io.BytesIO()
+            g = gzip.GzipFile(fileobj=buffer, mode='wb')
+            try:
+                g.write(data)
+            finally:
+                g.close()
+            data = buffer.getvalue()
+        request = Request(self._entry_url(key), data=data)
+        request.get_method = lambda: 'PUT'
+        request.add_header('Content-Type', 'application/octet-stream')
+        try:
+            urlopen(request, timeout=self.timeout).close()
+        except (HTTPError, URLError, IOError):
+            pass
+
+
+@cached_function
+def open_cache(cache):
+    """
+    Return the CacheBackend for the value of the 'cache' option.
+    """
+    if isinstance(cache, CacheBackend):
+        return cache
+    if cache.startswith(('http://', 'https://')):
+        return HTTPCache(cache)
+    return DirectoryCache(cache)
@@ -4,18 +4,14 @@ import cython
 from .. import __version__
 
 import collections
+import copy
 import re, os, sys, time
 from glob import iglob
 
 try:
-    import gzip
-    gzip_open = gzip.open
-    gzip_ext = '.gz'
+    import cPickle as pickle
 except ImportError:
-    gzip_open = open
-    gzip_ext = ''
-import shutil
-import subprocess
+    import pickle
 
 try:
     import hashlib
@@ -49,6 +45,7 @@ from .. import Utils
 from ..Utils import (cached_function, cached_method, path_exists,
     safe_makedirs, copy_file_to_dir_if_newer, is_package_dir)
 from ..Compiler.Main import Context, CompilationOptions, default_options
+from .Cache import open_cache, default_cache_size
 
 join_path = cached_function(os.path.join)
 copy_once_if_newer = cached_function(copy_file_to_dir_if_newer)
@@ -452,16 +449,94 @@ def parse_dependencies(source_filename):
     return cimports, includes, externs, distutils_info
 
 
+class DependencyCache(object):
+    """
+    Persists the results of parse_dependencies() across builds.
+
+    Entries are reused as long as the modification time and size of their
+    source file are unchanged, or if the content hash still matches after
+    a change of the modification time (e.g. after a fresh checkout).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}  # filename -> (mtime, size, hash, dependencies)
+        self.compile_times = {}  # filename -> seconds
+        self.results = {}
+        self.modified = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                version, entries, compile_times = pickle.load(f)
+        except Exception:
+            # missing, unreadable or written by another Python version
+            return
+        if version == __version__:
+            self.entries = entries
+            self.compile_times = compile_times
+
+    def record_compile_time(self, source_filename, seconds):
+        self.compile_times[os.path.normpath(source_filename)] = seconds
+        self.modified = True
+
+    def save(self):
+        if not self.modified:
+            return
+        safe_makedirs(os.path.dirname(os.path.abspath(self.path)))
+        temp_path = '%s.%d.tmp' % (self.path, os.getpid())
+        with open(temp_path, 'wb') as f:
+            pickle.dump((__version__, self.entries, self.compile_times), f, 2)
+        if os.path.exists(self.path) and sys.platform == 'win32':
+            os.remove(self.path)
+        os.rename(temp_path, self.path)
+        self.modified = False
+
+    def parse_dependencies(self, source_filename):
+        try:
+            return self.results[source_filename]
+        except KeyError:
+            pass
+        try:
+            st = os.stat(source_filename)
+        except OSError:
+            # let parse_dependencies() report the error
+            return parse_dependencies(source_filename)
+        entry = self.entries.get(source_filename)
+        if entry is not None:
+            mtime, size, hash, dependencies = entry
+            if (mtime, size) != (st.st_mtime, st.st_size):
+                if size == st.st_size and hash == file_hash(source_filename):
+                    self.entries[source_filename] = (st.st_mtime, size, hash, dependencies)
+                    self.modified = True
+                else:
+                    entry = None
+        if entry is None:
+            dependencies = parse_dependencies(source_filename)
+            # the DistutilsInfo gets modified by the DependencyTree
+            self.entries[source_filename] = (
+                st.st_mtime, st.st_size, file_hash(source_filename), copy.deepcopy(dependencies))
+            self.modified = True
+        else:
+            dependencies = copy.deepcopy(dependencies)
+        self.results[source_filename] = dependencies
+        return dependencies
+
+
 class DependencyTree(object):
 
-    def __init__(self, context, quiet=False):
+    def __init__(self, context, quiet=False, dependency_cache=None):
         self.context = context
         self.quiet = quiet
+        self.dependency_cache = dependency_cache
         self._transitive_cache = {}
 
     def parse_dependencies(self, source_filename):
         if path_exists(source_filename):
             source_filename = os.path.normpath(source_filename)
+        if self.dependency_cache is not None:
+            return self.dependency_cache.parse_dependencies(source_filename)
         return parse_dependencies(source_filename)
 
     @cached_method
@@ -628,18 +703,28 @@ class DependencyTree(object):
 
 _dep_tree = None
 
-def create_dependency_tree(ctx=None, quiet=False):
+def create_dependency_tree(ctx=None, quiet=False, dependency_cache=None):
     global _dep_tree
     if _dep_tree is None:
         if ctx is None:
             ctx = Context(["."], CompilationOptions(default_options))
         _dep_tree = DependencyTree(ctx, quiet=quiet)
+    current_cache = _dep_tree.dependency_cache
+    if dependency_cache is not None and (
+            current_cache is None or
+            os.path.abspath(current_cache.path) != os.path.abspath(dependency_cache)):
+        # e.g. cythonize() with another build_dir
+        if current_cache is not None:
+            current_cache.save()
+            # the tree caches what it read, start over to fill the new cache
+            _dep_tree = DependencyTree(_dep_tree.context, quiet=_dep_tree.quiet)
+        _dep_tree.dependency_cache = DependencyCache(dependency_cache)
     return _dep_tree
 
 
 # This may be useful for advanced users?
 def create_extension_list(patterns, exclude=None, ctx=None, aliases=None, quiet=False, language=None,
-                          exclude_failures=False):
+                          exclude_failures=False, dependency_cache=None):
     if language is not None:
         print('Please put "# distutils: language=%s" in your .pyx or .pxd file(s)' % language)
     if exclude is None:
@@ -650,7 +735,7 @@ def create_extension_list(patterns, exclude=None, ctx=None, aliases=None, quiet=
         patterns = [patterns]
     explicit_modules = set([m.name for m in patterns if isinstance(m, Extension)])
     seen = set()
-    deps = create_dependency_tree(ctx, quiet=quiet)
+    deps = create_dependency_tree(ctx, quiet=quiet, dependency_cache=dependency_cache)
     to_exclude = set()
     if not isinstance(exclude, list):
         exclude = [exclude]
@@ -770,7 +855,7 @@ def create_extension_list(patterns, exclude=None, ctx=None, aliases=None, quiet=
 
 # This is the user-exposed entry point.
 def cythonize(module_list, exclude=None, nthreads=0, aliases=None, quiet=False, force=False, language=None,
-              exclude_failures=False, **options):
+              exclude_failures=False, dependency_cache=None, show_timings=False, **options):
     """
     Compile a set of source modules into C/C++ files and return a list of distutils
     Extension objects for them.
@@ -788,7 +873,37 @@ def cythonize(module_list, exclude=None, nthreads=0, aliases=None, quiet=False,
     into cythonize() will not be changed.
 
     For parallel compilation, set the 'nthreads' option to the number of
-    concurrent builds.
+    concurrent builds.  The modules that took longest to compile in the
+    previous run (as recorded in the 'dependency_cache', see below) or,
+    lacking that, the largest ones are started first.  Pass
+    'show_timings=True' to print the time that each module took.
+
+    To reuse generated C files across builds, pass a directory as 'cache'
+    option (or True for ~/.cycache).  Its size is kept below 'cache_size'
+    bytes by evicting the least recently used entries.  An 'http://' URL
+    shares the cache through an HTTP server instead, see Cython.Build.Cache.
+
+    The cimports, includes and distutils settings that are found in the
+    source files are remembered in the file 'dependency_cache' (by default
+    in the 'build_dir', if one is used), so that unchanged files do not
+    need to be scanned again on the next run.  Pass False to disable this.
+
+    Passing 'cache_pxd_trees=True' keeps the parse trees of cimported .pxd
+    files in each (worker) process and reuses them for all further modules
+    that it compiles, as long as the .pxd files do not change.
+
+    Passing a file name as 'profile_compiler' option writes the time and
+    memory that each compiler phase and .pxd file took in all compiled
+    modules to that file (as JSON in the Chrome trace event format, with
+    a summary by phase, .pxd file and module).
+
+    Passing a fully qualified module name as 'shared_utility_module' option
+    (e.g. 'mypackage._cython_runtime') generates that module, which contains
+    the Cython function type, the generator and coroutine types and other
+    shared utility code, and adds it to the returned Extensions.  All other
+    modules import this code from it instead of including their own copy,
+    which makes them smaller and faster to import.  The module must be built
+    and installed together with them.
 
     For a broad 'try to compile' mode that ignores compilation failures and
     simply excludes the failed extensions, pass 'exclude_failures=True'. Note
@@ -805,10 +920,19 @@ def cythonize(module_list, exclude=None, nthreads=0, aliases=None, quiet=False,
         if options.get('cache'):
             raise NotImplementedError("common_utility_include_dir does not yet work with caching")
         safe_makedirs(options['common_utility_include_dir'])
+    profile_report = options.get('profile_compiler')
+    if profile_report:
+        # collect the profiles of all modules (and worker processes) and write them below
+        options['profile_compiler'] = True
     c_options = CompilationOptions(**options)
     cpp_options = CompilationOptions(**options); cpp_options.cplus = True
     ctx = c_options.create_context()
     options = c_options
+    build_dir = getattr(options, 'build_dir', None)
+    if dependency_cache is None and build_dir:
+        dependency_cache = os.path.join(build_dir, 'cython_dependencies.cache')
+    elif dependency_cache is False:
+        dependency_cache = None
     module_list, module_metadata = create_extension_list(
         module_list,
         exclude=exclude,
@@ -816,9 +940,9 @@ def cythonize(module_list, exclude=None, nthreads=0, aliases=None, quiet=False,
         quiet=quiet,
         exclude_failures=exclude_failures,
         language=language,
-        aliases=aliases)
+        aliases=aliases,
+        dependency_cache=dependency_cache)
     deps = create_dependency_tree(ctx, quiet=quiet)
-    build_dir = getattr(options, 'build_dir', None)
 
     modules_by_cfile = {}
     to_compile = []
@@ -874,6 +998,8 @@ def cythonize(module_list, exclude=None, nthreads=0, aliases=None, quiet=False,
                             print("Compiling %s because it depends on %s." % (source, dep))
                     if not force and options.cache:
                         extra = m.language
+                        if options.shared_utility_module:
+                            extra = '%s %s' % (extra, options.shared_utility_module)
                         fingerprint = deps.transitive_fingerprint(source, extra)
                     else:
                         fingerprint = None
@@ -890,20 +1016,28 @@ def cythonize(module_list, exclude=None, nthreads=0, aliases=None, quiet=False,
                     copy_to_build_dir(source)
         m.sources = new_sources
 
-    if options.cache:
-        if not os.path.exists(options.cache):
-            os.makedirs(options.cache)
-    to_compile.sort()
+    if deps.dependency_cache is not None:
+        deps.dependency_cache.save()
+
+    N = len(to_compile)
+    if N <= 1:
+        nthreads = 0
+    if nthreads:
+        # Start the longest running compilations first to keep all
+        # processes busy until the end.
+        estimated_times = estimate_compile_times(
+            [args[1] for args in to_compile], deps.dependency_cache)
+        to_compile.sort(key=lambda args: (-estimated_times[args[1]],) + args[:2])
+    else:
+        to_compile.sort()
     # Drop "priority" component of "to_compile" entries and add a
     # simple progress indicator.
-    N = len(to_compile)
     progress_fmt = "[{0:%d}/{1}] " % len(str(N))
     for i in range(N):
         progress = progress_fmt.format(i+1, N)
         to_compile[i] = to_compile[i][1:] + (progress,)
 
-    if N <= 1:
-        nthreads = 0
+    compile_times = []
     if nthreads:
         # Requires multiprocessing (or Python >= 2.6)
         try:
@@ -930,9 +1064,26 @@ def cythonize(module_list, exclude=None, nthreads=0, aliases=None, quiet=False,
                 pool.terminate()
                 raise
             pool.join()
+            compile_times = result.get()
     if not nthreads:
         for args in to_compile:
-            cythonize_one(*args)
+            compile_times.append(timed_cythonize_one(*args))
+
+    profiles = []
+    for i, (source, seconds, source_profiles) in enumerate(compile_times):
+        profiles.extend(source_profiles)
+        compile_times[i] = (source, seconds)
+    if profile_report and profile_report is not True:
+        from ..Compiler import CompilerProfile
+        CompilerProfile.write_report(profile_report, profiles)
+
+    if deps.dependency_cache is not None:
+        for source, seconds in compile_times:
+            if seconds is not None:
+                deps.dependency_cache.record_compile_time(source, seconds)
+        deps.dependency_cache.save()
+    if show_timings and compile_times:
+        print_compile_times(compile_times)
 
     if exclude_failures:
         failed_modules = set()
@@ -953,14 +1104,62 @@ def cythonize(module_list, exclude=None, nthreads=0, aliases=None, quiet=False,
             print("Failed compilations: %s" % ', '.join(sorted([
                 module.name for module in failed_modules])))
 
+    if c_options.shared_utility_module:
+        module_list.append(create_shared_utility_extension(
+            c_options.shared_utility_module, c_options, build_dir, quiet))
+
     if options.cache:
-        cleanup_cache(options.cache, getattr(options, 'cache_size', 1024 * 1024 * 100))
+        cleanup_cache(options.cache, getattr(options, 'cache_size', default_cache_size))
     # cythonize() is often followed by the (non-Python-buffered)
     # compiler output, flush now to avoid interleaving output.
     sys.stdout.flush()
     return module_list
 
 
+def create_shared_utility_extension(module_name, options, build_dir=None, quiet=False):
+    """
+    Generate the C file of the module that provides the shared utility code
+    and return an Extension for it.  The C file is only replaced if its
+    content changes, so that it does not get rebuilt needlessly.
+    """
+    from ..Compiler.Main import compile_single
+    from ..Compiler.Errors import CompileError
+    import shutil
+    import tempfile
+
+    c_file = os.path.join(*module_name.split('.')) + '.c'
+    if build_dir:
+        c_file = os.path.join(build_dir, c_file)
+    safe_makedirs_once(os.path.dirname(c_file) or '.')
+
+    temp_dir = tempfile.mkdtemp(prefix='cython_shared_utility')
+    try:
+        source = os.path.join(temp_dir, module_name.rsplit('.', 1)[-1] + '.pyx')
+        with open(source, 'w') as f:
+            f.write('# Generated by cythonize() for the shared utility code.\n')
+        temp_c_file = os.path.join(temp_dir, os.path.basename(c_file))
+        options = CompilationOptions(
+            options, output_file=temp_c_file, cplus=False, cache=None,
+            annotate=False, embedded_metadata={})
+        result = compile_single(source, options, full_module_name=module_name)
+        if result.num_errors:
+            raise CompileError(None, source)
+        with open(temp_c_file, 'rb') as f:
+            code = f.read()
+        if not os.path.exists(c_file) or file_content(c_file) != code:
+            if not quiet:
+                print("Generating shared utility module %s" % module_name)
+            shutil.move(temp_c_file, c_file)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return Extension(module_name, sources=[c_file])
+
+
+def file_content(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
 if os.environ.get('XML_RESULTS'):
     compile_result_dir = os.environ['XML_RESULTS']
     def record_results(func):
@@ -969,7 +1168,7 @@ if os.environ.get('XML_RESULTS'):
             success = True
             try:
                 try:
-                    func(*args)
+                    return func(*args)
                 except:
                     success = False
             finally:
@@ -1004,30 +1203,12 @@ def cythonize_one(pyx_file, c_file, fingerprint, quiet, options=None, raise_on_f
     from ..Compiler.Errors import CompileError, PyrexError
 
     if fingerprint:
-        if not os.path.exists(options.cache):
-            try:
-                os.mkdir(options.cache)
-            except:
-                if not os.path.exists(options.cache):
-                    raise
-        # Cython-generated c files are highly compressible.
-        # (E.g. a compression ratio of about 10 for Sage).
-        fingerprint_file = join_path(
-            options.cache, "%s-%s%s" % (os.path.basename(c_file), fingerprint, gzip_ext))
-        if os.path.exists(fingerprint_file):
+        cache = open_cache(options.cache)
+        cache_key = "%s-%s" % (os.path.basename(c_file), fingerprint)
+        if cache.load(cache_key, c_file):
             if not quiet:
                 print("%sFound compiled %s in cache" % (progress, pyx_file))
-            os.utime(fingerprint_file, None)
-            g = gzip_open(fingerprint_file, 'rb')
-            try:
-                f = open(c_file, 'wb')
-                try:
-                    shutil.copyfileobj(g, f)
-                finally:
-                    f.close()
-            finally:
-                g.close()
-            return
+            return False
     if not quiet:
         print("%sCythonizing %s" % (progress, pyx_file))
     if options is None:
@@ -1036,6 +1217,7 @@ def cythonize_one(pyx_file, c_file, fingerprint, quiet, options=None, raise_on_f
     options.embedded_metadata = embedded_metadata
 
     any_failures = 0
+    result = None
     try:
         result = compile([pyx_file], options)
         if result.num_errors > 0:
@@ -1058,26 +1240,76 @@ def cythonize_one(pyx_file, c_file, fingerprint, quiet, options=None, raise_on_f
         elif os.path.exists(c_file):
             os.remove(c_file)
     elif fingerprint:
-        f = open(c_file, 'rb')
-        try:
-            g = gzip_open(fingerprint_file, 'wb')
-            try:
-                shutil.copyfileobj(f, g)
-            finally:
-                g.close()
-        finally:
-            f.close()
+        cache.store(cache_key, c_file)
+    return result
+
+
+def timed_cythonize_one(pyx_file, *args):
+    """
+    Run cythonize_one() and return the source file name, the time
+    that its compilation took (or None if it was found in the cache)
+    and the list of compiler profiles if the 'profile_compiler' option is set.
+    """
+    t = time.time()
+    result = cythonize_one(pyx_file, *args)
+    if result is False:
+        return pyx_file, None, []
+    seconds = time.time() - t
+    profiles = []
+    if result is not None:
+        profiles = [r.compiler_profile for r in result.values() if r.compiler_profile is not None]
+    return pyx_file, seconds, profiles
 
 
 def cythonize_one_helper(m):
     import traceback
     try:
-        return cythonize_one(*m)
+        return timed_cythonize_one(*m)
     except Exception:
         traceback.print_exc()
         raise
 
 
+def estimate_compile_times(sources, dependency_cache=None):
+    """
+    Estimate the compile time of each source file from its previous
+    compile time, or from its size compared to the files with known times.
+    """
+    known_times = {}
+    if dependency_cache is not None:
+        for source in sources:
+            seconds = dependency_cache.compile_times.get(os.path.normpath(source))
+            if seconds is not None:
+                known_times[source] = seconds
+    sizes = {}
+    for source in sources:
+        try:
+            sizes[source] = os.path.getsize(source)
+        except OSError:
+            sizes[source] = 0
+    known_size = sum([sizes[source] for source in known_times])
+    if known_size:
+        seconds_per_byte = sum(known_times.values()) / float(known_size)
+    else:
+        seconds_per_byte = 1.0
+    estimates = {}
+    for source in sources:
+        if source in known_times:
+            estimates[source] = known_times[source]
+        else:
+            estimates[source] = sizes[source] * seconds_per_byte
+    return estimates
+
+
+def print_compile_times(compile_times):
+    compiled = [(seconds, source) for source, seconds in compile_times if seconds is not None]
+    compiled.sort(reverse=True)
+    print("Compile times:")
+    for seconds, source in compiled:
+        print("%8.2fs  %s" % (seconds, source))
+    print("%8.2fs  total (%d modules)" % (sum([seconds for seconds, _ in compiled]), len(compiled)))
+
+
 def _init_multiprocessing_helper():
     # KeyboardInterrupt kills workers, so don't let them get it
     import signal
@@ -1085,25 +1317,4 @@ def _init_multiprocessing_helper():
 
 
 def cleanup_cache(cache, target_size, ratio=.85):
-    try:
-        p = subprocess.Popen(['du', '-s', '-k', os.path.abspath(cache)], stdout=subprocess.PIPE)
-        res = p.wait()
-        if res == 0:
-            total_size = 1024 * int(p.stdout.read().strip().split()[0])
-            if total_size < target_size:
-                return
-    except (OSError, ValueError):
-        pass
-    total_size = 0
-    all = []
-    for file in os.listdir(cache):
-        path = join_path(cache, file)
-        s = os.stat(path)
-        total_size += s.st_size
-        all.append((s.st_atime, s.st_size, path))
-    if total_size > target_size:
-        for time, size, file in reversed(sorted(all)):
-            os.unlink(file)
-            total_size -= size
-            if total_size < target_size * ratio:
-                break
+    open_cache(cache).cleanup(target_size, ratio)
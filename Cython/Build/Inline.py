@@ -8,19 +8,25 @@ try:
 except ImportError:
     import md5 as hashlib
 
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
 from distutils.core import Distribution, Extension
 from distutils.command.build_ext import build_ext
 
 import Cython
 from ..Compiler.Main import Context, CompilationOptions, default_options
 
-from ..Compiler.ParseTreeTransforms import (CythonTransform,
-        SkipDeclarations, AnalyseDeclarationsTransform, EnvTransform)
+from ..Compiler.Visitor import CythonTransform, EnvTransform
+from ..Compiler.ParseTreeTransforms import SkipDeclarations, AnalyseDeclarationsTransform
 from ..Compiler.TreeFragment import parse_from_strings
 from ..Compiler.StringEncoding import _unicode
 from .Dependencies import strip_string_literals, cythonize, cached_function
+from .Cache import replace_file
 from ..Compiler import Pipeline, Nodes
-from ..Utils import get_cython_cache_dir
+from ..Utils import get_cython_cache_dir, safe_makedirs
 import cython as cython_module
 
 IS_PY3 = sys.version_info >= (3, 0)
@@ -117,6 +123,71 @@ def _create_context(cython_include_dirs):
     return Context(list(cython_include_dirs), default_options)
 
 
+class InlineIndex(object):
+    """
+    Remembers the unbound symbols of the inlined code snippets and the
+    modules that were built for them across interpreter sessions, so that
+    a new process can load an existing module without parsing the code.
+
+    There is one index file per Python interpreter and Cython version in
+    each 'lib_dir'.  Concurrent writers merge their entries into the file
+    and replace it atomically; an entry that gets lost in a race only
+    costs a parse.
+    """
+
+    def __init__(self, lib_dir):
+        key = sys.version_info, sys.executable, Cython.__version__
+        self.path = os.path.join(
+            lib_dir, "_cython_inline_index_%s.pickle" % hashlib.md5(_unicode(key).encode('utf-8')).hexdigest())
+        self.unbound_symbols = {}  # code -> unbound symbols
+        self.modules = {}  # (code, arg_sigs) -> module path
+        self._new_entries = [], []
+        self.load()
+
+    def _read(self):
+        try:
+            with open(self.path, 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            # missing or unreadable
+            return {}, {}
+
+    def load(self):
+        self.unbound_symbols, self.modules = self._read()
+
+    def add_unbound_symbols(self, code, unbound_symbols):
+        self.unbound_symbols[code] = unbound_symbols
+        self._new_entries[0].append((code, unbound_symbols))
+
+    def add_module(self, code, arg_sigs, module_path):
+        self.modules[code, arg_sigs] = module_path
+        self._new_entries[1].append(((code, arg_sigs), module_path))
+
+    def save(self):
+        # merge with the entries that other processes have written meanwhile
+        unbound_symbols, modules = self._read()
+        unbound_symbols.update(self._new_entries[0])
+        modules.update(self._new_entries[1])
+        safe_makedirs(os.path.dirname(self.path))
+        temp_path = '%s.%d.tmp' % (self.path, os.getpid())
+        try:
+            with open(temp_path, 'wb') as f:
+                pickle.dump((unbound_symbols, modules), f, 2)
+            replace_file(temp_path, self.path)
+        except (IOError, OSError):
+            # the index is only an optimisation
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        self.unbound_symbols, self.modules = unbound_symbols, modules
+        self._new_entries = [], []
+
+
+@cached_function
+def _get_inline_index(lib_dir):
+    return InlineIndex(lib_dir)
+
+
 _cython_inline_cache = {}
 _cython_inline_default_context = _create_context(('.',))
 
@@ -143,110 +214,203 @@ def cython_inline(code, get_type=unsafe_type, lib_dir=os.path.join(get_cython_ca
         get_type = lambda x: 'object'
     ctx = _create_context(tuple(cython_include_dirs)) if cython_include_dirs else _cython_inline_default_context
 
-    # Fast path if this has been called in this session.
+    # Fast path if this has been called in this session, or in an earlier one.
+    index = _get_inline_index(lib_dir)
     _unbound_symbols = _cython_inline_cache.get(code)
+    if _unbound_symbols is None:
+        _unbound_symbols = index.unbound_symbols.get(code)
+        if _unbound_symbols is not None:
+            _cython_inline_cache[code] = _unbound_symbols
     if _unbound_symbols is not None:
         _populate_unbound(kwds, _unbound_symbols, locals, globals)
         args = sorted(kwds.items())
         arg_sigs = tuple([(get_type(value, ctx), arg) for arg, value in args])
         invoke = _cython_inline_cache.get((code, arg_sigs))
+        if invoke is None and not force:
+            module_path = index.modules.get((code, arg_sigs))
+            if module_path is not None and os.path.isfile(module_path):
+                module_name = os.path.basename(module_path).split('.', 1)[0]
+                module = sys.modules.get(module_name) or imp.load_dynamic(module_name, module_path)
+                _cython_inline_cache[code, arg_sigs] = invoke = module.__invoke
         if invoke is not None:
             arg_list = [arg[1] for arg in args]
             return invoke(*arg_list)
 
-    orig_code = code
-    code = to_unicode(code)
-    code, literals = strip_string_literals(code)
-    code = strip_common_indent(code)
     if locals is None:
         locals = inspect.currentframe().f_back.f_back.f_locals
     if globals is None:
         globals = inspect.currentframe().f_back.f_back.f_globals
-    try:
-        _cython_inline_cache[orig_code] = _unbound_symbols = unbound_symbols(code)
-        _populate_unbound(kwds, _unbound_symbols, locals, globals)
-    except AssertionError:
-        if not quiet:
-            # Parsing from strings not fully supported (e.g. cimports).
-            print("Could not parse code as a string (to extract unbound symbols).")
-    cimports = []
-    for name, arg in list(kwds.items()):
-        if arg is cython_module:
-            cimports.append('\ncimport cython as %s' % name)
-            del kwds[name]
-    arg_names = sorted(kwds)
-    arg_sigs = tuple([(get_type(kwds[arg], ctx), arg) for arg in arg_names])
-    key = orig_code, arg_sigs, sys.version_info, sys.executable, Cython.__version__
-    module_name = "_cython_inline_" + hashlib.md5(_unicode(key).encode('utf-8')).hexdigest()
-
-    if module_name in sys.modules:
-        module = sys.modules[module_name]
+    module = _InlineModule(code, kwds, get_type, ctx, lib_dir, quiet, locals, globals)
 
+    if module.name in sys.modules:
+        invoke = sys.modules[module.name].__invoke
     else:
-        build_extension = None
-        if cython_inline.so_ext is None:
-            # Figure out and cache current extension suffix
-            build_extension = _get_build_extension()
-            cython_inline.so_ext = build_extension.get_ext_filename('')
+        module_path = module.get_path()
+        if force or not os.path.isfile(module_path):
+            _build_inline_modules([module], lib_dir, cython_include_dirs, quiet)
+        invoke = imp.load_dynamic(module.name, module_path).__invoke
+        if index.modules.get((code, module.arg_sigs)) != module_path:
+            index.add_module(code, module.arg_sigs, module_path)
+            index.save()
 
-        module_path = os.path.join(lib_dir, module_name + cython_inline.so_ext)
+    _cython_inline_cache[code, module.arg_sigs] = invoke
+    arg_list = [module.kwds[arg] for arg in module.arg_names]
+    return invoke(*arg_list)
 
-        if not os.path.exists(lib_dir):
-            os.makedirs(lib_dir)
-        if force or not os.path.isfile(module_path):
-            cflags = []
-            c_include_dirs = []
-            qualified = re.compile(r'([.\w]+)[.]')
-            for type, _ in arg_sigs:
-                m = qualified.match(type)
-                if m:
-                    cimports.append('\ncimport %s' % m.groups()[0])
-                    # one special case
-                    if m.groups()[0] == 'numpy':
-                        import numpy
-                        c_include_dirs.append(numpy.get_include())
-                        # cflags.append('-Wno-unused')
-            module_body, func_body = extract_func_code(code)
-            params = ', '.join(['%s %s' % a for a in arg_sigs])
-            module_code = """
+# Cached suffix used by cython_inline above.  None should get
+# overridden with actual value upon the first cython_inline invocation
+cython_inline.so_ext = None
+
+
+class _InlineModule(object):
+    """
+    The extension module that cython_inline() builds for a code snippet
+    and the types of its arguments.
+    """
+
+    def __init__(self, orig_code, kwds, get_type, ctx, lib_dir, quiet, locals, globals):
+        self.orig_code = orig_code
+        self.lib_dir = lib_dir
+        code = to_unicode(orig_code)
+        code, self.literals = strip_string_literals(code)
+        self.code = code = strip_common_indent(code)
+        self.kwds = kwds = dict(kwds)
+        index = _get_inline_index(lib_dir)
+        try:
+            _unbound_symbols = _cython_inline_cache.get(orig_code)
+            if _unbound_symbols is None:
+                _unbound_symbols = index.unbound_symbols.get(orig_code)
+            if _unbound_symbols is None:
+                _unbound_symbols = unbound_symbols(code)
+                index.add_unbound_symbols(orig_code, _unbound_symbols)
+                index.save()
+            _cython_inline_cache[orig_code] = _unbound_symbols
+            _populate_unbound(kwds, _unbound_symbols, locals, globals)
+        except AssertionError:
+            if not quiet:
+                # Parsing from strings not fully supported (e.g. cimports).
+                print("Could not parse code as a string (to extract unbound symbols).")
+        self.cimports = []
+        for name, arg in list(kwds.items()):
+            if arg is cython_module:
+                self.cimports.append('\ncimport cython as %s' % name)
+                del kwds[name]
+        self.arg_names = sorted(kwds)
+        self.arg_sigs = tuple([(get_type(kwds[arg], ctx), arg) for arg in self.arg_names])
+        key = orig_code, self.arg_sigs, sys.version_info, sys.executable, Cython.__version__
+        self.name = "_cython_inline_" + hashlib.md5(_unicode(key).encode('utf-8')).hexdigest()
+
+    def get_path(self):
+        if cython_inline.so_ext is None:
+            # Figure out and cache current extension suffix
+            cython_inline.so_ext = _get_build_extension().get_ext_filename('')
+        return os.path.join(self.lib_dir, self.name + cython_inline.so_ext)
+
+    def create_extension(self):
+        """
+        Write the .pyx file of the module and return its Extension.
+        """
+        cimports = list(self.cimports)
+        cflags = []
+        c_include_dirs = []
+        qualified = re.compile(r'([.\w]+)[.]')
+        for type, _ in self.arg_sigs:
+            m = qualified.match(type)
+            if m:
+                cimports.append('\ncimport %s' % m.groups()[0])
+                # one special case
+                if m.groups()[0] == 'numpy':
+                    import numpy
+                    c_include_dirs.append(numpy.get_include())
+                    # cflags.append('-Wno-unused')
+        module_body, func_body = extract_func_code(self.code)
+        params = ', '.join(['%s %s' % a for a in self.arg_sigs])
+        module_code = """
 %(module_body)s
 %(cimports)s
 def __invoke(%(params)s):
 %(func_body)s
     return locals()
-            """ % {'cimports': '\n'.join(cimports),
-                   'module_body': module_body,
-                   'params': params,
-                   'func_body': func_body }
-            for key, value in literals.items():
-                module_code = module_code.replace(key, value)
-            pyx_file = os.path.join(lib_dir, module_name + '.pyx')
-            fh = open(pyx_file, 'w')
-            try:
-                fh.write(module_code)
-            finally:
-                fh.close()
-            extension = Extension(
-                name = module_name,
-                sources = [pyx_file],
-                include_dirs = c_include_dirs,
-                extra_compile_args = cflags)
-            if build_extension is None:
-                build_extension = _get_build_extension()
-            build_extension.extensions = cythonize([extension], include_path=cython_include_dirs or ['.'], quiet=quiet)
-            build_extension.build_temp = os.path.dirname(pyx_file)
-            build_extension.build_lib  = lib_dir
-            build_extension.run()
-
-        module = imp.load_dynamic(module_name, module_path)
-
-    _cython_inline_cache[orig_code, arg_sigs] = module.__invoke
-    arg_list = [kwds[arg] for arg in arg_names]
-    return module.__invoke(*arg_list)
-
-# Cached suffix used by cython_inline above.  None should get
-# overridden with actual value upon the first cython_inline invocation
-cython_inline.so_ext = None
+        """ % {'cimports': '\n'.join(cimports),
+               'module_body': module_body,
+               'params': params,
+               'func_body': func_body }
+        for key, value in self.literals.items():
+            module_code = module_code.replace(key, value)
+        if not os.path.exists(self.lib_dir):
+            os.makedirs(self.lib_dir)
+        pyx_file = os.path.join(self.lib_dir, self.name + '.pyx')
+        fh = open(pyx_file, 'w')
+        try:
+            fh.write(module_code)
+        finally:
+            fh.close()
+        return Extension(
+            name = self.name,
+            sources = [pyx_file],
+            include_dirs = c_include_dirs,
+            extra_compile_args = cflags)
+
+
+def _build_inline_modules(modules, lib_dir, cython_include_dirs, quiet, nthreads=0):
+    extensions = [module.create_extension() for module in modules]
+    build_extension = _get_build_extension()
+    build_extension.extensions = cythonize(
+        extensions, include_path=cython_include_dirs or ['.'], quiet=quiet, nthreads=nthreads)
+    build_extension.build_temp = lib_dir
+    build_extension.build_lib  = lib_dir
+    if nthreads:
+        # used by distutils in Py3.5+
+        build_extension.parallel = nthreads
+    build_extension.run()
+
+
+def cython_inline_precompile(calls, get_type=unsafe_type, lib_dir=os.path.join(get_cython_cache_dir(), 'inline'),
+                             cython_include_dirs=None, force=False, quiet=False, nthreads=0,
+                             locals=None, globals=None):
+    """
+    Builds the modules for a number of cython_inline() calls at once, e.g.
+    when a program starts, so that the actual calls only need to load them.
+
+    'calls' is a sequence of (code, kwds) or (code, kwds, globals) tuples,
+    where 'kwds' holds the keyword arguments of the call (or values of the
+    same types).  Unbound names that are not passed are looked up in the
+    'globals' of the call, or in the 'locals' and 'globals' arguments, which
+    default to the namespaces of the caller.  Use
+    RuntimeCompiledFunction.inline_call() for compiled functions.
+
+    All missing modules are built in one go, with 'nthreads' parallel jobs.
+    Returns the number of modules that were built.
+    """
+    if get_type is None:
+        get_type = lambda x: 'object'
+    ctx = _create_context(tuple(cython_include_dirs)) if cython_include_dirs else _cython_inline_default_context
+    if locals is None:
+        locals = inspect.currentframe().f_back.f_locals
+    if globals is None:
+        globals = inspect.currentframe().f_back.f_globals
+    index = _get_inline_index(lib_dir)
+
+    modules = {}
+    for call in calls:
+        if len(call) == 3:
+            code, kwds, call_globals = call
+            call_locals = call_globals
+        else:
+            code, kwds = call
+            call_locals, call_globals = locals, globals
+        module = _InlineModule(code, kwds, get_type, ctx, lib_dir, quiet, call_locals, call_globals)
+        modules[module.name] = module
+    modules = [modules[name] for name in sorted(modules)]
+
+    to_build = [module for module in modules
+                if force or not os.path.isfile(module.get_path())]
+    if to_build:
+        _build_inline_modules(to_build, lib_dir, cython_include_dirs, quiet, nthreads)
+    for module in modules:
+        index.add_module(module.orig_code, module.arg_sigs, module.get_path())
+    index.save()
+    return len(to_build)
 
 _find_non_space = re.compile('[^ ]').search
 
@@ -341,3 +505,13 @@ class RuntimeCompiledFunction(object):
             return cython_inline(self._body, locals=self._f.__globals__, globals=self._f.__globals__, **all)
         else:
             return cython_inline(self._body, locals=self._f.func_globals, globals=self._f.func_globals, **all)
+
+    def inline_call(self, *args, **kwds):
+        """
+        Returns the cython_inline_precompile() entry for a call with these arguments.
+        """
+        all = getcallargs(self._f, *args, **kwds)
+        if IS_PY3:
+            return self._body, all, self._f.__globals__
+        else:
+            return self._body, all, self._f.func_globals
@@ -0,0 +1,177 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+try:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+except ImportError:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+
+from Cython.Build.Cache import DirectoryCache, HTTPCache, open_cache
+
+
+_forked_cache = None
+
+def _store_in_worker(key, c_file):
+    _forked_cache.store(key, c_file)
+    return _forked_cache._index_pid == os.getpid()
+
+
+class CacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, 'cache')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_c_file(self, name, content):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def read_c_file(self, name):
+        with open(os.path.join(self.temp_dir, name), 'rb') as f:
+            return f.read()
+
+
+class TestDirectoryCache(CacheTestCase):
+
+    def test_store_load(self):
+        cache = DirectoryCache(self.cache_dir)
+        c_file = self.write_c_file('a.c', b'int a;\n')
+        self.assertFalse(cache.load('a.c-123', c_file))
+        cache.store('a.c-123', c_file)
+        os.remove(c_file)
+        self.assertTrue(cache.load('a.c-123', c_file))
+        self.assertEqual(b'int a;\n', self.read_c_file('a.c'))
+        self.assertFalse(cache.load('a.c-456', c_file))
+
+    def test_missing_entry(self):
+        cache = DirectoryCache(self.cache_dir)
+        c_file = self.write_c_file('a.c', b'int a;\n')
+        cache.store('a.c-123', c_file)
+        for name in os.listdir(self.cache_dir):
+            if name.startswith('a.c-123'):
+                os.remove(os.path.join(self.cache_dir, name))
+        self.assertFalse(cache.load('a.c-123', c_file))
+
+    def test_cleanup(self):
+        cache = DirectoryCache(self.cache_dir)
+        c_file = self.write_c_file('a.c', os.urandom(1000))
+        for key in ('k1', 'k2', 'k3', 'k4'):
+            cache.store(key, c_file)
+        self.assertTrue(cache.load('k1', c_file))
+        cache.cleanup(2500, ratio=1)
+        self.assertTrue(cache.load('k1', c_file))
+        self.assertFalse(cache.load('k2', c_file))
+        self.assertFalse(cache.load('k3', c_file))
+        self.assertTrue(cache.load('k4', c_file))
+
+    def test_cleanup_lfu(self):
+        cache = DirectoryCache(self.cache_dir, policy='lfu')
+        c_file = self.write_c_file('a.c', os.urandom(1000))
+        for key in ('k1', 'k2', 'k3'):
+            cache.store(key, c_file)
+        self.assertTrue(cache.load('k1', c_file))
+        self.assertTrue(cache.load('k2', c_file))
+        self.assertTrue(cache.load('k1', c_file))
+        cache.cleanup(2500, ratio=1)
+        self.assertTrue(cache.load('k1', c_file))
+        self.assertTrue(cache.load('k2', c_file))
+        self.assertFalse(cache.load('k3', c_file))
+
+    def test_shared_index(self):
+        c_file = self.write_c_file('a.c', b'int a;\n')
+        DirectoryCache(self.cache_dir).store('a.c-123', c_file)
+        self.assertTrue(DirectoryCache(self.cache_dir).load('a.c-123', c_file))
+
+    def test_index_after_fork(self):
+        from Cython.Compiler.Main import _get_fork_context
+        fork_context = _get_fork_context()
+        if fork_context is None:
+            return
+        global _forked_cache
+        cache = _forked_cache = DirectoryCache(self.cache_dir)
+        cache.cleanup(1000000)  # opens the index in this process
+        index = cache._get_index()
+        c_file = self.write_c_file('a.c', b'int a;\n')
+        pool = fork_context.Pool(1)
+        try:
+            self.assertTrue(pool.apply(_store_in_worker, ('a.c-123', c_file)))
+        finally:
+            pool.close()
+            pool.join()
+            _forked_cache = None
+        self.assertTrue(cache._get_index() is index)
+        self.assertEqual(
+            [('a.c-123',)], index.execute("SELECT key FROM entries").fetchall())
+
+    def test_open_cache(self):
+        self.assertTrue(isinstance(open_cache(self.cache_dir), DirectoryCache))
+        self.assertTrue(isinstance(open_cache('http://localhost/cache'), HTTPCache))
+        cache = DirectoryCache(self.cache_dir)
+        self.assertTrue(open_cache(cache) is cache)
+
+
+class CacheRequestHandler(BaseHTTPRequestHandler):
+    entries = {}
+
+    def do_GET(self):
+        if self.path in self.entries:
+            data = self.entries[self.path]
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+    def do_PUT(self):
+        length = int(self.headers['Content-Length'])
+        self.entries[self.path] = self.rfile.read(length)
+        self.send_response(201)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHTTPCache(CacheTestCase):
+
+    def setUp(self):
+        super(TestHTTPCache, self).setUp()
+        CacheRequestHandler.entries.clear()
+        self.server = HTTPServer(('127.0.0.1', 0), CacheRequestHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = 'http://127.0.0.1:%d/cache/' % self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        super(TestHTTPCache, self).tearDown()
+
+    def test_store_load(self):
+        cache = HTTPCache(self.url)
+        c_file = self.write_c_file('a.c', b'int a;\n')
+        self.assertFalse(cache.load('a.c-123', c_file))
+        cache.store('a.c-123', c_file)
+        os.remove(c_file)
+        self.assertTrue(cache.load('a.c-123', c_file))
+        self.assertEqual(b'int a;\n', self.read_c_file('a.c'))
+
+    def test_server_down(self):
+        cache = HTTPCache('http://127.0.0.1:1/cache', timeout=5)
+        c_file = self.write_c_file('a.c', b'int a;\n')
+        cache.store('a.c-123', c_file)
+        self.assertFalse(cache.load('a.c-123', c_file))
@@ -0,0 +1,115 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from Cython.Build import Dependencies
+from Cython.Build.Dependencies import DependencyCache, estimate_compile_times
+
+
+class TestDependencyCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.temp_dir, 'build', 'deps.cache')
+        self.source = os.path.join(self.temp_dir, 'a.pyx')
+        self._parse_dependencies = Dependencies.parse_dependencies
+        self._file_hash = Dependencies.file_hash
+        # the file content changes during the tests
+        Dependencies.file_hash = self._file_hash.uncached
+        self.parsed = []
+        def parse_dependencies(filename):
+            self.parsed.append(filename)
+            return self._parse_dependencies.uncached(filename)
+        Dependencies.parse_dependencies = parse_dependencies
+        self.write_source(u"# distutils: libraries = m\ncimport b\ninclude 'c.pxi'\n")
+
+    def tearDown(self):
+        Dependencies.parse_dependencies = self._parse_dependencies
+        Dependencies.file_hash = self._file_hash
+        shutil.rmtree(self.temp_dir)
+
+    def write_source(self, code):
+        with open(self.source, 'w') as f:
+            f.write(code)
+
+    def parse(self):
+        cache = DependencyCache(self.cache_file)
+        result = cache.parse_dependencies(self.source)
+        cache.save()
+        return result
+
+    def test_reuse(self):
+        cimports, includes, externs, info = self.parse()
+        self.assertEqual(['b'], cimports)
+        self.assertEqual(['c.pxi'], includes)
+        self.assertEqual({'libraries': ['m']}, info.values)
+        self.assertEqual(1, len(self.parsed))
+
+        cimports, includes, externs, info = self.parse()
+        self.assertEqual(1, len(self.parsed))
+        self.assertEqual(['b'], cimports)
+        self.assertEqual(['c.pxi'], includes)
+        self.assertEqual({'libraries': ['m']}, info.values)
+
+    def test_touched(self):
+        self.parse()
+        st = os.stat(self.source)
+        os.utime(self.source, (st.st_atime, st.st_mtime + 10))
+        self.parse()
+        self.assertEqual(1, len(self.parsed))
+
+    def test_modified(self):
+        self.parse()
+        self.write_source(u"cimport d\n")
+        st = os.stat(self.source)
+        os.utime(self.source, (st.st_atime, st.st_mtime + 10))
+        cimports = self.parse()[0]
+        self.assertEqual(2, len(self.parsed))
+        self.assertEqual(['d'], cimports)
+
+    def test_no_shared_state(self):
+        info = self.parse()[3]
+        info.values['depends'] = ['x.h']
+        self.assertEqual({'libraries': ['m']}, self.parse()[3].values)
+
+    def test_compile_times(self):
+        cache = DependencyCache(self.cache_file)
+        cache.record_compile_time(self.source, 2.5)
+        cache.save()
+        self.assertEqual(2.5, DependencyCache(self.cache_file).compile_times[self.source])
+
+    def test_build_dirs(self):
+        from Cython.Build.Dependencies import cythonize
+        source = os.path.join(self.temp_dir, 'm.pyx')
+        with open(source, 'w') as f:
+            f.write(u"x = 1\n")
+        dep_tree = Dependencies._dep_tree
+        Dependencies._dep_tree = None
+        try:
+            for build_dir in ('build1', 'build2'):
+                build_dir = os.path.join(self.temp_dir, build_dir)
+                cythonize([source], build_dir=build_dir, force=True, quiet=True)
+                cache = DependencyCache(os.path.join(build_dir, 'cython_dependencies.cache'))
+                self.assertTrue(source in cache.entries, cache.entries)
+                self.assertTrue(os.path.normpath(source) in cache.compile_times, cache.compile_times)
+        finally:
+            Dependencies._dep_tree = dep_tree
+
+    def test_estimate_compile_times(self):
+        small = os.path.join(self.temp_dir, 'small.pyx')
+        large = os.path.join(self.temp_dir, 'large.pyx')
+        with open(small, 'w') as f:
+            f.write(u"x = 1\n")
+        with open(large, 'w') as f:
+            f.write(u"x = 1\n" * 100)
+        estimates = estimate_compile_times([small, large, self.source])
+        self.assertTrue(estimates[large] > estimates[small])
+
+        cache = DependencyCache(self.cache_file)
+        cache.record_compile_time(self.source, 100.0)
+        cache.record_compile_time(small, 1.0)
+        estimates = estimate_compile_times([small, large, self.source], cache)
+        self.assertEqual(100.0, estimates[self.source])
+        self.assertEqual(1.0, estimates[small])
+        self.assertTrue(estimates[large] > estimates[small])
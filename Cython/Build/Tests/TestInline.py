@@ -1,5 +1,6 @@
 import os, tempfile
 from Cython.Shadow import inline
+from Cython.Build import Inline
 from Cython.Build.Inline import safe_type
 from Cython.TestUtils import CythonTest
 
@@ -60,6 +61,55 @@ class TestInline(CythonTest):
         """, a=3, **self.test_kwds)
         self.assertEquals(type(b), float)
 
+    def test_persistent_index(self):
+        lib_dir = tempfile.mkdtemp(prefix='cython_inline_')
+        code = "return a * 3 + global_value"
+        self.assertEquals(inline(code, a=2, lib_dir=lib_dir, quiet=True), 106)
+
+        # simulate a new process that must not need to parse the code again
+        Inline._cython_inline_cache.clear()
+        get_inline_index = Inline._get_inline_index
+        Inline._get_inline_index = Inline.cached_function(get_inline_index.uncached)
+        unbound_symbols = Inline.unbound_symbols
+        def fail(code, context=None):
+            raise RuntimeError("parsing should not be necessary")
+        Inline.unbound_symbols = fail
+        try:
+            self.assertEquals(inline(code, a=5, lib_dir=lib_dir, quiet=True), 115)
+        finally:
+            Inline.unbound_symbols = unbound_symbols
+            Inline._get_inline_index = get_inline_index
+
+    def test_precompile(self):
+        lib_dir = tempfile.mkdtemp(prefix='cython_inline_')
+        @Inline.RuntimeCompiledFunction
+        def add(a, b):
+            return a + b
+        calls = [
+            ("return a * 2", dict(a=1)),
+            ("return a * 2", dict(a=1.0)),
+            ("return a * 2", dict(a=2)),
+            ("return global_value + a", dict(a=1)),
+            add.inline_call(1, 2),
+        ]
+        # pool workers of the test runner cannot start a pool themselves
+        import multiprocessing
+        nthreads = 0 if multiprocessing.current_process().daemon else 2
+        self.assertEqual(4, Inline.cython_inline_precompile(calls, lib_dir=lib_dir, quiet=True, nthreads=nthreads))
+        self.assertEqual(0, Inline.cython_inline_precompile(calls, lib_dir=lib_dir, quiet=True))
+
+        build_inline_modules = Inline._build_inline_modules
+        def fail(*args):
+            raise RuntimeError("modules should be built already")
+        Inline._build_inline_modules = fail
+        try:
+            self.assertEquals(inline("return a * 2", a=5, lib_dir=lib_dir), 10)
+            self.assertEquals(inline("return a * 2", a=1.5, lib_dir=lib_dir), 3.0)
+            self.assertEquals(inline("return global_value + a", a=1, lib_dir=lib_dir), 101)
+            self.assertEquals(Inline.cython_inline(add._body, lib_dir=lib_dir, a=3, b=4), 7)
+        finally:
+            Inline._build_inline_modules = build_inline_modules
+
     if has_numpy:
 
         def test_numpy(self):
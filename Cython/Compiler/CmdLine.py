@@ -23,6 +23,11 @@ Options:
   -t, --timestamps               Only compile newer source files
   -f, --force                    Compile all source files (overrides implied -t)
   -v, --verbose                  Be verbose, print file names on multiple compilation
+  -j, --parallel <N>             Compile multiple source files in N parallel processes
+  --spool-c-code                 Keep the finished parts of the generated C code in a
+                                 temporary file to reduce the memory usage for huge modules
+  --profile-compiler <filename>  Write the time and memory used by each compiler phase and
+                                 .pxd file to a JSON file (Chrome trace event format)
   -p, --embed-positions          If specified, the positions in Cython files of each
                                  function definition is embedded in its docstring.
   --cleanup <level>              Release interned objects on python exit, for memory debugging.
@@ -118,6 +123,12 @@ def parse_command_line(args):
                 options.timestamps = 0
             elif option in ("-v", "--verbose"):
                 options.verbose += 1
+            elif option in ("-j", "--parallel"):
+                options.parallel = int(pop_value())
+            elif option == "--spool-c-code":
+                options.spool_c_code = True
+            elif option == "--profile-compiler":
+                options.profile_compiler = pop_value()
             elif option in ("-p", "--embed-positions"):
                 Options.embed_pos_in_docstring = 1
             elif option in ("-z", "--pre-import"):
@@ -26,6 +26,11 @@ try:
 except ImportError:
     import md5 as hashlib
 
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
 from . import Naming
 from . import Options
 from . import DebugFlags
@@ -85,6 +90,176 @@ def get_utility_dir():
     return os.path.join(Cython_dir, "Utility")
 
 
+@Utils.cached_function
+def get_utility_file_listing():
+    utility_dir = get_utility_dir()
+    try:
+        return os.listdir(utility_dir)
+    except OSError:
+        # XXX the code below assumes as 'zipimport.zipimporter' instance
+        # XXX should be easy to generalize, but too lazy right now to write it
+        import zipfile
+        global __loader__
+        loader = __loader__
+        archive = loader.archive
+        with closing(zipfile.ZipFile(archive)) as fileobj:
+            return [os.path.basename(name)
+                    for name in fileobj.namelist()
+                    if os.path.join(archive, name).startswith(utility_dir)]
+
+
+#------------------------------------------------------------------
+#
+#   Pre-parsed utility code
+#
+#   Splitting the utility code files into their sections and parsing
+#   the Tempita templates in them is repeated by each compiler process,
+#   so the results are stored in a bundle (generated by setup.py, or
+#   written to the Cython cache directory on first use).  The bundle is
+#   only used if it was generated by the current code, and the entries
+#   of each file only if the file was not modified since.
+#
+
+utility_bundle_format_version = 1
+utility_bundle_file_name = 'Utilities.pickle'
+utility_file_extensions = ('.c', '.cpp', '.pyx')
+
+
+def _hash_file(path):
+    with open(path, 'rb') as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+def utility_bundle_key():
+    """
+    Identifies the code that the utility bundle depends on.
+    """
+    from ..Tempita import _tempita
+    m = hashlib.md5(("%s:%s:%s" % (
+        Version.version, utility_bundle_format_version, KEYWORDS_MUST_BE_BYTES)).encode('ASCII'))
+    # Look up the sources by name in the package directories: the module
+    # files may be compiled extensions, e.g. 'Code.cpython-36m-....so'.
+    compiler_dir = os.path.dirname(os.path.abspath(__file__))
+    tempita_dir = os.path.dirname(os.path.abspath(_tempita.__file__))
+    for path in (os.path.join(compiler_dir, 'Code.py'),
+                 os.path.join(compiler_dir, 'Naming.py'),
+                 os.path.join(tempita_dir, '_tempita.py')):
+        m.update(os.path.basename(path).encode('ASCII'))
+        try:
+            m.update(_hash_file(path).encode('ASCII'))
+        except IOError:
+            # installed without sources, rely on the version
+            pass
+    return m.hexdigest()
+
+
+def utility_bundle_paths():
+    return [os.path.join(get_utility_dir(), utility_bundle_file_name),
+            os.path.join(Utils.get_cython_cache_dir(), utility_bundle_file_name)]
+
+
+def build_utility_bundle():
+    """
+    Parses all utility code files.  Returns a dict that maps each file
+    name to the hash of its content, its utilities (as returned by
+    UtilityCodeBase.read_utilities_from_file()) and the Tempita
+    templates found in their code sections.
+    """
+    bundle = {}
+    for filename in sorted(get_utility_file_listing()):
+        if os.path.splitext(filename)[1] not in utility_file_extensions:
+            continue
+        utilities = UtilityCodeBase.read_utilities_from_file(filename)
+        templates = {}
+        for name, (proto, proto_block, impl, tags) in utilities.items():
+            template_name = "%s:%s" % (filename, name)
+            for code in [proto, impl] + list(tags.values()):
+                if isinstance(code, basestring) and '{{' in code:
+                    try:
+                        templates[(code, template_name)] = _parse_tempita(code, template_name)
+                    except Exception:
+                        # not a template after all, e.g. nested C initialisers
+                        pass
+        bundle[filename] = (
+            _hash_file(os.path.join(get_utility_dir(), filename)), utilities, templates)
+    return bundle
+
+
+def load_utility_bundle(path, key=None):
+    """
+    Loads the utility bundle from 'path'.  Returns None if the file is
+    missing, unreadable or was generated for a different key.
+    """
+    try:
+        with open(path, 'rb') as f:
+            version, data_key, bundle = pickle.load(f)
+    except Exception:
+        return None
+    if version != utility_bundle_format_version or (key is not None and data_key != key):
+        return None
+    return bundle
+
+
+def save_utility_bundle(bundle, path, key=None):
+    """
+    Stores the utility bundle in 'path'.
+    """
+    if key is None:
+        key = utility_bundle_key()
+    Utils.safe_makedirs(os.path.dirname(path))
+    temp_path = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        with open(temp_path, 'wb') as f:
+            pickle.dump((utility_bundle_format_version, key, bundle), f, 2)
+        if sys.platform == 'win32' and os.path.exists(path):
+            os.remove(path)
+        os.rename(temp_path, path)
+    except:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+@Utils.cached_function
+def get_utility_bundle():
+    """
+    Returns the pre-parsed utility code, or parses all utility files
+    (and tries to store the result in the cache directory) if the
+    bundle is stale.
+    """
+    key = utility_bundle_key()
+    paths = utility_bundle_paths()
+    for path in paths:
+        bundle = load_utility_bundle(path, key)
+        if bundle is not None:
+            return bundle
+    bundle = build_utility_bundle()
+    try:
+        save_utility_bundle(bundle, paths[-1], key)
+    except (IOError, OSError):
+        pass
+    return bundle
+
+
+def get_bundled_utilities(path):
+    """
+    Returns the utilities of the file 'path' from the bundle, or None if
+    the file is not bundled or was modified.
+    """
+    entry = get_utility_bundle().get(path)
+    if entry is None:
+        return None
+    content_hash, utilities, templates = entry
+    try:
+        if _hash_file(os.path.join(get_utility_dir(), path)) != content_hash:
+            return None
+    except IOError:
+        # no sources, e.g. in a zip archive
+        pass
+    _tempita_templates.update(templates)
+    return utilities
+
+
 class UtilityCodeBase(object):
     """
     Support for loading utility code from a file.
@@ -161,6 +336,19 @@ class UtilityCodeBase(object):
         if utilities:
             return utilities
 
+        utilities = get_bundled_utilities(path)
+        if utilities is None:
+            utilities = cls.read_utilities_from_file(path)
+        cls._utility_cache[path] = utilities
+        return utilities
+
+    @classmethod
+    def read_utilities_from_file(cls, path):
+        """
+        Parses the utility code file 'path' (relative to Cython/Utility).
+        Returns a dict that maps the utility names to lists of
+        [proto, proto_block, impl, tags].
+        """
         filename = os.path.join(get_utility_dir(), path)
         _, ext = os.path.splitext(path)
         if ext in ('.pyx', '.py', '.pxd', '.pxi'):
@@ -215,9 +403,7 @@ class UtilityCodeBase(object):
         # Don't forget to add the last utility code
         cls._add_utility(utility, type, lines, begin_lineno, tags)
 
-        utilities = dict(utilities)  # un-defaultdict-ify
-        cls._utility_cache[path] = utilities
-        return utilities
+        return dict(utilities)  # un-defaultdict-ify
 
     @classmethod
     def load(cls, util_code_name, from_file=None, **kwargs):
@@ -230,22 +416,8 @@ class UtilityCodeBase(object):
         if '::' in util_code_name:
             from_file, util_code_name = util_code_name.rsplit('::', 1)
         if not from_file:
-            utility_dir = get_utility_dir()
             prefix = util_code_name + '.'
-            try:
-                listing = os.listdir(utility_dir)
-            except OSError:
-                # XXX the code below assumes as 'zipimport.zipimporter' instance
-                # XXX should be easy to generalize, but too lazy right now to write it
-                import zipfile
-                global __loader__
-                loader = __loader__
-                archive = loader.archive
-                with closing(zipfile.ZipFile(archive)) as fileobj:
-                    listing = [os.path.basename(name)
-                               for name in fileobj.namelist()
-                               if os.path.join(archive, name).startswith(utility_dir)]
-            files = [filename for filename in listing
+            files = [filename for filename in get_utility_file_listing()
                      if filename.startswith(prefix)]
             if not files:
                 raise ValueError("No match found for utility code " + util_code_name)
@@ -512,6 +684,14 @@ class UtilityCode(UtilityCodeBase):
                 self.cleanup(writer, output.module_pos)
 
 
+_tempita_templates = {}
+
+
+def _parse_tempita(s, name):
+    from ..Tempita import Template
+    return Template(s, name=name)
+
+
 def sub_tempita(s, context, file=None, name=None):
     "Run tempita on string s with given context."
     if not s:
@@ -522,8 +702,12 @@ def sub_tempita(s, context, file=None, name=None):
     elif name:
         context['__name'] = name
 
-    from ..Tempita import sub
-    return sub(s, **context)
+    # templates are reused, e.g. for each type that a utility is specialised for
+    key = (s, context.get('__name'))
+    template = _tempita_templates.get(key)
+    if template is None:
+        template = _tempita_templates[key] = _parse_tempita(*key)
+    return template.substitute(dict(context))
 
 
 class TempitaUtilityCode(UtilityCode):
@@ -572,6 +756,84 @@ class LazyUtilityCode(UtilityCodeBase):
         globalstate.use_utility_code(utility)
 
 
+#------------------------------------------------------------------
+#
+#   Shared utility code
+#
+#   With the 'shared_utility_module' option, the utility code listed
+#   below is not copied into each module.  One module that cythonize()
+#   generates contains all of it and exports its functions and variables
+#   through its '__pyx_capi__' dict, from where the other modules import
+#   them at init time.  Their prototypes turn into function pointers of
+#   the same name, so the code that calls them does not change.
+#
+#   Only utility code that does not depend on the module that uses it
+#   can be shared.  Small functions that benefit from inlining should
+#   stay in each module.
+#
+
+shared_utility_code_names = [
+    ('FetchCommonType', 'CommonTypes.c'),
+    ('RaiseException', 'Exceptions.c'),
+    ('RaiseArgTupleInvalid', 'FunctionArguments.c'),
+    ('RaiseKeywordRequired', 'FunctionArguments.c'),
+    ('RaiseDoubleKeywords', 'FunctionArguments.c'),
+    ('RaiseMappingExpected', 'FunctionArguments.c'),
+    ('KeywordStringCheck', 'FunctionArguments.c'),
+    ('ParseKeywords', 'FunctionArguments.c'),
+    ('CythonFunction', 'CythonFunction.c'),
+    ('CyFunctionClassCell', 'CythonFunction.c'),
+    ('FusedFunction', 'CythonFunction.c'),
+    ('CoroutineBase', 'Coroutine.c'),
+    ('Coroutine', 'Coroutine.c'),
+    ('Generator', 'Coroutine.c'),
+    ('PatchGeneratorABC', 'Coroutine.c'),
+]
+
+_find_shared_declarations = re.compile(
+    r'^static\s+(?:CYTHON_INLINE\s+)?(?P<type>[^;(){}=#]*?[\s*])(?P<name>__[pP]yx_\w+)\s*'
+    r'(?:\((?P<args>[^;(){}]*(?:\([^;(){}]*\)[^;(){}]*)*)\)|=\s*(?:0|NULL))\s*;',
+    re.M).sub
+
+
+@Utils.cached_function
+def get_shared_utility_codes():
+    return [UtilityCode.load_cached(name, from_file)
+            for name, from_file in shared_utility_code_names]
+
+
+@Utils.cached_function
+def is_shared_utility_code(utility_code):
+    return utility_code in get_shared_utility_codes()
+
+
+@Utils.cached_function
+def get_shared_utility_declarations(utility_code):
+    """
+    Returns the prototype code of shared utility code for the modules
+    that import it, and a list of (name, type, signature, is_function)
+    for the functions and variables that it exports.
+    """
+    declarations = []
+
+    def replace_declaration(match):
+        decl_type, name, args = match.group('type', 'name', 'args')
+        if args is None:
+            # variable that gets imported at init time
+            declarations.append((name, decl_type, ' '.join(decl_type.split()), False))
+            return match.group(0)
+        if name.startswith('__pyx_') and name.endswith('_init') and args.strip() == 'void':
+            # type initialisation, already done by the shared module
+            return '#define %s() 0' % name
+        # ignore line continuations
+        signature = ' '.join(('%s(%s)' % (decl_type, args.replace('\\', ' '))).split())
+        declarations.append((name, decl_type, signature, True))
+        return 'static %s(*%s)(%s);' % (decl_type, name, args)
+
+    proto = _find_shared_declarations(replace_declaration, utility_code.proto or '')
+    return proto, declarations
+
+
 class FunctionState(object):
     # return_label     string          function return point label
     # error_label      string          error catch point label
@@ -992,6 +1254,7 @@ class GlobalState(object):
         'cached_builtins',
         'cached_constants',
         'init_globals',
+        'shared_utility_import',
         'init_module',
         'cleanup_globals',
         'cleanup_module',
@@ -1001,7 +1264,8 @@ class GlobalState(object):
     ]
 
 
-    def __init__(self, writer, module_node, code_config, common_utility_include_dir=None):
+    def __init__(self, writer, module_node, code_config, common_utility_include_dir=None,
+                 shared_utility_module=None):
         self.filename_table = {}
         self.filename_list = []
         self.input_file_contents = {}
@@ -1010,6 +1274,13 @@ class GlobalState(object):
         self.in_utility_code_generation = False
         self.code_config = code_config
         self.common_utility_include_dir = common_utility_include_dir
+        # the module that provides the shared utility code, unless it is this one
+        self.exports_shared_utility_code = (
+            shared_utility_module is not None and shared_utility_module == module_node.full_module_name)
+        if self.exports_shared_utility_code:
+            shared_utility_module = None
+        self.shared_utility_module = shared_utility_module
+        self.shared_utility_imports = []
         self.parts = {}
         self.module_node = module_node # because some utility code generation needs it
                                        # (generating backwards-compatible Get/ReleaseBuffer
@@ -1114,6 +1385,9 @@ class GlobalState(object):
         w.putln("}")
         w.exit_cfunc_scope()
 
+        if self.shared_utility_module:
+            self.generate_shared_utility_import_code()
+
         if Options.generate_cleanup_code:
             w = self.parts['cleanup_globals']
             w.putln("}")
@@ -1399,23 +1673,36 @@ class GlobalState(object):
         consts.sort()
         decls_writer = self.parts['decls']
         init_globals = self.parts['init_globals']
+        int_consts = []
         for py_type, _, _, value, value_code, c in consts:
             cname = c.cname
             decls_writer.putln("static PyObject *%s;" % cname)
+            if py_type == 'int' and not Utils.long_literal(value):
+                # created from a table, which takes less code than a call for each
+                if len(value.lstrip('-')) > 4:
+                    value_code += 'L'
+                int_consts.append((cname, value_code))
+                continue
             if py_type == 'float':
                 function = 'PyFloat_FromDouble(%s)'
             elif py_type == 'long':
                 function = 'PyLong_FromString((char *)"%s", 0, 0)'
-            elif Utils.long_literal(value):
-                function = 'PyInt_FromString((char *)"%s", 0, 0)'
-            elif len(value.lstrip('-')) > 4:
-                function = "PyInt_FromLong(%sL)"
             else:
-                function = "PyInt_FromLong(%s)"
+                function = 'PyInt_FromString((char *)"%s", 0, 0)'
             init_globals.putln('%s = %s; %s' % (
                 cname, function % value_code,
                 init_globals.error_goto_if_null(cname, self.module_pos)))
 
+        if int_consts:
+            self.use_utility_code(UtilityCode.load_cached("InitInts", "TypeConversion.c"))
+            decls_writer.putln("static __Pyx_IntTabEntry %s[] = {" % Naming.inttab_cname)
+            for cname, value_code in int_consts:
+                decls_writer.putln("{&%s, %s}," % (cname, value_code))
+            decls_writer.putln("{0, 0}")
+            decls_writer.putln("};")
+            init_globals.putln("if (__Pyx_InitInts(%s) < 0) %s;" % (
+                Naming.inttab_cname, init_globals.error_goto(self.module_pos)))
+
     # The functions below are there in a transition phase only
     # and will be deprecated. They are called from Nodes.BlockNode.
     # The copy&paste duplication is intentional in order to be able
@@ -1480,7 +1767,56 @@ class GlobalState(object):
         """
         if utility_code and utility_code not in self.utility_codes:
             self.utility_codes.add(utility_code)
-            utility_code.put_code(self)
+            if self.shared_utility_module and is_shared_utility_code(utility_code):
+                self.put_shared_utility_code(utility_code)
+            else:
+                utility_code.put_code(self)
+
+    def put_shared_utility_code(self, utility_code):
+        """
+        Declares the functions of shared utility code as pointers,
+        which get imported from the shared utility module.
+        """
+        if not self.shared_utility_imports:
+            self.use_utility_code(UtilityCode.load_cached("ModuleImport", "ImportExport.c"))
+            self.use_utility_code(UtilityCode.load_cached("FunctionImport", "ImportExport.c"))
+            self.use_utility_code(UtilityCode.load_cached("VoidPtrImport", "ImportExport.c"))
+        # other dependencies are only needed by the implementation
+        for dependency in utility_code.requires or ():
+            if is_shared_utility_code(dependency):
+                self.use_utility_code(dependency)
+        proto, declarations = get_shared_utility_declarations(utility_code)
+        writer = self.parts[utility_code.proto_block]
+        writer.putln("/* %s.proto */" % utility_code.name)
+        writer.put(utility_code.format_code(proto))
+        self.shared_utility_imports.extend(declarations)
+
+    def generate_shared_utility_import_code(self):
+        w = self.parts['shared_utility_import']
+        w.putln("")
+        w.putln("static int __Pyx_ImportSharedUtilityCode(void) {")
+        if not self.shared_utility_imports:
+            w.putln("return 0;")
+            w.putln("}")
+            return
+        if not all(is_function for _, _, _, is_function in self.shared_utility_imports):
+            w.putln("void *p;")
+        w.putln('PyObject *module = __Pyx_ImportModule("%s");' % self.shared_utility_module)
+        w.putln("if (unlikely(!module)) return -1;")
+        for name, decl_type, signature, is_function in self.shared_utility_imports:
+            if is_function:
+                w.putln('if (__Pyx_ImportFunction(module, "%s", (void (**)(void))&%s, "%s") < 0) goto bad;' % (
+                    name, name, signature))
+            else:
+                w.putln('if (__Pyx_ImportVoidPtr(module, "%s", &p, "%s") < 0) goto bad;' % (
+                    name, signature))
+                w.putln("%s = *(%s*) p;" % (name, decl_type))
+        w.putln("Py_DECREF(module);")
+        w.putln("return 0;")
+        w.putln("bad:")
+        w.putln("Py_DECREF(module);")
+        w.putln("return -1;")
+        w.putln("}")
 
     def use_entry_utility_code(self, entry):
         if entry is None:
@@ -1545,7 +1881,8 @@ class CCodeWriter(object):
     globalstate = code_config = None
 
     def __init__(self, create_from=None, buffer=None, copy_formatting=False):
-        if buffer is None: buffer = StringIOTree()
+        if buffer is None:
+            buffer = StringIOTree(spool=create_from.buffer.spool if create_from is not None else None)
         self.buffer = buffer
         self.last_pos = None
         self.last_marked_pos = None
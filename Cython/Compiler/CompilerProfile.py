@@ -0,0 +1,185 @@
+"""
+Self-profiling of the compiler.
+
+With the 'profile_compiler' option, the compiler records the wall time,
+the net number of allocated memory blocks and the peak memory usage of
+each pipeline phase and of each .pxd file that it loads while compiling
+a module.  The report is written in the Chrome trace event format
+(viewable in chrome://tracing or https://ui.perfetto.dev) and also contains
+a summary that adds up the phases, .pxd files and modules by name.
+"""
+
+from __future__ import absolute_import
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Windows
+
+if hasattr(sys, 'getallocatedblocks'):
+    _allocated_blocks = sys.getallocatedblocks
+else:
+    # Py<3.4
+    def _allocated_blocks():
+        return None
+
+try:
+    _clock = time.perf_counter
+except AttributeError:
+    # Py<3.3
+    _clock = time.time
+
+
+# the profile of the module that is currently being compiled, if any
+active_profile = None
+
+
+def _peak_rss_kb():
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        maxrss //= 1024  # bytes, not kilobytes
+    return maxrss
+
+
+def phase_name(phase):
+    """
+    Returns a readable name for a pipeline phase, which can be a function
+    or a transform instance.
+    """
+    return getattr(phase, '__name__', None) or type(phase).__name__
+
+
+class CompilerProfile(object):
+    """
+    The events recorded while compiling one module, in the order in which
+    they ended.  Each event is a dict with the keys 'cat' ('module', 'phase'
+    or 'pxd'), 'name', 'start' (in seconds since the epoch), 'seconds',
+    'allocated_blocks' (the net change, None if unknown) and 'peak_rss_kb'
+    (the peak memory usage of the process at the end of the event,
+    None if unknown) and 'peak_rss_growth_kb'.
+    """
+
+    def __init__(self, module_name):
+        self.module_name = module_name
+        self.pid = os.getpid()
+        self.events = []
+        # wall clock time of the start, to align the profiles of different processes
+        self._epoch = time.time() - _clock()
+
+    @contextmanager
+    def record(self, category, name):
+        blocks = _allocated_blocks()
+        peak_rss = _peak_rss_kb()
+        start = _clock()
+        try:
+            yield
+        finally:
+            seconds = _clock() - start
+            end_blocks = _allocated_blocks()
+            end_peak_rss = _peak_rss_kb()
+            self.events.append({
+                'cat': category,
+                'name': name,
+                'start': self._epoch + start,
+                'seconds': seconds,
+                'allocated_blocks': None if blocks is None else end_blocks - blocks,
+                'peak_rss_kb': end_peak_rss,
+                'peak_rss_growth_kb': None if peak_rss is None else end_peak_rss - peak_rss,
+            })
+
+    def trace_events(self):
+        """
+        Returns the events in the Chrome trace event format.
+        """
+        return [{
+            'name': event['name'],
+            'cat': event['cat'],
+            'ph': 'X',
+            'ts': int(event['start'] * 1e6),
+            'dur': int(event['seconds'] * 1e6),
+            'pid': self.pid,
+            'tid': self.pid,
+            'args': {
+                'module': self.module_name,
+                'allocated_blocks': event['allocated_blocks'],
+                'peak_rss_kb': event['peak_rss_kb'],
+                'peak_rss_growth_kb': event['peak_rss_growth_kb'],
+            },
+        } for event in self.events]
+
+
+@contextmanager
+def _no_profile():
+    yield
+
+
+def record(category, name):
+    """
+    Returns a context manager that records an event in the active profile,
+    if there is one.
+    """
+    if active_profile is None:
+        return _no_profile()
+    return active_profile.record(category, name)
+
+
+@contextmanager
+def profiling(module_name):
+    """
+    Makes a new profile the active one while compiling the module and
+    yields it.
+    """
+    global active_profile
+    profile = CompilerProfile(module_name)
+    outer_profile, active_profile = active_profile, profile
+    try:
+        with profile.record('module', module_name):
+            yield profile
+    finally:
+        active_profile = outer_profile
+
+
+def summarize(profiles):
+    """
+    Adds up the events of all profiles by category and name.
+    """
+    summary = {}
+    for profile in profiles:
+        for event in profile.events:
+            totals = summary.setdefault(event['cat'], {}).get(event['name'])
+            if totals is None:
+                totals = summary[event['cat']][event['name']] = {
+                    'count': 0, 'seconds': 0.0, 'allocated_blocks': 0, 'peak_rss_growth_kb': 0}
+            totals['count'] += 1
+            totals['seconds'] += event['seconds']
+            for key in ('allocated_blocks', 'peak_rss_growth_kb'):
+                if event[key] is None:
+                    totals[key] = None
+                elif totals[key] is not None:
+                    totals[key] += event[key]
+    return summary
+
+
+def write_report(path, profiles):
+    """
+    Writes the profiles to a JSON file in the Chrome trace event format,
+    with the summary of all events under the additional key 'summary'.
+    """
+    import json
+    trace_events = []
+    for profile in profiles:
+        trace_events.extend(profile.trace_events())
+    report = {
+        'traceEvents': trace_events,
+        'displayTimeUnit': 'ms',
+        'summary': summarize(profiles),
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, sort_keys=True)
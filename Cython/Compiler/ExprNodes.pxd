@@ -0,0 +1,12 @@
+from __future__ import absolute_import
+
+cimport cython
+
+cdef default_str_type(env)
+cdef infer_sequence_item_type(env, seq_node, index_node=*, seq_type=*)
+cdef get_exception_handler(exception_value)
+cdef translate_cpp_exception(code, pos, inside, exception_value, bint nogil)
+cdef translate_double_cpp_exception(code, pos, lhs_type, lhs_code, rhs_code,
+                                    lhs_exc_val, assign_exc_val, bint nogil)
+cdef _analyse_name_as_type(name, pos, env)
+cdef get_compile_time_binop(node)
@@ -2090,10 +2090,12 @@ class NameNode(AtomicExprNode):
             assert entry.type.is_pyobject, "Python global or builtin not a Python object"
             interned_cname = code.intern_identifier(self.entry.name)
             if entry.scope.is_module_scope:
+                # the lookup result is cached per call site as long as the
+                # module dict and the builtins dict do not change
                 code.globalstate.use_utility_code(
-                    UtilityCode.load_cached("GetModuleGlobalName", "ObjectHandling.c"))
+                    UtilityCode.load_cached("GetModuleGlobalNameCached", "ObjectHandling.c"))
                 code.putln(
-                    '%s = __Pyx_GetModuleGlobalName(%s); %s' % (
+                    '__Pyx_GetModuleGlobalNameCached(%s, %s); %s' % (
                         self.result(),
                         interned_cname,
                         code.error_goto_if_null(self.result(), self.pos)))
@@ -5489,29 +5491,41 @@ class PyMethodCallNode(SimpleCallNode):
         code.mark_pos(self.pos)
         self.allocate_temp_result(code)
 
-        self.function.generate_evaluation_code(code)
         assert self.arg_tuple.mult_factor is None
         args = self.arg_tuple.args
-        for arg in args:
-            arg.generate_evaluation_code(code)
-
-        # make sure function is in temp so that we can replace the reference below if it's a method
-        reuse_function_temp = self.function.is_temp
-        if reuse_function_temp:
-            function = self.function.result()
-        else:
-            function = code.funcstate.allocate_temp(py_object_type, manage_ref=True)
-            self.function.make_owned_reference(code)
-            code.put("%s = %s; " % (function, self.function.py_result()))
-            self.function.generate_disposal_code(code)
-            self.function.free_temps(code)
-
         self_arg = code.funcstate.allocate_temp(py_object_type, manage_ref=True)
-        code.putln("%s = NULL;" % self_arg)
         arg_offset_cname = None
         if len(args) > 1:
             arg_offset_cname = code.funcstate.allocate_temp(PyrexTypes.c_int_type, manage_ref=False)
-            code.putln("%s = 0;" % arg_offset_cname)
+
+        if (self.function.is_attribute and self.function.is_py_attr and not self.function.is_special_lookup
+                and code.globalstate.directives['optimize.attribute_cache']):
+            # look up the method without creating a bound method object, before evaluating the arguments
+            reuse_function_temp = False
+            function = self.generate_cached_method_lookup(code, self_arg)
+            if len(args) > 1:
+                code.putln("%s = (%s != NULL);" % (arg_offset_cname, self_arg))
+            for arg in args:
+                arg.generate_evaluation_code(code)
+        else:
+            self.function.generate_evaluation_code(code)
+            for arg in args:
+                arg.generate_evaluation_code(code)
+
+            # make sure function is in temp so that we can replace the reference below if it's a method
+            reuse_function_temp = self.function.is_temp
+            if reuse_function_temp:
+                function = self.function.result()
+            else:
+                function = code.funcstate.allocate_temp(py_object_type, manage_ref=True)
+                self.function.make_owned_reference(code)
+                code.put("%s = %s; " % (function, self.function.py_result()))
+                self.function.generate_disposal_code(code)
+                self.function.free_temps(code)
+
+            code.putln("%s = NULL;" % self_arg)
+            if len(args) > 1:
+                code.putln("%s = 0;" % arg_offset_cname)
 
         def attribute_is_likely_method(attr):
             obj = attr.obj
@@ -5667,6 +5681,30 @@ class PyMethodCallNode(SimpleCallNode):
             code.put_decref_clear(function, py_object_type)
             code.funcstate.release_temp(function)
 
+    def generate_cached_method_lookup(self, code, self_arg):
+        """
+        Evaluates the object of the method attribute and looks up the method
+        through a type cache.  Python methods are returned as plain function,
+        with the object stored in 'self_arg'.
+        """
+        obj = self.function.obj
+        obj.generate_evaluation_code(code)
+        function = code.funcstate.allocate_temp(py_object_type, manage_ref=True)
+        code.globalstate.use_utility_code(
+            UtilityCode.load_cached("PyObjectGetMethodCached", "ObjectHandling.c"))
+        code.putln("%s = NULL;" % self_arg)
+        code.putln("__Pyx_PyObject_GetMethodCached(%s, %s, %s, %s); %s" % (
+            function,
+            obj.py_result(),
+            code.intern_identifier(self.function.attribute),
+            self_arg,
+            code.error_goto_if_null(function, self.function.pos)))
+        code.put_gotref(function)
+        code.put_xgotref(self_arg)
+        obj.generate_disposal_code(code)
+        obj.free_temps(code)
+        return function
+
 
 class InlinedDefNodeCallNode(CallNode):
     #  Inline call to defnode
@@ -6659,17 +6697,22 @@ class AttributeNode(ExprNode):
             if self.is_special_lookup:
                 code.globalstate.use_utility_code(
                     UtilityCode.load_cached("PyObjectLookupSpecial", "ObjectHandling.c"))
-                lookup_func_name = '__Pyx_PyObject_LookupSpecial'
+                lookup_code = '%s = __Pyx_PyObject_LookupSpecial(%s, %s);'
+            elif code.globalstate.directives['optimize.attribute_cache']:
+                # statement macro with a type cache for this code location
+                code.globalstate.use_utility_code(
+                    UtilityCode.load_cached("PyObjectGetAttrStrCached", "ObjectHandling.c"))
+                lookup_code = '__Pyx_PyObject_GetAttrStrCached(%s, %s, %s);'
             else:
                 code.globalstate.use_utility_code(
                     UtilityCode.load_cached("PyObjectGetAttrStr", "ObjectHandling.c"))
-                lookup_func_name = '__Pyx_PyObject_GetAttrStr'
+                lookup_code = '%s = __Pyx_PyObject_GetAttrStr(%s, %s);'
             code.putln(
-                '%s = %s(%s, %s); %s' % (
-                    self.result(),
-                    lookup_func_name,
-                    self.obj.py_result(),
-                    code.intern_identifier(self.attribute),
+                '%s %s' % (
+                    lookup_code % (
+                        self.result(),
+                        self.obj.py_result(),
+                        code.intern_identifier(self.attribute)),
                     code.error_goto_if_null(self.result(), self.pos)))
             code.put_gotref(self.py_result())
         elif self.type.is_memoryviewslice:
@@ -8747,6 +8790,12 @@ class PyCFunctionNode(ExprNode, ModuleNameMixin):
     def analyse_types(self, env):
         if self.binding:
             self.analyse_default_args(env)
+        elif self.code_object is not None:
+            directives = self.def_node.local_scope.directives
+            if not (directives['profile'] or directives['linetrace']):
+                # only CyFunctions and profiling frames use the code object,
+                # so avoid creating it at module import time
+                self.code_object = self.def_node.code_object = None
         return self
 
     def analyse_default_args(self, env):
@@ -5,6 +5,9 @@
 
 from __future__ import absolute_import
 
+import os
+import sys
+
 raw_prefixes = "rR"
 bytes_prefixes = "bB"
 string_prefixes = "fFuU" + bytes_prefixes
@@ -136,3 +139,175 @@ def make_lexicon():
         #debug_file = scanner_dump_file
         )
 
+
+
+#------------------------------------------------------------------
+#
+#   Pre-generated scanner tables
+#
+#   Building the DFA of the lexicon takes a noticeable part of the
+#   compilation time of small modules, so the finished state tables are
+#   stored in a file (generated by setup.py, or written to the Cython
+#   cache directory on first use) and loaded from there.  The file is
+#   only used if it was generated from the current sources.
+#
+
+lexicon_format_version = 1
+lexicon_file_name = 'Lexicon.pickle'
+
+
+def lexicon_key():
+    """
+    Identifies the sources that the scanner tables are generated from.
+    """
+    import hashlib
+    from .. import __version__, Plex
+    m = hashlib.md5(("%s:%s" % (__version__, lexicon_format_version)).encode('ASCII'))
+    # Look up the sources by name in the package directories: the module
+    # files may be compiled extensions, e.g. 'Lexicon.cpython-36m-....so'.
+    compiler_dir = os.path.dirname(os.path.abspath(__file__))
+    plex_dir = os.path.dirname(os.path.abspath(Plex.__file__))
+    for path in [os.path.join(compiler_dir, 'Lexicon.py')] + [
+            os.path.join(plex_dir, name)
+            for name in ('Actions.py', 'DFA.py', 'Lexicons.py', 'Machines.py', 'Regexps.py', 'Transitions.py')]:
+        m.update(os.path.basename(path).encode('ASCII'))
+        try:
+            with open(path, 'rb') as f:
+                m.update(f.read())
+        except IOError:
+            # installed without sources, rely on the version
+            pass
+    return m.hexdigest()
+
+
+def lexicon_paths():
+    from ..Utils import get_cython_cache_dir
+    return [os.path.join(os.path.dirname(os.path.abspath(__file__)), lexicon_file_name),
+            os.path.join(get_cython_cache_dir(), lexicon_file_name)]
+
+
+def get_lexicon():
+    """
+    Returns the scanner lexicon from the pre-generated tables, or builds
+    it (and tries to store it in the cache directory) if they are stale.
+    """
+    key = lexicon_key()
+    paths = lexicon_paths()
+    for path in paths:
+        lexicon = load_lexicon(path, key)
+        if lexicon is not None:
+            return lexicon
+    lexicon = make_lexicon()
+    try:
+        save_lexicon(lexicon, paths[-1], key)
+    except (IOError, OSError):
+        pass
+    return lexicon
+
+
+def load_lexicon(path, key=None):
+    """
+    Loads the lexicon from 'path'.  Returns None if the file is missing,
+    unreadable or was generated for a different key.
+    """
+    import pickle
+    try:
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        version, data_key, initial_states, states = data
+    except Exception:
+        return None
+    if version != lexicon_format_version or (key is not None and data_key != key):
+        return None
+
+    from ..Plex import Lexicon
+    from ..Plex.Machines import FastMachine
+    machine = FastMachine()
+    template = machine.new_state_template
+    machine.states = [template.copy() for _ in states]
+    for state, (number, action, transitions, special) in zip(machine.states, states):
+        state['number'] = number
+        state['action'] = _load_action(action)
+        for target, chars in transitions:
+            target = machine.states[target]
+            for c in chars:
+                state[c] = target
+        for event, target in special:
+            state[event] = machine.states[target]
+    machine.next_number = len(states) + 1
+    for name, index in initial_states:
+        machine.initial_states[name] = machine.states[index]
+    lexicon = Lexicon.__new__(Lexicon)
+    lexicon.machine = machine
+    return lexicon
+
+
+def save_lexicon(lexicon, path, key=None):
+    """
+    Stores the state tables of the lexicon in 'path'.
+    """
+    import pickle
+    machine = lexicon.machine
+    numbers = dict((id(state), i) for i, state in enumerate(machine.states))
+    states = []
+    for state in machine.states:
+        chars = {}
+        special = []
+        for event, target in state.items():
+            if event in ('number', 'action') or target is None:
+                continue
+            if len(event) == 1:
+                chars.setdefault(numbers[id(target)], []).append(event)
+            else:
+                special.append((event, numbers[id(target)]))
+        transitions = sorted((target, u''.join(sorted(events))) for target, events in chars.items())
+        states.append((state['number'], _dump_action(state['action']), transitions, sorted(special)))
+    initial_states = sorted((name, numbers[id(state)]) for name, state in machine.initial_states.items())
+    data = (lexicon_format_version, key or lexicon_key(), initial_states, states)
+
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    temp_path = '%s.%d.tmp' % (path, os.getpid())
+    with open(temp_path, 'wb') as f:
+        pickle.dump(data, f, 2)
+    if sys.platform == 'win32' and os.path.exists(path):
+        os.remove(path)
+    os.rename(temp_path, path)
+
+
+def _dump_action(action):
+    from ..Plex import Actions
+    from .Scanning import Method
+    if action is None:
+        return None
+    elif isinstance(action, Actions.Return):
+        return ('Return', action.value)
+    elif isinstance(action, Actions.Call) and isinstance(action.function, Method):
+        return ('Method', action.function.name, action.function.kwargs)
+    elif isinstance(action, Actions.Begin):
+        return ('Begin', action.state_name)
+    elif isinstance(action, Actions.Text):
+        return ('TEXT',)
+    elif isinstance(action, Actions.Ignore):
+        return ('IGNORE',)
+    raise ValueError("Cannot store scanner action %r" % action)
+
+
+def _load_action(action):
+    from ..Plex import Actions
+    from .Scanning import Method
+    if action is None:
+        return None
+    kind = action[0]
+    if kind == 'Return':
+        return Actions.Return(action[1])
+    elif kind == 'Method':
+        return Actions.Call(Method(action[1], **(action[2] or {})))
+    elif kind == 'Begin':
+        return Actions.Begin(action[1])
+    elif kind == 'TEXT':
+        return Actions.TEXT
+    elif kind == 'IGNORE':
+        return Actions.IGNORE
+    raise ValueError("Unknown scanner action %r" % (action,))
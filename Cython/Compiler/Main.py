@@ -124,15 +124,16 @@ class Context(object):
     # pipeline creation functions can now be found in Pipeline.py
 
     def process_pxd(self, source_desc, scope, module_name):
-        from . import Pipeline
-        if isinstance(source_desc, FileSourceDescriptor) and source_desc._file_type == 'pyx':
-            source = CompilationSource(source_desc, module_name, os.getcwd())
-            result_sink = create_default_resultobj(source, self.options)
-            pipeline = Pipeline.create_pyx_as_pxd_pipeline(self, result_sink)
-            result = Pipeline.run_pipeline(pipeline, source)
-        else:
-            pipeline = Pipeline.create_pxd_pipeline(self, scope, module_name)
-            result = Pipeline.run_pipeline(pipeline, source_desc)
+        from . import Pipeline, CompilerProfile
+        with CompilerProfile.record('pxd', module_name):
+            if isinstance(source_desc, FileSourceDescriptor) and source_desc._file_type == 'pyx':
+                source = CompilationSource(source_desc, module_name, os.getcwd())
+                result_sink = create_default_resultobj(source, self.options)
+                pipeline = Pipeline.create_pyx_as_pxd_pipeline(self, result_sink)
+                result = Pipeline.run_pipeline(pipeline, source)
+            else:
+                pipeline = Pipeline.create_pxd_pipeline(self, scope, module_name)
+                result = Pipeline.run_pipeline(pipeline, source_desc)
         return result
 
     def nonfatal_error(self, exc):
@@ -343,6 +344,14 @@ class Context(object):
             raise RuntimeError("Only file sources for code supported")
         source_filename = source_desc.filename
         scope.cpp = self.cpp
+        use_tree_cache = pxd and getattr(self.options, 'cache_pxd_trees', False)
+        if use_tree_cache:
+            tree = pxd_tree_cache.lookup(self, source_filename, full_module_name)
+            if tree is not None:
+                return tree
+            language_level = self.language_level
+            future_directives = set(self.future_directives)
+            included_files = len(scope.included_files)
         # Parse the given source file and return a parse tree.
         num_errors = Errors.num_errors
         try:
@@ -365,6 +374,12 @@ class Context(object):
 
         if Errors.num_errors > num_errors:
             raise CompileError()
+        if (use_tree_cache and language_level == self.language_level
+                and future_directives == self.future_directives
+                and included_files == len(scope.included_files)):
+            # Only trees without side effects on the context and scope
+            # can be replayed later.
+            pxd_tree_cache.store(self, source_filename, full_module_name, tree)
         return tree
 
     def _report_decode_error(self, source_desc, exc):
@@ -426,6 +441,66 @@ class Context(object):
                 pass
             result.c_file = None
 
+class PxdTreeCache(object):
+    """
+    Process wide cache of parsed .pxd files.
+
+    Long running build workers (e.g. the processes of a parallel
+    cythonize() run) compile many modules that cimport the same
+    declaration files.  Parsing these is a large part of the fixed cost
+    of each compilation, so the parse trees are kept here and a fresh
+    copy is handed out for each new compilation.  An entry is invalidated
+    when the modification time or size of its file changes.
+    """
+
+    def __init__(self):
+        self.trees = {}
+
+    def clear(self):
+        self.trees.clear()
+
+    def _key(self, context, filename, full_module_name):
+        compile_time_env = getattr(context.options, 'compile_time_env', None)
+        if compile_time_env:
+            compile_time_env = tuple(sorted(
+                (name, repr(value)) for name, value in compile_time_env.items()))
+        return (filename, full_module_name, context.language_level,
+                frozenset(context.future_directives), tuple(context.include_directories),
+                compile_time_env)
+
+    def _fingerprint(self, filename):
+        try:
+            st = os.stat(filename)
+        except OSError:
+            return None
+        return st.st_mtime, st.st_size
+
+    def lookup(self, context, filename, full_module_name):
+        key = self._key(context, filename, full_module_name)
+        cached = self.trees.get(key)
+        if cached is None:
+            return None
+        fingerprint, tree = cached
+        if fingerprint is None or fingerprint != self._fingerprint(filename):
+            del self.trees[key]
+            return None
+        return self._copy(tree)
+
+    def store(self, context, filename, full_module_name, tree):
+        key = self._key(context, filename, full_module_name)
+        self.trees[key] = (self._fingerprint(filename), self._copy(tree))
+
+    def _copy(self, tree):
+        from .TreeFragment import copy_code_tree
+        tree = copy_code_tree(tree)
+        # modified in place by InterpretCompilerDirectives
+        tree.directive_comments = dict(tree.directive_comments)
+        return tree
+
+
+pxd_tree_cache = PxdTreeCache()
+
+
 def get_output_filename(source_filename, cwd, options):
     if options.cplus:
         c_suffix = ".cpp"
@@ -491,7 +566,12 @@ def run_pipeline(source, options, full_module_name=None, context=None):
         pipeline = Pipeline.create_pyx_pipeline(context, options, result)
 
     context.setup_errors(options, result)
-    err, enddata = Pipeline.run_pipeline(pipeline, source)
+    if options.profile_compiler:
+        from . import CompilerProfile
+        with CompilerProfile.profiling(full_module_name) as result.compiler_profile:
+            err, enddata = Pipeline.run_pipeline(pipeline, source)
+    else:
+        err, enddata = Pipeline.run_pipeline(pipeline, source)
     context.teardown_errors(err, options, result)
     return result
 
@@ -532,6 +612,17 @@ class CompilationOptions(object):
     evaluate_tree_assertions boolean  Test support: evaluate parse tree assertions
     language_level    integer   The Python language level: 2 or 3
     formal_grammar    boolean  Parse the file with the formal grammar
+    cache_pxd_trees   boolean   Reuse parsed .pxd files across compilations
+                                in the same process
+    parallel          integer   Number of processes for compiling multiple files
+    spool_c_code      boolean   Keep the finished parts of the generated C code
+                                in a temporary file instead of in memory
+    profile_compiler  string    Write the time and memory used by each compiler
+                                phase and .pxd file to this JSON file (True:
+                                only collect them in the compilation results)
+    shared_utility_module  string  Import the shared utility code from this
+                                module instead of including it (the module of
+                                this name includes and exports it)
 
     cplus             boolean   Compile as c++ code
     """
@@ -594,6 +685,7 @@ class CompilationResult(object):
     extension_file   string or None   Result of linking the object file
     num_errors       integer          Number of compilation errors
     compilation_source CompilationSource
+    compiler_profile CompilerProfile or None   With the 'profile_compiler' option
     """
 
     def __init__(self):
@@ -605,6 +697,7 @@ class CompilationResult(object):
         self.object_file = None
         self.extension_file = None
         self.main_source_file = None
+        self.compiler_profile = None
 
 
 class CompilationResultSet(dict):
@@ -640,15 +733,14 @@ def compile_multiple(sources, options):
 
     Compiles the given sequence of Pyrex implementation files and returns
     a CompilationResultSet. Performs timestamp checking and/or recursion
-    if these are specified in the options.
+    if these are specified in the options.  If the 'parallel' option is
+    set, the files are compiled by that many worker processes.
     """
-    # run_pipeline creates the context
-    # context = options.create_context()
     sources = [os.path.abspath(source) for source in sources]
     processed = set()
+    to_compile = []
     results = CompilationResultSet()
     timestamps = options.timestamps
-    verbose = options.verbose
     context = None
     cwd = os.getcwd()
     for source in sources:
@@ -658,17 +750,92 @@ def compile_multiple(sources, options):
             output_filename = get_output_filename(source, cwd, options)
             out_of_date = context.c_file_out_of_date(source, output_filename)
             if (not timestamps) or out_of_date:
-                if verbose:
-                    sys.stderr.write("Compiling %s\n" % source)
+                to_compile.append(source)
+            processed.add(source)
 
-                result = run_pipeline(source, options, context=context)
+    if options.parallel > 1 and len(to_compile) > 1:
+        fork_context = _get_fork_context()
+        if fork_context is not None:
+            for source, result in compile_in_workers(to_compile, options, fork_context):
                 results.add(source, result)
-                # Compiling multiple sources in one context doesn't quite
-                # work properly yet.
-                context = None
-            processed.add(source)
+            return results
+
+    for source in to_compile:
+        # Compiling multiple sources in one context doesn't quite
+        # work properly yet, so run_pipeline creates a new one each time.
+        results.add(source, _compile_one(source, options))
     return results
 
+
+def _compile_one(source, options):
+    if options.verbose:
+        sys.stderr.write("Compiling %s\n" % source)
+    return run_pipeline(source, options)
+
+
+def _get_fork_context():
+    try:
+        import multiprocessing
+    except ImportError:
+        return None
+    if multiprocessing.current_process().daemon:
+        # e.g. a worker of a multiprocessing pool, which cannot have children
+        return None
+    if hasattr(multiprocessing, 'get_context'):
+        try:
+            return multiprocessing.get_context('fork')
+        except ValueError:
+            return None
+    if sys.platform == 'win32':
+        return None
+    return multiprocessing  # Py<3.4 always forks on POSIX
+
+
+_worker_options = None
+
+def compile_in_workers(sources, options, fork_context):
+    """
+    Compile the first source file in this process, then fork worker
+    processes for the others.  The workers inherit the already imported
+    and initialised compiler (and the parsed .pxd files of the first
+    module) copy-on-write, so their startup is cheap and the options
+    do not need to be pickled for each task.  If the workers cannot be
+    started, the other files are compiled in this process.
+    """
+    global _worker_options
+    options = CompilationOptions(options, cache_pxd_trees=True)
+    yield sources[0], _compile_one(sources[0], options)
+
+    _worker_options = options
+    try:
+        pool = fork_context.Pool(min(options.parallel, len(sources) - 1))
+    except Exception:
+        # e.g. no working semaphores on this platform
+        _worker_options = None
+        for source in sources[1:]:
+            yield source, _compile_one(source, options)
+        return
+    try:
+        result = pool.map_async(_compile_in_worker, sources[1:], chunksize=1)
+        pool.close()
+        while not result.ready():
+            try:
+                result.get(99999)  # seconds
+            except fork_context.TimeoutError:
+                pass
+        for source_result in result.get():
+            yield source_result
+    except:
+        pool.terminate()
+        raise
+    finally:
+        _worker_options = None
+    pool.join()
+
+
+def _compile_in_worker(source):
+    return source, _compile_one(source, _worker_options)
+
 def compile(source, options = None, full_module_name = None, **kwds):
     """
     compile(source [, options], [, <option> = <value>]...)
@@ -681,9 +848,16 @@ def compile(source, options = None, full_module_name = None, **kwds):
     """
     options = CompilationOptions(defaults = options, **kwds)
     if isinstance(source, basestring) and not options.timestamps:
-        return compile_single(source, options, full_module_name)
+        result = compile_single(source, options, full_module_name)
+        results = [result]
     else:
-        return compile_multiple(source, options)
+        result = compile_multiple(source, options)
+        results = result.values()
+    if options.profile_compiler and options.profile_compiler is not True:
+        from . import CompilerProfile
+        CompilerProfile.write_report(options.profile_compiler, [
+            r.compiler_profile for r in results if r.compiler_profile is not None])
+    return result
 
 #------------------------------------------------------------------------
 #
@@ -750,7 +924,12 @@ default_options = dict(
     gdb_debug = False,
     compile_time_env = None,
     common_utility_include_dir = None,
+    shared_utility_module = None,
     output_dir=None,
     build_dir=None,
     cache=None,
+    cache_pxd_trees=False,
+    parallel=0,
+    spool_c_code=False,
+    profile_compiler=None,
 )
@@ -0,0 +1,6 @@
+from __future__ import absolute_import
+
+cimport cython
+
+cdef generate_c_code_config(env, options)
+cpdef generate_cfunction_declaration(entry, env, code, bint definition)
@@ -26,6 +26,7 @@ from . import PyrexTypes
 from .Errors import error, warning
 from .PyrexTypes import py_object_type
 from ..Utils import open_new_file, replace_suffix, decode_filename
+from ..StringIOTree import StringIOTree, StringIOSpool
 from .Code import UtilityCode
 from .StringEncoding import EncodedString
 
@@ -328,10 +329,12 @@ class ModuleNode(Nodes.Node, Nodes.BlockNode):
     def generate_c_code(self, env, options, result):
         modules = self.referenced_modules
 
+        # keep the finished parts of the C code in a temporary file
+        spool = StringIOSpool() if getattr(options, 'spool_c_code', False) else None
         if Options.annotate or options.annotate:
-            rootwriter = Annotate.AnnotationCCodeWriter()
+            rootwriter = Annotate.AnnotationCCodeWriter(buffer=StringIOTree(spool=spool))
         else:
-            rootwriter = Code.CCodeWriter()
+            rootwriter = Code.CCodeWriter(buffer=StringIOTree(spool=spool))
 
         c_code_config = generate_c_code_config(env, options)
 
@@ -339,6 +342,7 @@ class ModuleNode(Nodes.Node, Nodes.BlockNode):
             rootwriter, self,
             code_config=c_code_config,
             common_utility_include_dir=options.common_utility_include_dir,
+            shared_utility_module=options.shared_utility_module,
         )
         globalstate.initialize_main_c_code()
         h_code = globalstate['h_code']
@@ -394,6 +398,8 @@ class ModuleNode(Nodes.Node, Nodes.BlockNode):
             self._serialize_lineno_map(env, rootwriter)
         if Options.annotate or options.annotate:
             self._generate_annotations(rootwriter, result, options)
+        if spool is not None:
+            spool.close()
 
     def _generate_annotations(self, rootwriter, result, options):
         self.annotate(rootwriter)
@@ -2155,6 +2161,9 @@ class ModuleNode(Nodes.Node, Nodes.BlockNode):
         code.putln("%s = PyUnicode_FromStringAndSize(\"\", 0); %s" % (
             Naming.empty_unicode, code.error_goto_if_null(Naming.empty_unicode, self.pos)))
 
+        if code.globalstate.shared_utility_module:
+            code.put_error_if_neg(self.pos, "__Pyx_ImportSharedUtilityCode()")
+
         for ext_type in ('CyFunction', 'FusedFunction', 'Coroutine', 'Generator', 'StopAsyncIteration'):
             code.putln("#ifdef __Pyx_%s_USED" % ext_type)
             code.put_error_if_neg(self.pos, "__pyx_%s_init()" % ext_type)
@@ -2207,6 +2216,8 @@ class ModuleNode(Nodes.Node, Nodes.BlockNode):
 
         code.putln("/*--- Function export code ---*/")
         self.generate_c_function_export_code(env, code)
+        if code.globalstate.exports_shared_utility_code:
+            self.generate_shared_utility_export_code(env, code)
 
         code.putln("/*--- Type init code ---*/")
         self.generate_type_init_code(env, code)
@@ -2567,6 +2578,21 @@ class ModuleNode(Nodes.Node, Nodes.BlockNode):
                     signature,
                     code.error_goto(self.pos)))
 
+    def generate_shared_utility_export_code(self, env, code):
+        # Include all shared utility code and export it to the modules that use it.
+        env.use_utility_code(UtilityCode.load_cached("FunctionExport", "ImportExport.c"))
+        env.use_utility_code(UtilityCode.load_cached("VoidPtrExport", "ImportExport.c"))
+        for utility_code in Code.get_shared_utility_codes():
+            code.globalstate.use_utility_code(utility_code)
+            for name, _, signature, is_function in Code.get_shared_utility_declarations(utility_code)[1]:
+                if is_function:
+                    code.putln('if (__Pyx_ExportFunction("%s", (void (*)(void))%s, "%s") < 0) %s' % (
+                        name, name, signature, code.error_goto(self.pos)))
+                else:
+                    code.putln('if (__Pyx_ExportVoidPtr(%s, (void *)&%s, "%s") < 0) %s' % (
+                        code.intern_identifier(EncodedString(name)), name, signature,
+                        code.error_goto(self.pos)))
+
     def generate_type_import_code_for_module(self, module, env, code):
         # Generate type import code for all exported extension types in
         # an imported module.
@@ -79,6 +79,7 @@ modulename_cname = pyrex_prefix + "modulename"
 filetable_cname  = pyrex_prefix + "f"
 intern_tab_cname = pyrex_prefix + "intern_tab"
 kwds_cname       = pyrex_prefix + "kwds"
+nargs_cname      = pyrex_prefix + "nargs"
 lineno_cname     = pyrex_prefix + "lineno"
 clineno_cname    = pyrex_prefix + "clineno"
 cfilenm_cname    = pyrex_prefix + "cfilenm"
@@ -90,6 +91,7 @@ retval_cname     = pyrex_prefix + "r"
 reqd_kwds_cname  = pyrex_prefix + "reqd_kwds"
 self_cname       = pyrex_prefix + "self"
 stringtab_cname  = pyrex_prefix + "string_tab"
+inttab_cname     = pyrex_prefix + "int_tab"
 vtabslot_cname   = pyrex_prefix + "vtab"
 c_api_tab_cname  = pyrex_prefix + "c_api_tab"
 gilstate_cname   = pyrex_prefix + "state"
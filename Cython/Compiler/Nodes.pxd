@@ -0,0 +1,7 @@
+from __future__ import absolute_import
+
+cimport cython
+
+cpdef tuple relative_position(pos)
+cdef embed_position(pos, docstring)
+cdef tuple _analyse_signature_annotation(annotation, env)
@@ -124,15 +124,17 @@ def write_func_call(func, codewriter_class):
                 node.__class__.__name__,
                 func.__name__,
                 node.pos[1:])
-            pristine = code.buffer.stream.tell()
+            stream = code.buffer.stream
+            pristine = stream.tell()
             code.putln(marker)
-            start = code.buffer.stream.tell()
+            start = stream.tell()
             code.call_level += 4
             res = func(*args, **kwds)
             code.call_level -= 4
-            if start == code.buffer.stream.tell():
+            if code.buffer.stream is stream and start == stream.tell():
                 # no code written => undo writing marker
-                code.buffer.stream.truncate(pristine)
+                # (unless the buffer was committed in between, e.g. spooled)
+                stream.truncate(pristine)
             else:
                 marker = marker.replace('->', '<-', 1)
                 code.putln(marker)
@@ -192,6 +194,11 @@ class Node(object):
     #  is_name     boolean              Is a NameNode
     #  is_literal  boolean              Is a ConstNode
 
+    # Attributes that (nearly) every node carries are stored in slots
+    # to keep large trees small.  Everything else goes into '__dict__',
+    # use node_attributes() to get at all of them.
+    __slots__ = ('pos', 'in_nogil_context', '__dict__')
+
     is_name = 0
     is_none = 0
     is_nonecheck = 0
@@ -215,7 +222,8 @@ class Node(object):
 
     def __init__(self, pos, **kw):
         self.pos = pos
-        self.__dict__.update(kw)
+        for name, value in kw.items():
+            setattr(self, name, value)
 
     gil_message = "Operation"
 
@@ -246,6 +254,16 @@ class Node(object):
                 setattr(result, attrname, [x for x in value])
         return result
 
+    def node_attributes(self):
+        """Return a new dict of all attributes set on this node instance,
+           including those stored in slots."""
+        attrs = {}
+        for name in Node.__slots__:
+            if name != '__dict__' and hasattr(self, name):
+                attrs[name] = getattr(self, name)
+        attrs.update(self.__dict__)
+        return attrs
+
 
     #
     #  There are 3 phases of parse tree processing, applied in order to
@@ -326,7 +344,7 @@ class Node(object):
             else:
                 return repr(x)
 
-        attrs = [(key, value) for key, value in self.__dict__.items() if key not in filter_out]
+        attrs = [(key, value) for key, value in self.node_attributes().items() if key not in filter_out]
         if len(attrs) == 0:
             return "<%s (0x%x)>" % (self.__class__.__name__, id(self))
         else:
@@ -2909,6 +2927,13 @@ class DefNode(FuncDefNode):
                 self.has_fused_arguments and env.is_c_class_scope):
             del self.decorator_indirection.stats[:]
 
+        if (env.directives['fastcall'] and sig.has_generic_args and len(self.args) > nfixed
+                and not self.entry.is_special
+                and not (self.star_arg or self.starstar_arg or self.self_in_stararg)):
+            # receive the generic arguments as C array and keyword names
+            self.entry.signature = sig = copy.copy(sig)
+            sig.use_fastcall = True
+
         for i in range(min(nfixed, len(self.args))):
             arg = self.args[i]
             arg.is_generic = 0
@@ -3187,6 +3212,36 @@ class DefNodeWrapper(FuncDefNode):
     def signature_has_generic_args(self):
         return self.signature.has_generic_args
 
+    # C code to access the generic arguments, which are passed either
+    # as tuple and dict or, with METH_FASTCALL, as C array and tuple of
+    # keyword names.  Functions with */** arguments always use the former.
+
+    def arg_count_code(self):
+        if self.signature.use_fastcall:
+            return "__Pyx_NumArgs_FASTCALL(%s, %s)" % (Naming.args_cname, Naming.nargs_cname)
+        return "PyTuple_GET_SIZE(%s)" % Naming.args_cname
+
+    def arg_item_code(self, index):
+        if self.signature.use_fastcall:
+            return "__Pyx_Arg_FASTCALL(%s, %s)" % (Naming.args_cname, index)
+        return "PyTuple_GET_ITEM(%s, %s)" % (Naming.args_cname, index)
+
+    def kw_count_code(self):
+        if self.signature.use_fastcall:
+            return "__Pyx_NumKwargs_FASTCALL(%s)" % Naming.kwds_cname
+        return "PyDict_Size(%s)" % Naming.kwds_cname
+
+    def kw_values_code(self):
+        if self.signature.use_fastcall:
+            return "__Pyx_KwValues_FASTCALL(%s, %s)" % (Naming.args_cname, Naming.nargs_cname)
+        return "0"
+
+    def kw_value_code(self, name_cname):
+        if self.signature.use_fastcall:
+            return "__Pyx_GetKwValue_FASTCALL(%s, %s, %s)" % (
+                Naming.kwds_cname, self.kw_values_code(), name_cname)
+        return "PyDict_GetItem(%s, %s)" % (Naming.kwds_cname, name_cname)
+
     def generate_function_body(self, code):
         args = []
         if self.signature.has_dummy_arg:
@@ -3295,7 +3350,13 @@ class DefNodeWrapper(FuncDefNode):
             arg_code_list.append("CYTHON_UNUSED PyObject *unused")
         if entry.scope.is_c_class_scope and entry.name == "__ipow__":
             arg_code_list.append("CYTHON_UNUSED PyObject *unused")
-        if sig.has_generic_args:
+        if sig.use_fastcall:
+            code.globalstate.use_utility_code(
+                UtilityCode.load_cached("FastcallArgs", "FunctionArguments.c"))
+            arg_code_list.append(
+                "__Pyx_FastcallParams(%s, %s, %s)" % (
+                    Naming.args_cname, Naming.nargs_cname, Naming.kwds_cname))
+        elif sig.has_generic_args:
             arg_code_list.append(
                 "PyObject *%s, PyObject *%s" % (
                     Naming.args_cname, Naming.kwds_cname))
@@ -3570,15 +3631,15 @@ class DefNodeWrapper(FuncDefNode):
                 compare = '!='
             else:
                 compare = '<'
-            code.putln('} else if (PyTuple_GET_SIZE(%s) %s %d) {' % (
-                Naming.args_cname, compare, min_positional_args))
+            code.putln('} else if (%s %s %d) {' % (
+                self.arg_count_code(), compare, min_positional_args))
             code.put_goto(argtuple_error_label)
 
         if self.num_required_kw_args:
             # pure error case: keywords required but not passed
             if max_positional_args > min_positional_args and not self.star_arg:
-                code.putln('} else if (PyTuple_GET_SIZE(%s) > %d) {' % (
-                    Naming.args_cname, max_positional_args))
+                code.putln('} else if (%s > %d) {' % (
+                    self.arg_count_code(), max_positional_args))
                 code.put_goto(argtuple_error_label)
             code.putln('} else {')
             for i, arg in enumerate(kw_only_args):
@@ -3598,18 +3659,18 @@ class DefNodeWrapper(FuncDefNode):
                 # parse the exact number of positional arguments from
                 # the args tuple
                 for i, arg in enumerate(positional_args):
-                    code.putln("values[%d] = PyTuple_GET_ITEM(%s, %d);" % (i, Naming.args_cname, i))
+                    code.putln("values[%d] = %s;" % (i, self.arg_item_code(i)))
             else:
                 # parse the positional arguments from the variable length
                 # args tuple and reject illegal argument tuple sizes
-                code.putln('switch (PyTuple_GET_SIZE(%s)) {' % Naming.args_cname)
+                code.putln('switch (%s) {' % self.arg_count_code())
                 if self.star_arg:
                     code.putln('default:')
                 reversed_args = list(enumerate(positional_args))[::-1]
                 for i, arg in reversed_args:
                     if i >= min_positional_args-1:
                         code.put('case %2d: ' % (i+1))
-                    code.putln("values[%d] = PyTuple_GET_ITEM(%s, %d);" % (i, Naming.args_cname, i))
+                    code.putln("values[%d] = %s;" % (i, self.arg_item_code(i)))
                 if min_positional_args == 0:
                     code.put('case  0: ')
                 code.putln('break;')
@@ -3638,10 +3699,10 @@ class DefNodeWrapper(FuncDefNode):
             code.put_label(argtuple_error_label)
             code.globalstate.use_utility_code(
                 UtilityCode.load_cached("RaiseArgTupleInvalid", "FunctionArguments.c"))
-            code.put('__Pyx_RaiseArgtupleInvalid("%s", %d, %d, %d, PyTuple_GET_SIZE(%s)); ' % (
+            code.put('__Pyx_RaiseArgtupleInvalid("%s", %d, %d, %d, %s); ' % (
                 self.name, has_fixed_positional_count,
                 min_positional_args, max_positional_args,
-                Naming.args_cname))
+                self.arg_count_code()))
             code.putln(code.error_goto(self.pos))
 
     def generate_arg_assignment(self, arg, item, code):
@@ -3727,15 +3788,14 @@ class DefNodeWrapper(FuncDefNode):
                                         has_fixed_positional_count, has_kw_only_args,
                                         all_args, argtuple_error_label, code):
         code.putln('Py_ssize_t kw_args;')
-        code.putln('const Py_ssize_t pos_args = PyTuple_GET_SIZE(%s);' % Naming.args_cname)
+        code.putln('const Py_ssize_t pos_args = %s;' % self.arg_count_code())
         # copy the values from the args tuple and check that it's not too long
         code.putln('switch (pos_args) {')
         if self.star_arg:
             code.putln('default:')
         for i in range(max_positional_args-1, -1, -1):
             code.put('case %2d: ' % (i+1))
-            code.putln("values[%d] = PyTuple_GET_ITEM(%s, %d);" % (
-                i, Naming.args_cname, i))
+            code.putln("values[%d] = %s;" % (i, self.arg_item_code(i)))
         code.putln('case  0: break;')
         if not self.star_arg:
             code.put('default: ') # more arguments than allowed
@@ -3751,7 +3811,7 @@ class DefNodeWrapper(FuncDefNode):
 
         # If we received kwargs, fill up the positional/required
         # arguments with values from the kw dict
-        code.putln('kw_args = PyDict_Size(%s);' % Naming.kwds_cname)
+        code.putln('kw_args = %s;' % self.kw_count_code())
         if self.num_required_args or max_positional_args > 0:
             last_required_arg = -1
             for i, arg in enumerate(all_args):
@@ -3774,13 +3834,12 @@ class DefNodeWrapper(FuncDefNode):
                         continue
                     code.putln('if (kw_args > 0) {')
                     # don't overwrite default argument
-                    code.putln('PyObject* value = PyDict_GetItem(%s, %s);' % (
-                        Naming.kwds_cname, pystring_cname))
+                    code.putln('PyObject* value = %s;' % self.kw_value_code(pystring_cname))
                     code.putln('if (value) { values[%d] = value; kw_args--; }' % i)
                     code.putln('}')
                 else:
-                    code.putln('if (likely((values[%d] = PyDict_GetItem(%s, %s)) != 0)) kw_args--;' % (
-                        i, Naming.kwds_cname, pystring_cname))
+                    code.putln('if (likely((values[%d] = %s) != 0)) kw_args--;' % (
+                        i, self.kw_value_code(pystring_cname)))
                     if i < min_positional_args:
                         if i == 0:
                             # special case: we know arg 0 is missing
@@ -3830,8 +3889,9 @@ class DefNodeWrapper(FuncDefNode):
             pos_arg_count = "pos_args"
         code.globalstate.use_utility_code(
             UtilityCode.load_cached("ParseKeywords", "FunctionArguments.c"))
-        code.putln('if (unlikely(__Pyx_ParseOptionalKeywords(%s, %s, %s, values, %s, "%s") < 0)) %s' % (
+        code.putln('if (unlikely(__Pyx_ParseOptionalKeywords(%s, %s, %s, %s, values, %s, "%s") < 0)) %s' % (
             Naming.kwds_cname,
+            self.kw_values_code(),
             Naming.pykwdlist_cname,
             self.starstar_arg and self.starstar_arg.entry.cname or '0',
             pos_arg_count,
@@ -3863,8 +3923,7 @@ class DefNodeWrapper(FuncDefNode):
             else:
                 code.putln('if (kw_args == 1) {')
                 code.putln('const Py_ssize_t index = %d;' % first_optional_arg)
-            code.putln('PyObject* value = PyDict_GetItem(%s, *%s[index]);' % (
-                Naming.kwds_cname, Naming.pykwdlist_cname))
+            code.putln('PyObject* value = %s;' % self.kw_value_code('*%s[index]' % Naming.pykwdlist_cname))
             code.putln('if (value) { values[index] = value; kw_args--; }')
             if len(optional_args) > 1:
                 code.putln('}')
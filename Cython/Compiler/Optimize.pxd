@@ -0,0 +1,38 @@
+from __future__ import absolute_import
+
+cimport cython
+
+from .Visitor cimport (
+    CythonTransform, VisitorTransform, TreeVisitor, EnvTransform)
+
+cdef load_c_utility(name)
+cdef unwrap_coerced_node(node, coercion_nodes=*)
+cdef unwrap_node(node)
+cdef bint is_common_value(a, b)
+cdef filter_none_node(node)
+cdef tuple _find_single_yield_expression(node)
+cdef list _find_yield_statements(node)
+
+cdef class _YieldNodeCollector(TreeVisitor):
+    cdef public dict yield_stat_nodes
+    cdef public list yield_nodes
+
+cdef class IterationTransform(EnvTransform):
+    pass
+
+cdef class SwitchTransform(EnvTransform):
+    pass
+
+#class FlattenInListTransform(VisitorTransform, SkipDeclarations):
+
+cdef class DropRefcountingTransform(VisitorTransform):
+    pass
+
+cdef class EarlyReplaceBuiltinCalls(EnvTransform):
+    pass
+
+#class InlineDefNodeCalls(NodeRefCleanupMixin, EnvTransform):
+#class OptimizeBuiltinCalls(NodeRefCleanupMixin, MethodDispatcherTransform):
+#class ConstantFolding(VisitorTransform, SkipDeclarations):
+#class FinalOptimizePhase(CythonTransform, NodeRefCleanupMixin):
+#class ConsolidateOverflowCheck(CythonTransform):
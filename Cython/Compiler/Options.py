@@ -191,6 +191,8 @@ _directive_defaults = {
     'optimize.inline_defnode_calls': True,
     'optimize.unpack_method_calls': True,   # increases code size when True
     'optimize.use_switch': True,
+    'optimize.attribute_cache': False,  # per call site type caches for Python attribute lookups
+    'fastcall': False,  # METH_FASTCALL entry points for def functions in CPython 3.6+
 
 # remove unreachable code
     'remove_unreachable': True,
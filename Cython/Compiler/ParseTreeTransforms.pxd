@@ -46,10 +46,12 @@ cdef class ExpandInplaceOperators(EnvTransform):
 
 cdef class AlignFunctionDefinitions(CythonTransform):
     cdef dict directives
+    cdef set imported_names
     cdef scope
 
 cdef class YieldNodeCollector(TreeVisitor):
     cdef public list yields
+    cdef public list awaits
     cdef public list returns
     cdef public bint has_return_value
 
@@ -2091,7 +2091,7 @@ class ExpandInplaceOperators(EnvTransform):
             lhs, let_ref_nodes = side_effect_free_reference(lhs, setting=True)
         except ValueError:
             return node
-        dup = lhs.__class__(**lhs.__dict__)
+        dup = lhs.__class__(**lhs.node_attributes())
         binop = ExprNodes.binop_node(node.pos,
                                      operator = node.operator,
                                      operand1 = dup,
@@ -3669,7 +3669,7 @@ def print_parse_tree(f, node, level, key = None):
             except AttributeError:
                 tag = node.__class__.__name__
             f.write("%s @ %s\n" % (tag, node.pos))
-            for name, value in node.__dict__.items():
+            for name, value in node.node_attributes().items():
                 if name != 'tag' and name != 'pos':
                     print_parse_tree(f, value, level+1, name)
             return
@@ -5,6 +5,7 @@ from time import time
 
 from . import Errors
 from . import DebugFlags
+from . import CompilerProfile
 from . import Options
 from .Visitor import CythonTransform
 from .Errors import CompileError, InternalError, AbortError
@@ -328,6 +329,7 @@ def run_pipeline(pipeline, source, printtree=True):
 
     error = None
     data = source
+    profile = CompilerProfile.active_profile
     try:
         try:
             for phase in pipeline:
@@ -337,7 +339,11 @@ def run_pipeline(pipeline, source, printtree=True):
                         print("Entering pipeline phase %r" % phase)
                     if not printtree and isinstance(phase, PrintTree):
                         continue
-                    data = phase(data)
+                    if profile is not None:
+                        with profile.record('phase', CompilerProfile.phase_name(phase)):
+                            data = phase(data)
+                    else:
+                        data = phase(data)
                     if DebugFlags.debug_verbose_pipeline:
                         print("    %.3f seconds" % (time() - t))
         except CompileError as err:
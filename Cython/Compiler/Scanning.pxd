@@ -10,8 +10,8 @@ cdef get_lexicon()
 cdef initial_compile_time_env()
 
 cdef class Method:
-    cdef object name
-    cdef dict kwargs
+    cdef readonly object name
+    cdef readonly dict kwargs
     cdef readonly object __name__  # for tracing the scanner
 
 @cython.final
@@ -6,7 +6,7 @@
 from __future__ import absolute_import
 
 import cython
-cython.declare(make_lexicon=object, lexicon=object,
+cython.declare(Lexicon=object, lexicon=object,
                print_function=object, error=object, warning=object,
                os=object, platform=object)
 
@@ -17,7 +17,8 @@ from .. import Utils
 from ..Plex.Scanners import Scanner
 from ..Plex.Errors import UnrecognizedInput
 from .Errors import error, warning
-from .Lexicon import any_string_prefix, make_lexicon, IDENT
+from .Lexicon import any_string_prefix, IDENT
+from . import Lexicon
 from .Future import print_function
 
 debug_scanner = 0
@@ -31,7 +32,7 @@ lexicon = None
 def get_lexicon():
     global lexicon
     if not lexicon:
-        lexicon = make_lexicon()
+        lexicon = Lexicon.get_lexicon()
     return lexicon
 
 
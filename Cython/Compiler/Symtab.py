@@ -5,6 +5,7 @@
 from __future__ import absolute_import
 
 import copy
+import itertools
 import re
 
 try:
@@ -41,6 +42,54 @@ def c_safe_identifier(cname):
         cname = Naming.pyrex_prefix + cname
     return cname
 
+
+# The generation of each name that was declared or removed in any scope.
+# A lookup result that a scope cached from its outer scopes stays valid
+# as long as the generation of the name does not change.
+_name_generations = {}
+_generations = itertools.count(1)
+
+
+class ScopeEntries(dict):
+    """
+    The name -> Entry mapping of a Scope.  All changes to it advance the
+    generation of the names concerned, to invalidate the cached lookups.
+    """
+
+    def __setitem__(self, name, entry):
+        _name_generations[name] = next(_generations)
+        dict.__setitem__(self, name, entry)
+
+    def __delitem__(self, name):
+        _name_generations[name] = next(_generations)
+        dict.__delitem__(self, name)
+
+    def pop(self, name, *default):
+        _name_generations[name] = next(_generations)
+        return dict.pop(self, name, *default)
+
+    def popitem(self):
+        name, entry = dict.popitem(self)
+        _name_generations[name] = next(_generations)
+        return name, entry
+
+    def setdefault(self, name, entry=None):
+        _name_generations[name] = next(_generations)
+        return dict.setdefault(self, name, entry)
+
+    def update(self, *args, **kwargs):
+        for name, entry in dict(*args, **kwargs).items():
+            self[name] = entry
+
+    def clear(self):
+        for name in self:
+            _name_generations[name] = next(_generations)
+        dict.clear(self)
+
+    def __reduce__(self):
+        return (ScopeEntries, (dict(self),))
+
+
 class BufferAux(object):
     writable_needed = False
 
@@ -133,9 +182,15 @@ class Entry(object):
 
     # TODO: utility_code and utility_code_definition serves the same purpose...
 
+    # Attributes that every entry carries live in slots, the many
+    # rarely set flags below keep their class defaults in '__dict__'.
+    __slots__ = (
+        'name', 'cname', 'type', 'pos', 'init', 'scope', 'qualified_name',
+        'overloaded_alternatives', 'cf_assignments', 'cf_references',
+        'inner_entries', 'defining_entry', '__dict__')
+
     inline_func_in_pxd = False
     borrowed = 0
-    init = ""
     visibility = 'private'
     is_builtin = 0
     is_cglobal = 0
@@ -323,7 +378,8 @@ class Scope(object):
         else:
             self.qualified_name = EncodedString(name)
             self.scope_prefix = mangled_name
-        self.entries = {}
+        self.entries = ScopeEntries()
+        self._outer_lookups = {}  # name -> (entry or None, name generation)
         self.const_entries = []
         self.type_entries = []
         self.sue_entries = []
@@ -821,9 +877,20 @@ class Scope(object):
     def lookup(self, name):
         # Look up name in this scope or an enclosing one.
         # Return None if not found.
-        return (self.lookup_here(name)
-            or (self.outer_scope and self.outer_scope.lookup(name))
-            or None)
+        entry = self.lookup_here(name)
+        if entry:
+            return entry
+        outer_scope = self.outer_scope
+        if not outer_scope:
+            return None
+        # Avoid walking the chain of outer scopes again until the name
+        # gets declared (or removed) in any scope.
+        cached = self._outer_lookups.get(name)
+        if cached is not None and cached[1] == _name_generations.get(name):
+            return cached[0]
+        entry = outer_scope.lookup(name) or None
+        self._outer_lookups[name] = (entry, _name_generations.get(name))
+        return entry
 
     def lookup_here(self, name):
         # Look up in this scope only, return None if not found.
@@ -39,12 +39,13 @@ class CmdLineParserTest(TestCase):
         self.assertEqual(options.language_level, 3)
 
         options, sources = parse_command_line([
-            '-f', '-2', 'source.pyx',
+            '-f', '-2', '-j', '3', 'source.pyx',
         ])
         self.assertTrue(sources)
         self.assertTrue(len(sources) == 1)
         self.assertFalse(options.timestamps)
         self.assertEqual(options.language_level, 2)
+        self.assertEqual(options.parallel, 3)
 
     def test_long_options(self):
         options, sources = parse_command_line([
@@ -72,6 +73,14 @@ class CmdLineParserTest(TestCase):
         self.assertTrue(len(sources) == 1)
         self.assertFalse(options.timestamps)
 
+        options, sources = parse_command_line([
+            '--parallel', '4', '--spool-c-code', '--profile-compiler', 'profile.json', 'source.pyx',
+        ])
+        self.assertEqual(options.parallel, 4)
+        self.assertTrue(options.spool_c_code)
+        self.assertEqual(options.profile_compiler, 'profile.json')
+        self.assertEqual(sources, ['source.pyx'])
+
     def test_options_with_values(self):
         options, sources = parse_command_line([
             '--embed=huhu',
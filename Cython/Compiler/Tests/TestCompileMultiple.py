@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+
+from Cython.TestUtils import CythonTest
+from ..Main import CompilationOptions, default_options, compile_multiple, compile_in_workers
+
+
+class DaemonProcess(object):
+    daemon = True
+
+
+class BrokenForkContext(object):
+    def Pool(self, processes):
+        raise OSError("no semaphores")
+
+
+class TestCompileMultiple(CythonTest):
+
+    def setUp(self):
+        super(TestCompileMultiple, self).setUp()
+        self.temp_dir = tempfile.mkdtemp()
+        self.sources = []
+        for i in range(4):
+            source = os.path.join(self.temp_dir, 'mod%d.pyx' % i)
+            with open(source, 'w') as f:
+                f.write(u"from libc.math cimport sqrt\ndef f%d(x):\n    return sqrt(x)\n" % i)
+            self.sources.append(source)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        super(TestCompileMultiple, self).tearDown()
+
+    def compile(self, **kwargs):
+        options = CompilationOptions(default_options, **kwargs)
+        return compile_multiple(self.sources, options)
+
+    def read_c_files(self):
+        c_files = []
+        for source in self.sources:
+            with open(source[:-4] + '.c') as f:
+                c_files.append(f.read())
+        return c_files
+
+    def test_parallel(self):
+        results = self.compile()
+        self.assertEqual(0, results.num_errors)
+        serial_c_files = self.read_c_files()
+
+        results = self.compile(parallel=2)
+        self.assertEqual(0, results.num_errors)
+        self.assertEqual(sorted(self.sources), sorted(results))
+        for source in self.sources:
+            self.assertEqual(source[:-4] + '.c', results[source].c_file)
+        self.assertEqual(serial_c_files, self.read_c_files())
+
+    def test_parallel_errors(self):
+        with open(self.sources[2], 'w') as f:
+            f.write(u"def f(:\n")
+        results = self.compile(parallel=2)
+        self.assertEqual(1, results.num_errors)
+        self.assertEqual(1, results[self.sources[2]].num_errors)
+
+    def test_parallel_in_daemon(self):
+        # pool workers cannot start processes themselves, compile serially
+        import multiprocessing
+        current_process = multiprocessing.current_process
+        multiprocessing.current_process = DaemonProcess
+        try:
+            results = self.compile(parallel=2)
+        finally:
+            multiprocessing.current_process = current_process
+        self.assertEqual(0, results.num_errors)
+        self.assertEqual(sorted(self.sources), sorted(results))
+
+    def test_pool_failure(self):
+        options = CompilationOptions(default_options, parallel=2)
+        results = dict(compile_in_workers(self.sources, options, BrokenForkContext()))
+        self.assertEqual(sorted(self.sources), sorted(results))
+        for source in self.sources:
+            self.assertEqual(0, results[source].num_errors)
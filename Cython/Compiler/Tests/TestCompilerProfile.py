@@ -0,0 +1,91 @@
+import os
+import json
+import shutil
+import tempfile
+
+from Cython.TestUtils import CythonTest
+from ..Main import compile
+from .. import CompilerProfile
+
+
+class TestCompilerProfile(CythonTest):
+
+    def setUp(self):
+        super(TestCompilerProfile, self).setUp()
+        self.temp_dir = tempfile.mkdtemp()
+        self.report = os.path.join(self.temp_dir, 'profile.json')
+        self.sources = []
+        for i in range(3):
+            source = os.path.join(self.temp_dir, 'mod%d.pyx' % i)
+            with open(source, 'w') as f:
+                f.write(u"from libc.math cimport sqrt\ndef f%d(x):\n    return sqrt(x)\n" % i)
+            self.sources.append(source)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        super(TestCompilerProfile, self).tearDown()
+
+    def read_report(self):
+        with open(self.report) as f:
+            return json.load(f)
+
+    def assert_module_events(self, report, module_names):
+        events = report['traceEvents']
+        self.assertEqual(
+            sorted(module_names),
+            sorted(event['name'] for event in events if event['cat'] == 'module'))
+        for event in events:
+            self.assertEqual('X', event['ph'])
+            self.assertTrue(event['dur'] >= 0)
+            self.assertTrue(event['args']['module'] in module_names)
+
+        summary = report['summary']
+        self.assertEqual(len(module_names), summary['pxd']['libc.math']['count'])
+        self.assertTrue('parse' in summary['phase'])
+        self.assertTrue(summary['phase']['parse']['count'] >= len(module_names))
+        for name in module_names:
+            self.assertEqual(1, summary['module'][name]['count'])
+
+    def test_single(self):
+        result = compile(self.sources[0], profile_compiler=self.report)
+        self.assertEqual(0, result.num_errors)
+        self.assertEqual('mod0', result.compiler_profile.module_name)
+        self.assertTrue(CompilerProfile.active_profile is None)
+        self.assert_module_events(self.read_report(), ['mod0'])
+
+    def test_collect_only(self):
+        result = compile(self.sources[0], profile_compiler=True)
+        self.assertEqual(0, result.num_errors)
+        self.assertFalse(os.path.exists(self.report))
+        categories = set(event['cat'] for event in result.compiler_profile.events)
+        self.assertEqual(set(['module', 'phase', 'pxd']), categories)
+
+    def test_disabled(self):
+        result = compile(self.sources[0])
+        self.assertTrue(result.compiler_profile is None)
+
+    def test_parallel(self):
+        results = compile(self.sources, parallel=2, profile_compiler=self.report)
+        self.assertEqual(0, results.num_errors)
+        self.assert_module_events(self.read_report(), ['mod0', 'mod1', 'mod2'])
+
+    def test_parallel_in_daemon(self):
+        # the modules are compiled serially, the report must still cover all
+        import multiprocessing
+        from .TestCompileMultiple import DaemonProcess
+        current_process = multiprocessing.current_process
+        multiprocessing.current_process = DaemonProcess
+        try:
+            results = compile(self.sources, parallel=2, profile_compiler=self.report)
+        finally:
+            multiprocessing.current_process = current_process
+        self.assertEqual(0, results.num_errors)
+        self.assert_module_events(self.read_report(), ['mod0', 'mod1', 'mod2'])
+
+    def test_phase_name(self):
+        from ..Visitor import PrintTree
+
+        def parse(source):
+            return source
+        self.assertEqual('parse', CompilerProfile.phase_name(parse))
+        self.assertEqual('PrintTree', CompilerProfile.phase_name(PrintTree()))
@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from Cython.Compiler import Lexicon, Scanning
+from Cython.Compiler.TreeFragment import StringParseContext, StringIO
+
+
+def machine_states(lexicon):
+    machine = lexicon.machine
+    states = [
+        (state['number'], repr(state['action']),
+         sorted((event, target['number'] if target is not None else None)
+                for event, target in state.items() if event not in ('number', 'action')))
+        for state in machine.states]
+    initial_states = sorted((name, state['number']) for name, state in machine.initial_states.items())
+    return initial_states, states
+
+
+class TestLexicon(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, Lexicon.lexicon_file_name)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_save_load(self):
+        lexicon = Lexicon.make_lexicon()
+        Lexicon.save_lexicon(lexicon, self.path)
+        loaded = Lexicon.load_lexicon(self.path, Lexicon.lexicon_key())
+        self.assertTrue(loaded is not None)
+        self.assertEqual(machine_states(lexicon), machine_states(loaded))
+
+    def test_stale(self):
+        Lexicon.save_lexicon(Lexicon.make_lexicon(), self.path, key='other')
+        self.assertTrue(Lexicon.load_lexicon(self.path, Lexicon.lexicon_key()) is None)
+        self.assertTrue(Lexicon.load_lexicon(os.path.join(self.temp_dir, 'missing'), None) is None)
+
+    def test_key_of_compiled_module(self):
+        # The key must match that of the pure Python module that the
+        # tables were generated with.
+        key = Lexicon.lexicon_key()
+        module_file = Lexicon.__file__
+        Lexicon.__file__ = os.path.join(
+            os.path.dirname(module_file), 'Lexicon.cpython-36m-x86_64-linux-gnu.so')
+        try:
+            self.assertEqual(key, Lexicon.lexicon_key())
+        finally:
+            Lexicon.__file__ = module_file
+
+    def test_scan(self):
+        if not hasattr(Scanning, 'lexicon'):
+            # compiled module, the global lexicon cannot be replaced
+            return
+        Lexicon.save_lexicon(Lexicon.make_lexicon(), self.path)
+        lexicon = Lexicon.load_lexicon(self.path, Lexicon.lexicon_key())
+
+        code = u"def f(x):\n    return x[1] + 0x1_0 + 'a\\n' # comment\n"
+        def scan(lexicon):
+            context = StringParseContext(u"test")
+            scope = context.find_module(u"test", pos=(u"test", 1, 0), need_pxd=False)
+            source = Scanning.StringSourceDescriptor(u"test", code)
+            orig_lexicon, Scanning.lexicon = Scanning.lexicon, lexicon
+            try:
+                scanner = Scanning.PyrexScanner(StringIO(code), source, scope=scope, context=context)
+                tokens = []
+                while scanner.sy != 'EOF':
+                    tokens.append((scanner.sy, scanner.systring))
+                    scanner.next()
+            finally:
+                Scanning.lexicon = orig_lexicon
+            return tokens
+        tokens = scan(lexicon)
+        self.assertEqual(scan(Lexicon.make_lexicon()), tokens)
+        self.assertTrue(('INT', u'0x10') in tokens, tokens)
+
+
+if __name__ == '__main__':
+    unittest.main()
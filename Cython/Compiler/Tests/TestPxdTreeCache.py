@@ -0,0 +1,53 @@
+import os
+import shutil
+import tempfile
+
+from Cython.TestUtils import CythonTest, treetypes
+from ..Main import CompilationOptions, default_options, pxd_tree_cache
+from ..Scanning import FileSourceDescriptor
+from ..Symtab import ModuleScope
+
+
+class TestPxdTreeCache(CythonTest):
+
+    def setUp(self):
+        super(TestPxdTreeCache, self).setUp()
+        self.temp_dir = tempfile.mkdtemp()
+        self.pxd_file = os.path.join(self.temp_dir, 'cached.pxd')
+        self.write_pxd(u"cdef int x\n")
+        pxd_tree_cache.clear()
+
+    def tearDown(self):
+        pxd_tree_cache.clear()
+        shutil.rmtree(self.temp_dir)
+        super(TestPxdTreeCache, self).tearDown()
+
+    def write_pxd(self, code):
+        with open(self.pxd_file, 'w') as f:
+            f.write(code)
+
+    def parse(self, cache_pxd_trees=True):
+        options = CompilationOptions(default_options, cache_pxd_trees=cache_pxd_trees)
+        context = options.create_context()
+        scope = ModuleScope('cached', None, context)
+        return context.parse(FileSourceDescriptor(self.pxd_file), scope,
+                             pxd=True, full_module_name='cached')
+
+    def test_disabled(self):
+        self.parse(cache_pxd_trees=False)
+        self.assertEqual(0, len(pxd_tree_cache.trees))
+
+    def test_reuse(self):
+        tree1 = self.parse()
+        self.assertEqual(1, len(pxd_tree_cache.trees))
+        tree2 = self.parse()
+        self.assertEqual(1, len(pxd_tree_cache.trees))
+        self.assertFalse(tree1 is tree2)
+        self.assertFalse(tree1.body is tree2.body)
+        self.assertEqual(treetypes(tree1), treetypes(tree2))
+
+    def test_invalidate(self):
+        self.parse()
+        self.write_pxd(u"cdef int x\ncdef int y\n")
+        tree = self.parse()
+        self.assertEqual(2, len(tree.body.stats))
@@ -0,0 +1,45 @@
+from Cython.TestUtils import CythonTest
+from ..Main import CompilationOptions, default_options
+from .. import Symtab
+from ..PyrexTypes import py_object_type, c_int_type
+
+
+class TestScopeLookup(CythonTest):
+
+    def setUp(self):
+        super(TestScopeLookup, self).setUp()
+        context = CompilationOptions(default_options).create_context()
+        self.module_scope = Symtab.ModuleScope('mod', None, context)
+        self.module_scope.declare_var('x', c_int_type, None, is_cdef=True)
+        self.scopes = [self.module_scope]
+        for i in range(4):
+            self.scopes.append(Symtab.LocalScope('f%d' % i, self.scopes[-1]))
+        self.inner_scope = self.scopes[-1]
+
+    def test_outer_lookup(self):
+        entry = self.inner_scope.lookup('x')
+        self.assertTrue(entry is self.module_scope.lookup_here('x'))
+        self.assertTrue(self.inner_scope.lookup('x') is entry)
+        self.assertTrue(self.inner_scope.lookup('len').scope.is_builtin_scope)
+        self.assertTrue(self.inner_scope.lookup('undeclared') is None)
+
+    def test_declaration_invalidates(self):
+        self.assertTrue(self.inner_scope.lookup('y') is None)
+        entry = self.module_scope.declare_var('y', py_object_type, None)
+        self.assertTrue(self.inner_scope.lookup('y') is entry)
+
+        # shadowing in an intermediate scope
+        self.assertTrue(self.inner_scope.lookup('x').scope is self.module_scope)
+        entry = self.scopes[2].declare_var('x', py_object_type, None)
+        self.assertTrue(self.inner_scope.lookup('x') is entry)
+
+    def test_entry_changes_invalidate(self):
+        outer_scope = self.scopes[1]
+        entry = outer_scope.declare_var('z', py_object_type, None)
+        self.assertTrue(self.inner_scope.lookup('z') is entry)
+        del outer_scope.entries['z']
+        self.assertTrue(self.inner_scope.lookup('z') is None)
+        outer_scope.entries.update(z=entry)
+        self.assertTrue(self.inner_scope.lookup('z') is entry)
+        outer_scope.entries.pop('z')
+        self.assertTrue(self.inner_scope.lookup('z') is None)
@@ -1,5 +1,6 @@
 from Cython.TestUtils import CythonTest
 from Cython.Compiler.TreeFragment import *
+from Cython.Compiler.TreeFragment import _parsed_fragments
 from Cython.Compiler.Nodes import *
 from Cython.Compiler.UtilNodes import *
 import Cython.Compiler.Naming as Naming
@@ -59,6 +60,22 @@ class TestTreeFragments(CythonTest):
         self.assert_(isinstance(s[1].rhs, TempRefNode))
         self.assert_(s[0].expr.handle is s[1].rhs.handle)
 
+    def test_parsed_once(self):
+        code = u"x = cached_fragment_test + 1"
+        F1 = TreeFragment(code)
+        parsed = _parsed_fragments[("(tree fragment)", code, (), None)]
+        F2 = TreeFragment(code)
+        self.assert_(parsed is _parsed_fragments[("(tree fragment)", code, (), None)])
+        self.assert_(F1.root is not F2.root and F1.root is not parsed)
+        F1.root.stats[0].lhs.name = u"other"
+        self.assertCode(u"x = cached_fragment_test + 1", F2.root)
+        self.assertCode(u"x = cached_fragment_test + 1", TreeFragment(code).root)
+
+    def test_initial_pos_not_cached(self):
+        code = u"uncached_fragment_test"
+        TreeFragment(code, initial_pos=("test", 3, 0))
+        self.assert_(("(tree fragment)", code, (), None) not in _parsed_fragments)
+
 if __name__ == "__main__":
     import unittest
     unittest.main()
@@ -1,3 +1,6 @@
+import os
+import shutil
+import tempfile
 import unittest
 
 from Cython.Compiler import Code, UtilityCode
@@ -99,3 +102,50 @@ class TestCythonUtilityLoader(TestTempitaUtilityLoader):
 
     test_load = TestUtilityLoader.test_load
     test_load_tempita = TestTempitaUtilityLoader.test_load
+
+
+class TestUtilityBundle(unittest.TestCase):
+    """
+    Test the pre-parsed utility code bundle
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, Code.utility_bundle_file_name)
+        self.get_utility_bundle = Code.get_utility_bundle
+
+    def tearDown(self):
+        Code.get_utility_bundle = self.get_utility_bundle
+        shutil.rmtree(self.temp_dir)
+
+    def test_save_load(self):
+        bundle = Code.build_utility_bundle()
+        self.assertTrue('TestUtilityLoader.c' in bundle)
+        key = Code.utility_bundle_key()
+        Code.save_utility_bundle(bundle, self.path, key)
+        loaded = Code.load_utility_bundle(self.path, key)
+        self.assertEqual(sorted(bundle), sorted(loaded))
+        content_hash, utilities, templates = loaded['TestUtilityLoader.c']
+        self.assertEqual(Code.UtilityCodeBase.read_utilities_from_file('TestUtilityLoader.c'), utilities)
+        self.assertTrue(templates)
+
+    def test_stale(self):
+        Code.save_utility_bundle({}, self.path, 'other')
+        self.assertTrue(Code.load_utility_bundle(self.path, Code.utility_bundle_key()) is None)
+        self.assertTrue(Code.load_utility_bundle(os.path.join(self.temp_dir, 'missing')) is None)
+
+    def test_key_of_compiled_module(self):
+        key = Code.utility_bundle_key()
+        module_file = Code.__file__
+        Code.__file__ = os.path.join(
+            os.path.dirname(module_file), 'Code.cpython-36m-x86_64-linux-gnu.so')
+        try:
+            self.assertEqual(key, Code.utility_bundle_key())
+        finally:
+            Code.__file__ = module_file
+
+    def test_modified_file(self):
+        utilities = Code.UtilityCodeBase.read_utilities_from_file('TestUtilityLoader.c')
+        Code.get_utility_bundle = lambda: {'TestUtilityLoader.c': ('0' * 32, utilities, {})}
+        self.assertTrue(Code.get_bundled_utilities('TestUtilityLoader.c') is None)
+        self.assertTrue(Code.get_bundled_utilities('Missing.c') is None)
@@ -1,7 +1,8 @@
+from Cython.Compiler import ExprNodes, Visitor
 from Cython.Compiler.ModuleNode import ModuleNode
 from Cython.Compiler.Symtab import ModuleScope
-from Cython.TestUtils import TransformTest
-from Cython.Compiler.Visitor import MethodDispatcherTransform
+from Cython.TestUtils import CythonTest, TransformTest
+from Cython.Compiler.Visitor import CythonTransform, MethodDispatcherTransform
 from Cython.Compiler.ParseTreeTransforms import (
     NormalizeTree, AnalyseDeclarationsTransform,
     AnalyseExpressionsTransform, InterpretCompilerDirectives)
@@ -59,3 +60,37 @@ class TestMethodDispatcherTransform(TransformTest):
         Test(None)(tree)
         self.assertEqual(1, calls['bytes'])
         self.assertEqual(0, calls['object'])
+
+
+class TestVisitorDispatch(CythonTest):
+
+    def test_skip_leaf_nodes(self):
+        visited = []
+        class Test(CythonTransform):
+            def visit_NameNode(self, node):
+                visited.append(node.name)
+                return node
+
+        tree = self.fragment(u"x = y + 1").root
+        Test(None)(tree)
+        self.assertEqual(['x', 'y'], visited)
+        handler_names = Visitor._handler_names[Test]
+        self.assertEqual('visit_NameNode', handler_names[ExprNodes.NameNode])
+        self.assertEqual('visit_Node', handler_names[ExprNodes.AddNode])
+        self.assertTrue(handler_names[ExprNodes.IntNode] is None)
+
+        # shared by all instances
+        Test(None)(tree)
+        self.assertEqual(['x', 'y', 'x', 'y'], visited)
+
+    def test_overridden_visit_node(self):
+        visited = []
+        class Test(CythonTransform):
+            def visit_Node(self, node):
+                visited.append(type(node).__name__)
+                self.visitchildren(node)
+                return node
+
+        Test(None)(self.fragment(u"x = y + 1").root)
+        self.assertTrue('IntNode' in visited)
+        self.assertEqual('visit_Node', Visitor._handler_names[Test][ExprNodes.IntNode])
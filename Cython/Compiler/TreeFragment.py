@@ -214,6 +214,36 @@ def strip_common_indent(lines):
     return lines
 
 
+# (name, code, pxds, level) -> parsed fragment tree
+_parsed_fragments = {}
+
+
+def parse_fragment(name, code, pxds=None, level=None, initial_pos=None):
+    """
+    Parses a code fragment into a StatListNode.
+
+    Fragments without an explicit initial position are parsed only once
+    per process; each call returns a fresh copy of the cached tree.
+    """
+    key = None
+    if initial_pos is None:
+        key = (name, code, tuple(sorted((pxds or {}).items())), level)
+        tree = _parsed_fragments.get(key)
+        if tree is not None:
+            return copy_code_tree(tree)
+
+    mod = tree = parse_from_strings(name, code, pxds, level=level, initial_pos=initial_pos)
+    if level is None:
+        tree = tree.body # Make sure a StatListNode is at the top
+    if not isinstance(tree, StatListNode):
+        tree = StatListNode(pos=mod.pos, stats=[tree])
+
+    if key is not None:
+        _parsed_fragments[key] = tree
+        tree = copy_code_tree(tree)
+    return tree
+
+
 class TreeFragment(object):
     def __init__(self, code, name=None, pxds=None, temps=None, pipeline=None, level=None, initial_pos=None):
         if pxds is None:
@@ -232,11 +262,7 @@ class TreeFragment(object):
             fmt_pxds = {}
             for key, value in pxds.items():
                 fmt_pxds[key] = fmt(value)
-            mod = t = parse_from_strings(name, fmt_code, fmt_pxds, level=level, initial_pos=initial_pos)
-            if level is None:
-                t = t.body # Make sure a StatListNode is at the top
-            if not isinstance(t, StatListNode):
-                t = StatListNode(pos=mod.pos, stats=[t])
+            t = parse_fragment(name, fmt_code, fmt_pxds, level=level, initial_pos=initial_pos)
             for transform in pipeline:
                 if transform is None:
                     continue
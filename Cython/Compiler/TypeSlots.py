@@ -18,6 +18,7 @@ class Signature(object):
     #
     #  has_dummy_arg      boolean
     #  has_generic_args   boolean
+    #  use_fastcall       boolean   Receive the generic args with METH_FASTCALL
     #  fixed_arg_format   string
     #  ret_format         string
     #  error_value        string
@@ -46,7 +47,8 @@ class Signature(object):
     #    '-'  dummy 'self' argument (not used)
     #    '*'  rest of args passed as generic Python
     #           arg tuple and kw dict (must be last
-    #           char in format string)
+    #           char in format string), or as C array
+    #           and keyword names if 'use_fastcall' is set
 
     format_map = {
         'O': PyrexTypes.py_object_type,
@@ -98,6 +100,7 @@ class Signature(object):
         self.error_value = self.error_value_map.get(ret_format, None)
         self.exception_check = ret_format != 'r' and self.error_value is not None
         self.is_staticmethod = False
+        self.use_fastcall = False
 
     def __repr__(self):
         return '<Signature[%s(%s%s)]>' % (
@@ -156,6 +159,8 @@ class Signature(object):
                 full_args = "O" + full_args
             if full_args in ["O", "T"]:
                 if self.has_generic_args:
+                    if self.use_fastcall:
+                        return [method_fastcall]
                     return [method_varargs, method_keywords]
                 else:
                     return [method_noargs]
@@ -888,3 +893,4 @@ method_onearg   = "METH_O"
 method_varargs  = "METH_VARARGS"
 method_keywords = "METH_KEYWORDS"
 method_coexist  = "METH_COEXIST"
+method_fastcall = "__Pyx_METH_FASTCALL"  # METH_VARARGS|METH_KEYWORDS where unavailable
@@ -9,6 +9,7 @@ cdef class TreeVisitor:
     cpdef visit(self, obj)
     cdef _visit(self, obj)
     cdef find_handler(self, obj)
+    cdef _find_handler_name(self, obj)
     cdef _visitchild(self, child, parent, attrname, idx)
     cdef dict _visitchildren(self, parent, attrs)
     cpdef visitchildren(self, parent, attrs=*)
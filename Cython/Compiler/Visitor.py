@@ -70,6 +70,10 @@ class TreeVisitor(object):
     in 3 [(SampleNode(0), 'body', 1)]
     out 3
     out 0
+
+    The handler for each node class is looked up once per visitor class
+    and shared by all of its instances.  Nodes without children are not
+    visited at all if their handler would only recurse into them.
     """
     def __init__(self):
         super(TreeVisitor, self).__init__()
@@ -150,15 +154,35 @@ class TreeVisitor(object):
 
     @cython.final
     def find_handler(self, obj):
+        """
+        Returns the bound handler method for obj, or None if obj can be
+        left alone.
+        """
+        cls = type(obj)
+        handler_names = _handler_names.get(type(self))
+        if handler_names is None:
+            handler_names = _handler_names[type(self)] = {}
+        try:
+            handler_name = handler_names[cls]
+        except KeyError:
+            handler_name = handler_names[cls] = self._find_handler_name(obj)
+        if handler_name is None:
+            return None
+        return getattr(self, handler_name)
+
+    @cython.final
+    def _find_handler_name(self, obj):
         # to resolve, try entire hierarchy
         cls = type(obj)
         pattern = "visit_%s"
         mro = inspect.getmro(cls)
-        handler_method = None
         for mro_cls in mro:
-            handler_method = getattr(self, pattern % mro_cls.__name__, None)
-            if handler_method is not None:
-                return handler_method
+            handler_name = pattern % mro_cls.__name__
+            if getattr(self, handler_name, None) is not None:
+                if not _has_children(cls) and getattr(type(self), handler_name, None) in _passthrough_handlers:
+                    # visiting would not do anything
+                    return None
+                return handler_name
         print(type(self), cls)
         if self.access_path:
             print(self.access_path)
@@ -177,6 +201,8 @@ class TreeVisitor(object):
             except KeyError:
                 handler_method = self.find_handler(obj)
                 self.dispatch_table[type(obj)] = handler_method
+            if handler_method is None:
+                return obj
             return handler_method(obj)
         except Errors.CompileError:
             raise
@@ -224,6 +250,14 @@ class TreeVisitor(object):
         return result
 
 
+def _has_children(cls):
+    child_attrs = getattr(cls, 'child_attrs', None)
+    if isinstance(child_attrs, property):
+        # ExprNode
+        child_attrs = getattr(cls, 'subexprs', None)
+    return bool(child_attrs)
+
+
 class VisitorTransform(TreeVisitor):
     """
     A tree transform is a base class for visitors that wants to do stream
@@ -296,6 +330,14 @@ class CythonTransform(VisitorTransform):
         self.visitchildren(node)
         return node
 
+# visitor class -> {node class -> name of its handler method or None}
+_handler_names = {}
+
+# handlers that only visit the children of a node
+# (looked up by name, as the compiled module would otherwise refer to the C method)
+_passthrough_handlers = (getattr(VisitorTransform, 'recurse_to_children'), CythonTransform.visit_Node)
+
+
 class ScopeTrackingTransform(CythonTransform):
     # Keeps track of type of scopes
     #scope_type: can be either of 'module', 'function', 'cclass', 'pyclass', 'struct'
@@ -1,5 +1,14 @@
+import os
 import sys
 
+from distutils import log, sysconfig
+from distutils.dep_util import newer_group
+
+try:
+    import hashlib
+except ImportError:
+    import md5 as hashlib
+
 if 'setuptools' in sys.modules:
     try:
         from setuptools.command.build_ext import build_ext as _build_ext
@@ -19,5 +28,205 @@ class new_build_ext(_build_ext, object):
                 self.distribution.ext_modules)
         super(new_build_ext, self).finalize_options()
 
+
+class cached_build_ext(new_build_ext):
+    """
+    A build_ext command that keeps the compiled extension modules in a
+    cache (see Cython.Build.Cache) and restores them from there instead of
+    running the C compiler if an extension with the same C sources, compiler
+    command line and Python ABI has been built before.  The same cache also
+    serves as cythonize() cache for the generated C files.
+
+    Only the files listed in the sources and 'depends' of an extension are
+    part of the cache key, just like for the distutils timestamp checks.
+    """
+
+    user_options = _build_ext.user_options + [
+        ('cache=', None,
+         "directory or URL of the cache for generated C files and extension modules"),
+        ('cache-size=', None,
+         "maximum size of the cache directory in bytes"),
+    ]
+
+    def initialize_options(self):
+        super(cached_build_ext, self).initialize_options()
+        self.cache = None
+        self.cache_size = None
+
+    def finalize_options(self):
+        if self.cache is None:
+            self.cache = os.environ.get('CYTHON_BUILD_CACHE')
+        if self.cache_size is not None:
+            self.cache_size = int(self.cache_size)
+        if self.distribution.ext_modules:
+            from Cython.Build.Dependencies import cythonize
+            options = {}
+            if self.cache:
+                options['cache'] = self.cache
+            self.distribution.ext_modules[:] = cythonize(
+                self.distribution.ext_modules, **options)
+        # extensions are cythonized already, skip new_build_ext
+        _build_ext.finalize_options(self)
+
+    def run(self):
+        super(cached_build_ext, self).run()
+        if self.cache:
+            from Cython.Build.Cache import open_cache, default_cache_size
+            open_cache(self.cache).cleanup(self.cache_size or default_cache_size)
+
+    def build_extension(self, ext):
+        if not self.cache:
+            return super(cached_build_ext, self).build_extension(ext)
+        from Cython.Build.Cache import open_cache
+        ext_path = self.get_ext_fullpath(ext.name)
+        if not (self.force or newer_group(list(ext.sources) + list(ext.depends), ext_path, 'newer')):
+            # up to date, let distutils report it
+            return super(cached_build_ext, self).build_extension(ext)
+
+        cache = open_cache(self.cache)
+        key = self.extension_cache_key(ext, ext_path)
+        if key is not None and not self.force:
+            self.mkpath(os.path.dirname(ext_path))
+            if cache.load(key, ext_path):
+                log.info("restored '%s' extension from cache", ext.name)
+                return
+        super(cached_build_ext, self).build_extension(ext)
+        if key is not None and os.path.exists(ext_path):
+            cache.store(key, ext_path)
+
+    def extension_cache_key(self, ext, ext_path):
+        """
+        Return the cache key for the extension module, or None if the
+        build inputs cannot be determined.
+        """
+        m = hashlib.md5()
+        def update(value):
+            m.update(repr(value).encode('UTF-8'))
+            m.update(b'\0')
+
+        update(python_abi())
+        compiler = self.compiler
+        update(getattr(compiler, 'compiler_type', None))
+        for attr in ('compiler_so', 'compiler_cxx', 'linker_so', 'include_dirs', 'macros',
+                     'libraries', 'library_dirs', 'runtime_library_dirs', 'objects'):
+            update(getattr(compiler, attr, None))
+        for attr in ('language', 'define_macros', 'undef_macros', 'include_dirs',
+                     'extra_compile_args', 'extra_link_args', 'libraries', 'library_dirs',
+                     'runtime_library_dirs', 'extra_objects', 'export_symbols'):
+            update(getattr(ext, attr, None))
+        update(self.debug)
+        for filename in list(ext.sources) + sorted(ext.depends):
+            update(os.path.basename(filename))
+            try:
+                with open(filename, 'rb') as f:
+                    m.update(f.read())
+            except IOError:
+                if filename in ext.sources:
+                    return None
+        return "%s-%s" % (os.path.basename(ext_path), m.hexdigest())
+
+
+class pipelined_build_ext(new_build_ext):
+    """
+    A build_ext command that overlaps the Cython translation and the C
+    compilation: each extension is passed on to the C compiler as soon as
+    its C file has been generated, instead of waiting for all modules to be
+    translated first.
+
+    Both stages share the same number of parallel jobs (see '--parallel',
+    which defaults to the number of CPUs).  The Cython compiler runs in a
+    process pool, the C compiler is run from threads of this process.
+    """
+
+    if not [option for option in _build_ext.user_options if option[0] == 'parallel=']:
+        # Py<3.5
+        user_options = _build_ext.user_options + [
+            ('parallel=', 'j', "number of parallel build jobs"),
+        ]
+
+    def initialize_options(self):
+        super(pipelined_build_ext, self).initialize_options()
+        if not hasattr(self, 'parallel'):
+            self.parallel = None
+
+    def finalize_options(self):
+        # the extensions are cythonized in build_extensions(), skip new_build_ext
+        _build_ext.finalize_options(self)
+        if isinstance(self.parallel, str):
+            self.parallel = int(self.parallel)
+
+    def build_extensions(self):
+        self.check_extensions_list(self.extensions)
+        # cythonize() returns new Extension objects with the C sources,
+        # possibly several for one (glob) entry
+        self._cythonized = [None] * len(self.extensions)
+        try:
+            import multiprocessing
+            from multiprocessing.pool import ThreadPool
+            jobs = self.parallel or multiprocessing.cpu_count()
+        except (ImportError, NotImplementedError):
+            jobs = 0
+        if jobs <= 1 or len(self.extensions) <= 1:
+            for i, ext in enumerate(self.extensions):
+                self._build_cythonized(i, _cythonize_extension(ext, self.force))
+            self._update_extensions()
+            return
+
+        from Cython.Build.Dependencies import estimate_compile_times, _init_multiprocessing_helper
+        sources = [ext.sources[0] for ext in self.extensions if ext.sources]
+        estimated_times = estimate_compile_times(sources)
+        def estimated_time(i):
+            ext_sources = self.extensions[i].sources
+            return estimated_times[ext_sources[0]] if ext_sources else 0
+        order = sorted(range(len(self.extensions)), key=lambda i: -estimated_time(i))
+
+        process_pool = multiprocessing.Pool(jobs, initializer=_init_multiprocessing_helper)
+        thread_pool = ThreadPool(jobs)
+        def build(i):
+            # Each thread occupies one job slot, either while waiting for
+            # the translation in the process pool or while running the C compiler.
+            extensions = process_pool.apply(_cythonize_extension, (self.extensions[i], self.force))
+            self._build_cythonized(i, extensions)
+        try:
+            result = thread_pool.map_async(build, order, chunksize=1)
+            while not result.ready():
+                result.wait(99999)  # seconds
+            result.get()
+        except:
+            process_pool.terminate()
+            thread_pool.terminate()
+            raise
+        process_pool.close()
+        thread_pool.close()
+        process_pool.join()
+        thread_pool.join()
+        self._update_extensions()
+
+    def _build_cythonized(self, i, extensions):
+        self._cythonized[i] = extensions
+        for ext in extensions:
+            self.build_extension(ext)
+
+    def _update_extensions(self):
+        # keep all built extensions for get_outputs()
+        self.extensions[:] = [ext for extensions in self._cythonized for ext in extensions]
+
+
+def _cythonize_extension(ext, force):
+    if not ext.sources:
+        # nothing to translate, left to distutils
+        return [ext]
+    from Cython.Build.Dependencies import cythonize
+    return cythonize([ext], force=force)
+
+
+def python_abi():
+    """
+    Identifies the ABI that the extension modules of this Python are built for.
+    """
+    return (sys.platform, sys.version, sys.maxsize, sys.maxunicode,
+            sysconfig.get_config_var('SOABI'),
+            sysconfig.get_config_var('EXT_SUFFIX') or sysconfig.get_config_var('SO'))
+
 # This will become new_build_ext in the future.
 from .old_build_ext import old_build_ext as build_ext
@@ -4,17 +4,17 @@ cdef class Action:
   cpdef same_as(self, other)
 
 cdef class Return(Action):
-  cdef object value
+  cdef readonly object value
   cdef perform(self, token_stream, text)
   cpdef same_as(self, other)
 
 cdef class Call(Action):
-  cdef object function
+  cdef readonly object function
   cdef perform(self, token_stream, text)
   cpdef same_as(self, other)
 
 cdef class Begin(Action):
-  cdef object state_name
+  cdef readonly object state_name
   cdef perform(self, token_stream, text)
   cpdef same_as(self, other)
 
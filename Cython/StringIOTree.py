@@ -1,3 +1,5 @@
+import tempfile
+
 try:
     from cStringIO import StringIO
 except ImportError:
@@ -9,12 +11,13 @@ class StringIOTree(object):
     See module docs.
     """
 
-    def __init__(self, stream=None):
+    def __init__(self, stream=None, spool=None):
         self.prepended_children = []
         if stream is None:
             stream = StringIO()
         self.stream = stream
-        self.write = stream.write
+        self.spool = spool
+        self.write = stream.write if spool is None else self._write_spooled
         self.markers = []
 
     def getvalue(self):
@@ -34,12 +37,22 @@ class StringIOTree(object):
     def commit(self):
         # Save what we have written until now so that the buffer
         # itself is empty -- this makes it ready for insertion
-        if self.stream.tell():
-            self.prepended_children.append(StringIOTree(self.stream))
+        size = self.stream.tell()
+        if size:
+            stream = self.stream
+            if self.spool is not None and size >= self.spool.min_size:
+                stream = self.spool.store(stream.getvalue())
+            self.prepended_children.append(StringIOTree(stream))
             self.prepended_children[-1].markers = self.markers
             self.markers = []
             self.stream = StringIO()
-            self.write = self.stream.write
+            if self.spool is None:
+                self.write = self.stream.write
+
+    def _write_spooled(self, s):
+        self.stream.write(s)
+        if self.stream.tell() >= self.spool.chunk_size:
+            self.commit()
 
     def insert(self, iotree):
         """
@@ -62,7 +75,7 @@ class StringIOTree(object):
         # This is so that getvalue on the result doesn't include it.
         self.commit()
         # Construct the new forked object to return
-        other = StringIOTree()
+        other = StringIOTree(spool=self.spool)
         self.prepended_children.append(other)
         return other
 
@@ -71,6 +84,69 @@ class StringIOTree(object):
         return [m for c in children for m in c.allmarkers()] + self.markers
 
 
+
+class StringIOSpool(object):
+    """
+    A temporary file that takes the committed content of StringIOTrees,
+    which can no longer change, so that it does not have to be kept in
+    memory.  Content smaller than 'min_size' is not worth spooling, and
+    trees commit their content once it reaches 'chunk_size'.
+    """
+
+    def __init__(self, min_size=256, chunk_size=65536):
+        self.min_size = min_size
+        self.chunk_size = chunk_size
+        self.file = tempfile.TemporaryFile()
+        self.size = 0
+        self.at_end = True
+
+    def store(self, content):
+        encoding = None
+        if not isinstance(content, bytes):
+            encoding = 'utf8'
+            content = content.encode(encoding)
+        if not self.at_end:
+            self.file.seek(self.size)
+            self.at_end = True
+        self.file.write(content)
+        offset = self.size
+        self.size += len(content)
+        return SpooledStream(self, offset, len(content), encoding)
+
+    def load(self, offset, length):
+        self.at_end = False
+        self.file.seek(offset)
+        return self.file.read(length)
+
+    def close(self):
+        self.file.close()
+
+
+class SpooledStream(object):
+    """
+    Read-only replacement of a committed stream whose content was moved
+    into a StringIOSpool.
+    """
+
+    def __init__(self, spool, offset, length, encoding):
+        self.spool = spool
+        self.offset = offset
+        self.length = length
+        self.encoding = encoding
+
+    def tell(self):
+        return self.length
+
+    def getvalue(self):
+        content = self.spool.load(self.offset, self.length)
+        if self.encoding:
+            content = content.decode(self.encoding)
+        return content
+
+    def write(self, s):
+        raise AssertionError("Cannot write to a committed stream")
+
+
 __doc__ = r"""
 Implements a buffer with insertion points. When you know you need to
 "get back" to a place and write more later, simply call insertion_point()
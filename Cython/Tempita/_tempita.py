@@ -33,7 +33,6 @@ from __future__ import absolute_import
 
 import re
 import sys
-import cgi
 try:
     from urllib import quote as url_quote
 except ImportError:  # Py3
@@ -439,6 +438,7 @@ def html_quote(value, force=True):
         return ''
     if not isinstance(value, basestring_):
         value = coerce_text(value)
+    import cgi  # only needed for HTML templates, which Cython does not use
     if sys.version >= "3" and isinstance(value, bytes):
         value = cgi.escape(value.decode('latin1'), 1)
         value = value.encode('latin1')
@@ -65,3 +65,52 @@ class TestStringIOTree(unittest.TestCase):
             tree = self.tree
         tree.markers.append(lineno)
         tree.write(linemap[lineno] + '\n')
+
+
+class TestSpooledStringIOTree(TestStringIOTree):
+
+    def setUp(self):
+        self.spool = stringtree.StringIOSpool(min_size=1)
+        self.tree = stringtree.StringIOTree(spool=self.spool)
+
+    def tearDown(self):
+        self.spool.close()
+
+    def test_spooled(self):
+        self.write_lines((1, 2, 3))
+        insertion_point = self.tree.insertion_point()
+        self.write_lines((7, 8))
+        self.write_lines((4, 5, 6), tree=insertion_point)
+        spooled = self.tree.prepended_children[0].stream
+        self.assertTrue(isinstance(spooled, stringtree.SpooledStream))
+        self.assertEqual(linemap[1] + '\n', spooled.getvalue().splitlines(True)[0])
+        self.assertEqual(list(range(1, 9)), self.tree.allmarkers())
+
+        out = stringtree.StringIO()
+        self.tree.copyto(out)
+        self.assertEqual('\n'.join(code.splitlines()[1:9]) + '\n', out.getvalue())
+        self.assertRaises(AssertionError, spooled.write, 'x')
+
+    def test_traced_code_generation(self):
+        from Cython.Compiler.Nodes import write_func_call
+
+        class CodeWriter(object):
+            call_level = 0
+            def __init__(self, buffer):
+                self.buffer = buffer
+            def putln(self, line):
+                self.buffer.write(line + '\n')
+
+        class Node(object):
+            pos = ('test', 1, 0)
+            def generate(self, code):
+                pass
+
+        self.spool.chunk_size = 10
+        code = CodeWriter(self.tree)
+        write_func_call(Node.generate, CodeWriter)(Node(), code)
+        # the marker was committed by the spool, so it cannot be undone
+        lines = self.tree.getvalue().splitlines()
+        self.assertEqual(2, len(lines))
+        self.assertTrue('-> Node.generate' in lines[0], lines)
+        self.assertTrue('<- Node.generate' in lines[1], lines)
@@ -1583,23 +1583,46 @@ ignore:
 static int __Pyx_patch_abc(void); /*proto*/
 
 //////////////////// PatchGeneratorABC ////////////////////
-//@requires: PatchModuleWithCoroutine
 
 #if defined(__Pyx_Generator_USED) || defined(__Pyx_Coroutine_USED)
+// calls 'module.abc_name.register(type)' directly instead of running Python code,
+// which would have to be compiled again in each module at import time
+static int __Pyx_register_with_abc(PyObject *module, const char *abc_name, PyObject *type) {
+    PyObject *abc, *result;
+    abc = PyObject_GetAttrString(module, abc_name);
+    if (unlikely(!abc)) {
+        if (!PyErr_ExceptionMatches(PyExc_AttributeError))
+            return -1;
+        // older module version without this ABC
+        PyErr_Clear();
+        return 0;
+    }
+    result = PyObject_CallMethod(abc, (char*) "register", (char*) "O", type);
+    Py_DECREF(abc);
+    if (unlikely(!result))
+        return -1;
+    Py_DECREF(result);
+    return 0;
+}
+
 static PyObject* __Pyx_patch_abc_module(PyObject *module); /*proto*/
 static PyObject* __Pyx_patch_abc_module(PyObject *module) {
-    module = __Pyx_Coroutine_patch_module(
-        module, CSTRING("""\
-if _cython_generator_type is not None:
-    try: Generator = _module.Generator
-    except AttributeError: pass
-    else: Generator.register(_cython_generator_type)
-if _cython_coroutine_type is not None:
-    try: Coroutine = _module.Coroutine
-    except AttributeError: pass
-    else: Coroutine.register(_cython_coroutine_type)
-""")
-    );
+#ifdef __Pyx_Generator_USED
+    if (unlikely(__Pyx_register_with_abc(module, "Generator", (PyObject*)__pyx_GeneratorType) < 0))
+        goto ignore;
+#endif
+#ifdef __Pyx_Coroutine_USED
+    if (unlikely(__Pyx_register_with_abc(module, "Coroutine", (PyObject*)__pyx_CoroutineType) < 0))
+        goto ignore;
+#endif
+    return module;
+
+ignore:
+    PyErr_WriteUnraisable(module);
+    if (unlikely(PyErr_WarnEx(PyExc_RuntimeWarning, "Cython module failed to patch module with custom type", 1) < 0)) {
+        Py_DECREF(module);
+        module = NULL;
+    }
     return module;
 }
 #endif
@@ -1635,9 +1658,6 @@ static int __Pyx_patch_abc(void) {
             PyErr_Clear();
         }
     }
-#else
-    // avoid "unused" warning for __Pyx_Coroutine_patch_module()
-    if (0) __Pyx_Coroutine_patch_module(NULL, NULL);
 #endif
     return 0;
 }
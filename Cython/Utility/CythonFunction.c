@@ -571,12 +571,51 @@ __Pyx_CyFunction_repr(__pyx_CyFunctionObject *op)
 #endif
 }
 
+#if CYTHON_METH_FASTCALL
+static PyObject * __Pyx_CyFunction_FastCallDict(PyObject *func, PyObject *self, PyObject **args, Py_ssize_t nargs, PyObject *kw) {
+    // calls a METH_FASTCALL function, passing the keyword arguments
+    // as a tuple of names with their values after the positional arguments
+    __Pyx_PyCFunctionFastWithKeywords meth = (__Pyx_PyCFunctionFastWithKeywords) ((PyCFunctionObject*)func)->m_ml->ml_meth;
+    PyObject *result, *kwnames, *key, *value, **stack;
+    Py_ssize_t i, nkw, pos = 0;
+
+    if (likely(kw == NULL) || (nkw = PyDict_Size(kw)) == 0)
+        return (*meth)(self, args, nargs, NULL);
+
+    stack = (PyObject **) PyMem_Malloc((size_t) (nargs + nkw) * sizeof(PyObject *));
+    if (unlikely(!stack))
+        return PyErr_NoMemory();
+    kwnames = PyTuple_New(nkw);
+    if (unlikely(!kwnames)) {
+        PyMem_Free(stack);
+        return NULL;
+    }
+    for (i = 0; i < nargs; i++)
+        stack[i] = args[i];
+    i = 0;
+    while (PyDict_Next(kw, &pos, &key, &value)) {
+        Py_INCREF(key);
+        PyTuple_SET_ITEM(kwnames, i, key);
+        stack[nargs + i] = value;
+        i++;
+    }
+    result = (*meth)(self, stack, nargs, kwnames);
+    Py_DECREF(kwnames);
+    PyMem_Free(stack);
+    return result;
+}
+#endif
+
 static PyObject * __Pyx_CyFunction_CallMethod(PyObject *func, PyObject *self, PyObject *arg, PyObject *kw) {
     // originally copied from PyCFunction_Call() in CPython's Objects/methodobject.c
     PyCFunctionObject* f = (PyCFunctionObject*)func;
     PyCFunction meth = f->m_ml->ml_meth;
     Py_ssize_t size;
 
+#if CYTHON_METH_FASTCALL
+    if (f->m_ml->ml_flags & METH_FASTCALL)
+        return __Pyx_CyFunction_FastCallDict(func, self, &PyTuple_GET_ITEM(arg, 0), PyTuple_GET_SIZE(arg), kw);
+#endif
     switch (f->m_ml->ml_flags & (METH_VARARGS | METH_KEYWORDS | METH_NOARGS | METH_O)) {
     case METH_VARARGS:
         if (likely(kw == NULL || PyDict_Size(kw) == 0))
@@ -636,6 +675,13 @@ static PyObject *__Pyx_CyFunction_CallAsMethod(PyObject *func, PyObject *args, P
         PyObject *self;
 
         argc = PyTuple_GET_SIZE(args);
+#if CYTHON_METH_FASTCALL
+        if ((cyfunc->func.m_ml->ml_flags & METH_FASTCALL) && likely(argc > 0)) {
+            // pass the arguments after 'self' without copying them into a new tuple
+            return __Pyx_CyFunction_FastCallDict(
+                func, PyTuple_GET_ITEM(args, 0), &PyTuple_GET_ITEM(args, 1), argc - 1, kw);
+        }
+#endif
         new_args = PyTuple_GetSlice(args, 1, argc);
 
         if (unlikely(!new_args))
@@ -174,9 +174,9 @@ invalid_keyword:
 
 //////////////////// ParseKeywords.proto ////////////////////
 
-static int __Pyx_ParseOptionalKeywords(PyObject *kwds, PyObject **argnames[], \
-    PyObject *kwds2, PyObject *values[], Py_ssize_t num_pos_args, \
-    const char* function_name); /*proto*/
+static int __Pyx_ParseOptionalKeywords(PyObject *kwds, PyObject **kwvalues, \
+    PyObject **argnames[], PyObject *kwds2, PyObject *values[], \
+    Py_ssize_t num_pos_args, const char* function_name); /*proto*/
 
 //////////////////// ParseKeywords ////////////////////
 //@requires: RaiseDoubleKeywords
@@ -185,6 +185,9 @@ static int __Pyx_ParseOptionalKeywords(PyObject *kwds, PyObject **argnames[], \
 //  arguments from the kwds dict into kwds2.  If kwds2 is NULL, unknown
 //  keywords will raise an invalid keyword error.
 //
+//  If kwvalues is not NULL, kwds is the tuple of keyword names of a
+//  METH_FASTCALL call and kwvalues is the array of their values.
+//
 //  Three kinds of errors are checked: 1) non-string keywords, 2)
 //  unexpected keywords and 3) overlap with positional arguments.
 //
@@ -196,6 +199,7 @@ static int __Pyx_ParseOptionalKeywords(PyObject *kwds, PyObject **argnames[], \
 
 static int __Pyx_ParseOptionalKeywords(
     PyObject *kwds,
+    PyObject **kwvalues,
     PyObject **argnames[],
     PyObject *kwds2,
     PyObject *values[],
@@ -207,7 +211,16 @@ static int __Pyx_ParseOptionalKeywords(
     PyObject*** name;
     PyObject*** first_kw_arg = argnames + num_pos_args;
 
-    while (PyDict_Next(kwds, &pos, &key, &value)) {
+    while (1) {
+        if (kwvalues) {
+            if (pos >= PyTuple_GET_SIZE(kwds)) break;
+            key = PyTuple_GET_ITEM(kwds, pos);
+            value = kwvalues[pos];
+            pos++;
+        } else if (!PyDict_Next(kwds, &pos, &key, &value)) {
+            break;
+        }
+
         name = first_kw_arg;
         while (*name && (**name != key)) name++;
         if (*name) {
@@ -303,6 +316,55 @@ bad:
 }
 
 
+//////////////////// FastcallArgs.proto ////////////////////
+
+//  Access to the arguments of def functions with the 'fastcall' directive.
+//  With METH_FASTCALL, they receive a C array with the positional arguments,
+//  followed by the values of the keyword arguments, and a tuple with the
+//  keyword names (or NULL).  Otherwise, they receive the usual argument
+//  tuple and keyword dict.
+
+#if CYTHON_METH_FASTCALL
+  #define __Pyx_FastcallParams(args, nargs, kwds)  PyObject **args, Py_ssize_t nargs, PyObject *kwds
+  #define __Pyx_NumArgs_FASTCALL(args, nargs)  (nargs)
+  #define __Pyx_Arg_FASTCALL(args, i)  (args)[i]
+  #define __Pyx_NumKwargs_FASTCALL(kwds)  PyTuple_GET_SIZE(kwds)
+  #define __Pyx_KwValues_FASTCALL(args, nargs)  ((args) + (nargs))
+  static PyObject *__Pyx_GetKwValue_FASTCALL(PyObject *kwnames, PyObject **kwvalues, PyObject *s); /*proto*/
+#else
+  #define __Pyx_FastcallParams(args, nargs, kwds)  PyObject *args, PyObject *kwds
+  #define __Pyx_NumArgs_FASTCALL(args, nargs)  PyTuple_GET_SIZE(args)
+  #define __Pyx_Arg_FASTCALL(args, i)  PyTuple_GET_ITEM(args, i)
+  #define __Pyx_NumKwargs_FASTCALL(kwds)  PyDict_Size(kwds)
+  #define __Pyx_KwValues_FASTCALL(args, nargs)  NULL
+  #define __Pyx_GetKwValue_FASTCALL(kwds, kwvalues, s)  PyDict_GetItem(kwds, s)
+#endif
+
+//////////////////// FastcallArgs ////////////////////
+
+#if CYTHON_METH_FASTCALL
+//  Returns a borrowed reference to the value of the keyword argument 's',
+//  or NULL if it was not passed.
+static PyObject *__Pyx_GetKwValue_FASTCALL(PyObject *kwnames, PyObject **kwvalues, PyObject *s) {
+    Py_ssize_t i, n = PyTuple_GET_SIZE(kwnames);
+    // keyword names are usually interned
+    for (i = 0; i < n; i++) {
+        if (s == PyTuple_GET_ITEM(kwnames, i)) return kwvalues[i];
+    }
+    for (i = 0; i < n; i++) {
+        PyObject *key = PyTuple_GET_ITEM(kwnames, i);
+        // non-string keywords are rejected later by __Pyx_ParseOptionalKeywords()
+        if (likely(PyUnicode_Check(key)) &&
+                PyUnicode_GET_LENGTH(s) == PyUnicode_GET_LENGTH(key) &&
+                PyUnicode_Compare(s, key) == 0) {
+            return kwvalues[i];
+        }
+    }
+    return NULL;
+}
+#endif
+
+
 //////////////////// MergeKeywords.proto ////////////////////
 
 static int __Pyx_MergeKeywords(PyObject *kwdict, PyObject *source_mapping); /*proto*/
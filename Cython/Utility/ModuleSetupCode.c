@@ -66,6 +66,8 @@
   #define CYTHON_FAST_THREAD_STATE 0
   #undef CYTHON_FAST_PYCALL
   #define CYTHON_FAST_PYCALL 0
+  #undef CYTHON_USE_DICT_VERSIONS
+  #define CYTHON_USE_DICT_VERSIONS 0
 
 #elif defined(PYSTON_VERSION)
   #define CYTHON_COMPILING_IN_PYPY 0
@@ -99,6 +101,8 @@
   #define CYTHON_FAST_THREAD_STATE 0
   #undef CYTHON_FAST_PYCALL
   #define CYTHON_FAST_PYCALL 0
+  #undef CYTHON_USE_DICT_VERSIONS
+  #define CYTHON_USE_DICT_VERSIONS 0
 
 #else
   #define CYTHON_COMPILING_IN_PYPY 0
@@ -147,12 +151,23 @@
   #ifndef CYTHON_FAST_PYCALL
     #define CYTHON_FAST_PYCALL 1
   #endif
+  #if PY_VERSION_HEX < 0x030600B1
+    #undef CYTHON_USE_DICT_VERSIONS
+    #define CYTHON_USE_DICT_VERSIONS 0
+  #elif !defined(CYTHON_USE_DICT_VERSIONS)
+    #define CYTHON_USE_DICT_VERSIONS 1
+  #endif
 #endif
 
 #if !defined(CYTHON_FAST_PYCCALL)
 #define CYTHON_FAST_PYCCALL  (CYTHON_FAST_PYCALL && PY_VERSION_HEX >= 0x030600B1)
 #endif
 
+#if CYTHON_USE_DICT_VERSIONS
+  /* PEP 509 version tag, changes on each modification of the dict */
+  #define __PYX_GET_DICT_VERSION(dict)  (((PyDictObject*)(dict))->ma_version_tag)
+#endif
+
 #if CYTHON_USE_PYLONG_INTERNALS
   #include "longintrepr.h"
   /* These short defines can easily conflict with other code */
@@ -208,6 +223,23 @@
 #define __Pyx_PyFastCFunction_Check(func) 0
 #endif
 
+// METH_FASTCALL entry points of def functions with the 'fastcall' directive
+#if !defined(CYTHON_METH_FASTCALL)
+  #define CYTHON_METH_FASTCALL  CYTHON_FAST_PYCCALL
+#endif
+#if CYTHON_METH_FASTCALL
+  typedef PyObject *(*__Pyx_PyCFunctionFastWithKeywords) (PyObject *self, PyObject **args,
+                                                          Py_ssize_t nargs, PyObject *kwnames);
+  #if PY_VERSION_HEX >= 0x030700A1
+    // METH_FASTCALL alone no longer receives keyword arguments
+    #define __Pyx_METH_FASTCALL  (METH_FASTCALL | METH_KEYWORDS)
+  #else
+    #define __Pyx_METH_FASTCALL  METH_FASTCALL
+  #endif
+#else
+  #define __Pyx_METH_FASTCALL  (METH_VARARGS | METH_KEYWORDS)
+#endif
+
 /* new Py3.3 unicode type (PEP 393) */
 #if PY_VERSION_HEX > 0x03030000 && defined(PyUnicode_KIND)
   #define CYTHON_PEP393_ENABLED 1
@@ -507,6 +539,7 @@ static CYTHON_INLINE float __PYX_NAN() {
 
 typedef struct {PyObject **p; const char *s; const Py_ssize_t n; const char* encoding;
                 const char is_unicode; const char is_str; const char intern; } __Pyx_StringTabEntry; /*proto*/
+typedef struct {PyObject **p; long value; } __Pyx_IntTabEntry; /*proto*/
 
 /////////////// ForceInitThreads.proto ///////////////
 
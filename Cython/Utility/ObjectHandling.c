@@ -1011,6 +1011,68 @@ static CYTHON_INLINE PyObject *__Pyx_GetModuleGlobalName(PyObject *name) {
     return result;
 }
 
+/////////////// GetModuleGlobalNameCached.proto ///////////////
+//@requires: GetModuleGlobalName
+//@substitute: naming
+
+#if CYTHON_USE_DICT_VERSIONS
+// Each call site caches the value that it found, together with the version tags
+// of the module dict and, for builtins, of the builtins dict (0 for globals).
+#define __Pyx_GetModuleGlobalNameCached(var, name)  {                                 \
+    static PY_UINT64_T __pyx_dict_version = 0;                                        \
+    static PY_UINT64_T __pyx_builtins_version = 0;                                    \
+    static PyObject *__pyx_dict_cached_value = NULL;                                  \
+    if (likely(__pyx_dict_version == __PYX_GET_DICT_VERSION($moddict_cname)) &&       \
+            (likely(!__pyx_builtins_version) ||                                       \
+             likely(__pyx_builtins_version == __PYX_GET_DICT_VERSION(__pyx_builtins_dict)))) { \
+        (var) = __pyx_dict_cached_value;                                              \
+        Py_INCREF(var);                                                               \
+    } else {                                                                          \
+        (var) = __Pyx__GetModuleGlobalNameCached(                                     \
+            name, &__pyx_dict_version, &__pyx_builtins_version, &__pyx_dict_cached_value); \
+    }                                                                                 \
+}
+
+static PyObject *__pyx_builtins_dict = NULL;
+static PyObject *__Pyx__GetModuleGlobalNameCached(PyObject *name, PY_UINT64_T *dict_version,
+                                                  PY_UINT64_T *builtins_version, PyObject **cached_value); /*proto*/
+#else
+#define __Pyx_GetModuleGlobalNameCached(var, name)  (var) = __Pyx_GetModuleGlobalName(name)
+#endif
+
+/////////////// GetModuleGlobalNameCached ///////////////
+//@requires: GetBuiltinName
+//@substitute: naming
+
+#if CYTHON_USE_DICT_VERSIONS
+static PyObject *__Pyx__GetModuleGlobalNameCached(PyObject *name, PY_UINT64_T *dict_version,
+                                                  PY_UINT64_T *builtins_version, PyObject **cached_value) {
+    PyObject *result;
+    PY_UINT64_T new_builtins_version = 0;
+    // read the version tags before the lookups, in case these modify the dicts
+    PY_UINT64_T new_dict_version = __PYX_GET_DICT_VERSION($moddict_cname);
+    result = PyDict_GetItem($moddict_cname, name);
+    if (unlikely(!result)) {
+        if (unlikely(!__pyx_builtins_dict)) {
+            // borrowed reference, kept alive by the builtins module
+            __pyx_builtins_dict = PyModule_GetDict($builtins_cname);
+            if (unlikely(!__pyx_builtins_dict)) return NULL;
+        }
+        new_builtins_version = __PYX_GET_DICT_VERSION(__pyx_builtins_dict);
+        result = PyDict_GetItem(__pyx_builtins_dict, name);
+        if (unlikely(!result)) {
+            // leave the cache alone and raise the NameError
+            return __Pyx_GetBuiltinName(name);
+        }
+    }
+    *dict_version = new_dict_version;
+    *builtins_version = new_builtins_version;
+    *cached_value = result;
+    Py_INCREF(result);
+    return result;
+}
+#endif
+
 //////////////////// GetAttr.proto ////////////////////
 
 static CYTHON_INLINE PyObject *__Pyx_GetAttr(PyObject *, PyObject *); /*proto*/
@@ -1077,6 +1139,158 @@ static CYTHON_INLINE PyObject* __Pyx_PyObject_GetAttrStr(PyObject* obj, PyObject
 #define __Pyx_PyObject_GetAttrStr(o,n) PyObject_GetAttr(o,n)
 #endif
 
+/////////////// PyObjectGetAttrStrCached.proto ///////////////
+//@requires: PyObjectGetAttrStr
+
+#if CYTHON_COMPILING_IN_CPYTHON && CYTHON_USE_TYPE_SLOTS
+// Monomorphic inline cache of the attribute lookup at one code location.  It keeps
+// what the type of the object (or its MRO) defines for the name, as long as the
+// version tag of the type stays valid.  Sites that keep seeing different types
+// stop using the cache.
+typedef struct {
+    PyTypeObject *type;       /* only compared, not owned */
+    unsigned int version_tag;
+    unsigned int misses;
+    PyObject *descr;          /* borrowed from the type's MRO, NULL if not defined there */
+} __Pyx_TypeAttrCache;
+
+#define __PYX_TYPE_ATTR_CACHE_MAX_MISSES  16
+
+#define __Pyx_PyObject_GetAttrStrCached(var, obj, name)  {                    \
+    static __Pyx_TypeAttrCache __pyx_attr_cache = {0, 0, 0, 0};               \
+    (var) = __Pyx__PyObject_GetAttrStrCached(obj, name, &__pyx_attr_cache);   \
+}
+
+static int __Pyx_TypeAttrCache_Lookup(PyTypeObject *tp, PyObject *name,
+                                      __Pyx_TypeAttrCache *cache, PyObject **descr); /*proto*/
+static PyObject *__Pyx_PyObject_GenericGetAttrWithDescr(PyObject *obj, PyObject *name, PyObject *descr); /*proto*/
+static PyObject *__Pyx__PyObject_GetAttrStrCached(PyObject *obj, PyObject *name, __Pyx_TypeAttrCache *cache); /*proto*/
+#else
+#define __Pyx_PyObject_GetAttrStrCached(var, obj, name)  (var) = __Pyx_PyObject_GetAttrStr(obj, name)
+#endif
+
+/////////////// PyObjectGetAttrStrCached ///////////////
+
+#if CYTHON_COMPILING_IN_CPYTHON && CYTHON_USE_TYPE_SLOTS
+// Returns 0 if the lookup must use the getattr slot of the type instead.
+static int __Pyx_TypeAttrCache_Lookup(PyTypeObject *tp, PyObject *name,
+                                      __Pyx_TypeAttrCache *cache, PyObject **descr) {
+    if (unlikely(tp->tp_getattro != PyObject_GenericGetAttr))
+        return 0;
+    if (likely(cache->type == tp && cache->version_tag == tp->tp_version_tag &&
+               PyType_HasFeature(tp, Py_TPFLAGS_VALID_VERSION_TAG))) {
+        *descr = cache->descr;
+        return 1;
+    }
+    if (unlikely(cache->misses >= __PYX_TYPE_ATTR_CACHE_MAX_MISSES || !tp->tp_dict))
+        return 0;
+    if (cache->type)
+        cache->misses++;
+    // assigns a version tag to the type if it did not have one yet
+    *descr = _PyType_Lookup(tp, name);
+    if (likely(PyType_HasFeature(tp, Py_TPFLAGS_VALID_VERSION_TAG))) {
+        cache->type = tp;
+        cache->version_tag = tp->tp_version_tag;
+        cache->descr = *descr;
+    } else {
+        cache->type = NULL;
+    }
+    return 1;
+}
+
+// adapted from CPython's _PyObject_GenericGetAttrWithDict()
+static PyObject *__Pyx_PyObject_GenericGetAttrWithDescr(PyObject *obj, PyObject *name, PyObject *descr) {
+    PyTypeObject *tp = Py_TYPE(obj);
+    PyObject **dictptr;
+    PyObject *res = NULL;
+    descrgetfunc f = NULL;
+    if (descr) {
+        // keep it alive while the lookups below might run arbitrary code
+        Py_INCREF(descr);
+#if PY_MAJOR_VERSION < 3
+        if (PyType_HasFeature(Py_TYPE(descr), Py_TPFLAGS_HAVE_CLASS))
+#endif
+        f = Py_TYPE(descr)->tp_descr_get;
+        if (f && PyDescr_IsData(descr)) {
+            res = f(descr, obj, (PyObject *)tp);
+            goto done;
+        }
+    }
+    dictptr = _PyObject_GetDictPtr(obj);
+    if (dictptr && *dictptr) {
+        res = PyDict_GetItem(*dictptr, name);
+        if (res) {
+            Py_INCREF(res);
+            goto done;
+        }
+    }
+    if (f) {
+        res = f(descr, obj, (PyObject *)tp);
+    } else if (descr) {
+        res = descr;
+        Py_INCREF(res);
+    } else {
+        // let the type raise its usual AttributeError
+        res = __Pyx_PyObject_GetAttrStr(obj, name);
+    }
+done:
+    Py_XDECREF(descr);
+    return res;
+}
+
+static PyObject *__Pyx__PyObject_GetAttrStrCached(PyObject *obj, PyObject *name, __Pyx_TypeAttrCache *cache) {
+    PyObject *descr;
+    if (unlikely(!__Pyx_TypeAttrCache_Lookup(Py_TYPE(obj), name, cache, &descr)))
+        return __Pyx_PyObject_GetAttrStr(obj, name);
+    return __Pyx_PyObject_GenericGetAttrWithDescr(obj, name, descr);
+}
+#endif
+
+/////////////// PyObjectGetMethodCached.proto ///////////////
+//@requires: PyObjectGetAttrStrCached
+
+#if CYTHON_COMPILING_IN_CPYTHON && CYTHON_USE_TYPE_SLOTS
+// Like __Pyx_PyObject_GetAttrStrCached(), but returns the plain function of Python
+// methods and sets 'self_var' to a new reference to the object instead of
+// creating a bound method.  'self_var' must be NULL on entry.
+#define __Pyx_PyObject_GetMethodCached(var, obj, name, self_var)  {                     \
+    static __Pyx_TypeAttrCache __pyx_attr_cache = {0, 0, 0, 0};                          \
+    (var) = __Pyx__PyObject_GetMethodCached(obj, name, &__pyx_attr_cache, &(self_var));  \
+}
+
+static PyObject *__Pyx__PyObject_GetMethodCached(PyObject *obj, PyObject *name,
+                                                 __Pyx_TypeAttrCache *cache, PyObject **self_arg); /*proto*/
+#else
+#define __Pyx_PyObject_GetMethodCached(var, obj, name, self_var)  (var) = __Pyx_PyObject_GetAttrStr(obj, name)
+#endif
+
+/////////////// PyObjectGetMethodCached ///////////////
+
+#if CYTHON_COMPILING_IN_CPYTHON && CYTHON_USE_TYPE_SLOTS
+static PyObject *__Pyx__PyObject_GetMethodCached(PyObject *obj, PyObject *name,
+                                                 __Pyx_TypeAttrCache *cache, PyObject **self_arg) {
+    PyObject *descr, **dictptr, *shadowing = NULL;
+    if (unlikely(!__Pyx_TypeAttrCache_Lookup(Py_TYPE(obj), name, cache, &descr)))
+        return __Pyx_PyObject_GetAttrStr(obj, name);
+    if (likely(descr && PyFunction_Check(descr))) {
+        // not a data descriptor, so only the instance dict can override it
+        Py_INCREF(descr);
+        dictptr = _PyObject_GetDictPtr(obj);
+        if (dictptr && *dictptr)
+            shadowing = PyDict_GetItem(*dictptr, name);
+        if (likely(!shadowing)) {
+            Py_INCREF(obj);
+            *self_arg = obj;
+            return descr;
+        }
+        Py_INCREF(shadowing);
+        Py_DECREF(descr);
+        return shadowing;
+    }
+    return __Pyx_PyObject_GenericGetAttrWithDescr(obj, name, descr);
+}
+#endif
+
 /////////////// PyObjectSetAttrStr.proto ///////////////
 
 #if CYTHON_USE_TYPE_SLOTS
@@ -367,6 +367,23 @@ static CYTHON_INLINE PyObject * __Pyx_PyInt_FromSize_t(size_t ival) {
 }
 
 
+/////////////// InitInts.proto ///////////////
+
+static int __Pyx_InitInts(__Pyx_IntTabEntry *t); /*proto*/
+
+/////////////// InitInts ///////////////
+
+static int __Pyx_InitInts(__Pyx_IntTabEntry *t) {
+    while (t->p) {
+        *t->p = PyInt_FromLong(t->value);
+        if (unlikely(!*t->p))
+            return -1;
+        ++t;
+    }
+    return 0;
+}
+
+
 /////////////// ToPyCTupleUtility.proto ///////////////
 static PyObject* {{funcname}}({{struct_type_decl}});
 
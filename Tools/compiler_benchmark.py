@@ -0,0 +1,193 @@
+"""
+Benchmark the run time and memory usage of the Cython compiler itself.
+
+Generates a large synthetic module and compiles it in a fresh Python
+process for each run, reporting the compile time and the peak resident
+set size (RSS) of that process.  Compiling in a separate process keeps
+the numbers independent of each other and of this script.
+
+The Cython package that gets benchmarked is the one that this script
+is part of, i.e. the source tree it was run from.  With '--compare', the
+compiler also runs from a copy of its Python sources without any compiled
+extension modules, which shows the speedup of a compiled installation
+(``setup.py build_ext -i``) over pure-Python mode.
+
+With '--lookups', the generated module instead declares many names in
+a large 'cdef extern' block and uses them from deeply nested closures,
+which stresses the symbol table lookups.
+
+Usage example::
+
+    $ python Tools/compiler_benchmark.py -n 3000 -r 3 --compare
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+import optparse
+
+CYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FUNCTION_TEMPLATE = '''
+def f%(i)d(a, b, c=None):
+    x = [a, b, c]
+    for item in x:
+        if item is not None and item > %(i)d:
+            return item * 2 + a
+    return {'a': a, 'b': b}.get('c', 0)
+
+cdef int cf%(i)d(int a, double b, object c) except -1:
+    cdef int i, s = 0
+    for i in range(a):
+        s += <int>(i * b)
+    return s + len(c) if c is not None else s
+
+cdef class C%(i)d:
+    cdef public int value
+    def __init__(self, value):
+        self.value = value
+    def method(self, other):
+        return self.value + cf%(i)d(self.value, 1.5, other)
+'''
+
+EXTERN_TEMPLATE = '''\
+    ctypedef struct S%(i)d:
+        int x
+    int ext_f%(i)d(int a, double b)
+    enum: ECONST%(i)d
+'''
+
+NESTING_DEPTH = 8
+
+COMPILE_SCRIPT = '''
+import sys, time, resource
+sys.path.insert(0, %(cython_dir)r)
+from Cython.Compiler.Main import compile_single, CompilationOptions, default_options
+options = CompilationOptions(default_options, output_file=%(c_file)r, **%(options)r)
+t = time.time()
+compile_single(%(source)r, options)
+t = time.time() - t
+maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == 'darwin':
+    maxrss //= 1024  # bytes, not kilobytes
+from Cython.Compiler import Nodes
+compiled = not Nodes.__file__.endswith(('.py', '.pyc'))
+print("%%.3f %%d %%d" %% (t, maxrss, compiled))
+'''
+
+
+def write_module(path, function_count):
+    with open(path, 'w') as f:
+        for i in range(function_count):
+            f.write(FUNCTION_TEMPLATE % {'i': i})
+
+
+def write_lookup_module(path, function_count):
+    with open(path, 'w') as f:
+        f.write('cdef extern from *:\n')
+        for i in range(function_count):
+            f.write(EXTERN_TEMPLATE % {'i': i})
+        for i in range(0, function_count, 10):
+            f.write('\ndef outer%d(a0):\n' % i)
+            f.write('    cdef S%d s = [ECONST%d]\n' % (i, i))
+            indent = '    '
+            for depth in range(1, NESTING_DEPTH):
+                f.write('%sdef inner%d(a%d):\n' % (indent, depth, depth))
+                indent += '    '
+            f.write('%sx = %s + s.x\n' % (indent, ' + '.join(['a%d' % d for d in range(NESTING_DEPTH)])))
+            f.write('%sreturn len(str(x)) + ext_f%d(ECONST%d, 1.0) + abs(x) + min(x, 1)\n' % (
+                indent, i, i))
+            for depth in range(NESTING_DEPTH - 1, 0, -1):
+                f.write('%sreturn inner%d\n' % ('    ' * depth, depth))
+
+
+def _ignore_compiled_files(directory, names):
+    ignored = set(shutil.ignore_patterns('*.so', '*.pyd', '*.pyc', '__pycache__')(directory, names))
+    for name in names:
+        base, ext = os.path.splitext(name)
+        if ext == '.c' and (base + '.py' in names or base + '.pyx' in names):
+            ignored.add(name)  # generated from a compiler module
+    return ignored
+
+
+def copy_python_sources(target_dir):
+    """Copy the Python sources of the Cython package, without extension modules.
+    """
+    shutil.copytree(
+        os.path.join(CYTHON_DIR, 'Cython'), os.path.join(target_dir, 'Cython'),
+        ignore=_ignore_compiled_files)
+
+
+def compile_module(source, options, cython_dir=CYTHON_DIR):
+    """Compile the module in a new process and return
+    (seconds, max RSS in kB, whether the compiler was compiled).
+    """
+    c_file = os.path.splitext(source)[0] + '.c'
+    script = COMPILE_SCRIPT % {
+        'cython_dir': cython_dir,
+        'source': source,
+        'c_file': c_file,
+        'options': options,
+    }
+    output = subprocess.check_output([sys.executable, '-c', script])
+    seconds, maxrss, compiled = output.decode('ascii').split()[-3:]
+    return float(seconds), int(maxrss), compiled == '1'
+
+
+def run(label, runs, source, options, cython_dir=CYTHON_DIR):
+    times = []
+    for _ in range(runs):
+        seconds, maxrss, compiled = compile_module(source, options, cython_dir)
+        times.append(seconds)
+        print("%s (%s): time: %.2f s, peak RSS: %.1f MB" % (
+            label, "compiled" if compiled else "pure Python", seconds, maxrss / 1024.0))
+    return min(times)
+
+
+def main():
+    parser = optparse.OptionParser(
+        usage="%prog [options]",
+        description="Measure the time and memory that Cython needs to compile a large module.")
+    parser.add_option("-n", dest="function_count", type="int", default=1000,
+                      help="Number of function/class groups in the generated module.")
+    parser.add_option("-r", dest="runs", type="int", default=1,
+                      help="Number of compiler runs.")
+    parser.add_option("--spool-c-code", dest="spool_c_code", action="store_true", default=False,
+                      help="Compile with the 'spool_c_code' option.")
+    parser.add_option("--compare", dest="compare", action="store_true", default=False,
+                      help="Also run the compiler in pure-Python mode and report the speedup.")
+    parser.add_option("--lookups", dest="lookups", action="store_true", default=False,
+                      help="Generate a module with a large extern block and nested closures.")
+    parser.add_option("--keep", dest="keep", action="store_true", default=False,
+                      help="Do not delete the generated module and C file.")
+    options, args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp(prefix='cython_compiler_benchmark')
+    try:
+        source = os.path.join(temp_dir, 'bench_module.pyx')
+        if options.lookups:
+            write_lookup_module(source, options.function_count)
+        else:
+            write_module(source, options.function_count)
+        compile_options = {'spool_c_code': options.spool_c_code}
+        print("Compiling %d function groups (%d kB of source)" % (
+            options.function_count, os.path.getsize(source) // 1024))
+        best = run("installed", options.runs, source, compile_options)
+        if options.compare:
+            pure_dir = os.path.join(temp_dir, 'pure')
+            copy_python_sources(pure_dir)
+            best_pure = run("sources", options.runs, source, compile_options, pure_dir)
+            print("speedup: %.2fx" % (best_pure / best))
+    finally:
+        if options.keep:
+            print("Kept files in %s" % temp_dir)
+        else:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+Report the import time of a set of (compiled) modules.
+
+Imports the given modules in a fresh Python process and measures the
+time that each module import takes, both inclusive (with all imports
+that it triggers) and exclusive ("self" time, without the nested
+imports).  The output table is sorted by the self time, which makes it
+easy to see which extension modules dominate the startup time of an
+application.  Relative imports, parent packages and submodules imported
+with 'from package import module' are each timed as separate modules.
+
+With '--walk', the given names are treated as packages and all of their
+submodules get imported as well.
+
+Usage example::
+
+    $ python Tools/import_profile.py --walk mypackage -n 20
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+import sys
+import json
+import subprocess
+import optparse
+
+PROFILE_SCRIPT = '''
+import sys, time, importlib
+try:
+    import builtins
+except ImportError:
+    import __builtin__ as builtins
+
+timer = getattr(time, 'perf_counter', time.time)
+stats = {}
+stack = []
+original_import = builtins.__import__
+
+def resolve_names(name, globals, level):
+    # Returns the possible absolute names of the imported module, in the
+    # order in which the import system looks them up.
+    if not level:
+        return [name]
+    package = ''
+    if globals:
+        package = globals.get('__package__')
+        if package is None:
+            package = globals.get('__name__') or ''
+            if '__path__' not in globals:
+                package = package.rpartition('.')[0]
+    if level < 0:
+        # Py2 implicit relative import, tried before the absolute one
+        return [package + '.' + name, name] if package else [name]
+    for _ in range(level - 1):
+        package = package.rpartition('.')[0]
+    if not package:
+        return [name]
+    return [package + '.' + name if name else package]
+
+def imported_name(candidates):
+    for name in candidates:
+        if name not in sys.modules:
+            return None
+        if sys.modules[name] is not None:
+            return name
+    return None
+
+def timed(candidates, import_module):
+    if imported_name(candidates) is not None:
+        return import_module()
+    stack.append(0.0)
+    start = timer()
+    try:
+        return import_module()
+    finally:
+        inclusive = timer() - start
+        nested = stack.pop()
+        if stack:
+            stack[-1] += inclusive
+        name = imported_name(candidates)
+        if name is not None:
+            total, self_time = stats.get(name, (0.0, 0.0))
+            stats[name] = (total + inclusive, self_time + inclusive - nested)
+
+# Py2 leaves out the level for implicit relative imports
+default_level = 0 if sys.version_info[0] >= 3 else -1
+
+def timed_import(name, globals=None, locals=None, fromlist=(), level=default_level):
+    candidates = resolve_names(name, globals, level)
+    if len(candidates) == 1:
+        # import the parent packages first to time them separately
+        parts = candidates[0].split('.')
+        for i in range(1, len(parts)):
+            parent = '.'.join(parts[:i])
+            timed([parent], lambda: original_import(parent, None, None, (), 0))
+    timed(candidates, lambda: original_import(name, globals, locals, (), level))
+
+    # submodules in the fromlist are imported without going through
+    # __import__(), so time them separately as well
+    module_name = imported_name(candidates)
+    module = sys.modules.get(module_name) if module_name else None
+    if fromlist and hasattr(module, '__path__'):
+        for item in fromlist:
+            if item == '*' or hasattr(module, item):
+                continue
+            submodule = module_name + '.' + item
+            try:
+                timed([submodule], lambda: original_import(submodule, None, None, (), 0))
+            except ImportError:
+                # not a module, left to the import below
+                pass
+    return original_import(name, globals, locals, fromlist, level)
+
+def walk(package_name):
+    import pkgutil
+    package = importlib.import_module(package_name)
+    names = [package_name]
+    for _, name, _ in pkgutil.walk_packages(
+            getattr(package, '__path__', []), package_name + '.'):
+        names.append(name)
+    return names
+
+builtins.__import__ = timed_import
+names = %(modules)r
+if %(walk)r:
+    names = [name for package_name in names for name in walk(package_name)]
+for name in names:
+    timed_import(name, level=0)
+builtins.__import__ = original_import
+
+import json
+result = []
+for name, (total, self_time) in stats.items():
+    module = sys.modules.get(name)
+    path = getattr(module, '__file__', None) or ''
+    result.append((name, total, self_time, path))
+print(json.dumps(result))
+'''
+
+
+def profile_imports(modules, walk=False):
+    """Import the modules in a new process and return a list of
+    (module name, inclusive seconds, self seconds, file path).
+    """
+    script = PROFILE_SCRIPT % {'modules': list(modules), 'walk': walk}
+    output = subprocess.check_output([sys.executable, '-c', script])
+    return json.loads(output.decode('utf8').splitlines()[-1])
+
+
+def print_table(stats, count):
+    stats = sorted(stats, key=lambda entry: -entry[2])
+    print("%-50s %10s %10s %10s" % ("module", "self ms", "total ms", "size kB"))
+    for name, total, self_time, path in stats[:count]:
+        size = os.path.getsize(path) // 1024 if path and os.path.exists(path) else 0
+        print("%-50s %10.2f %10.2f %10d" % (name, self_time * 1000, total * 1000, size))
+    print("%d modules imported in %.1f ms" % (
+        len(stats), sum(entry[2] for entry in stats) * 1000))
+
+
+def main():
+    parser = optparse.OptionParser(
+        usage="%prog [options] MODULE...",
+        description="Measure the time that it takes to import Python and extension modules.")
+    parser.add_option("-n", dest="count", type="int", default=30,
+                      help="Number of modules to list, slowest first.")
+    parser.add_option("--walk", dest="walk", action="store_true", default=False,
+                      help="Also import all submodules of the given packages.")
+    options, args = parser.parse_args()
+    if not args:
+        parser.error("no modules given")
+
+    print_table(profile_imports(args, options.walk), options.count)
+
+
+if __name__ == '__main__':
+    main()
@@ -52,6 +52,11 @@ import os
 import glob
 import imp
 
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
 mod_name = "pyximport"
 
 assert sys.hexversion >= 0x2030000, "need Python 2.3 or later"
@@ -135,27 +140,137 @@ def handle_special_build(modname, pyxfilename):
     return ext, setup_args
 
 
+class DependencyCache(object):
+    """Remembers the files that the .pyxdep file of a module refers to,
+    and the extension module that was last built from it.
+
+    An entry is reused as long as the .pyxdep file is unchanged and none of
+    the directories that its patterns were globbed in has changed (i.e. no
+    file was added or removed there), so that warm imports do not need to
+    read the .pyxdep files or glob.  If a path is given, the entries are
+    also stored there for later processes.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}  # pyxfilename -> (dependfile stat, directory stats, files)
+        self.so_paths = {}  # pyxfilename -> so_path
+        self._new_entries, self._new_so_paths = {}, {}
+        if path:
+            self.entries, self.so_paths = self._read()
+
+    def _read(self):
+        try:
+            with open(self.path, 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            # missing or unreadable
+            return {}, {}
+
+    def save(self):
+        if not self.path or not (self._new_entries or self._new_so_paths):
+            return
+        # merge with the entries that other processes have written meanwhile
+        entries, so_paths = self._read()
+        entries.update(self._new_entries)
+        so_paths.update(self._new_so_paths)
+        temp_path = '%s.%d.tmp' % (self.path, os.getpid())
+        try:
+            if not os.path.isdir(os.path.dirname(self.path)):
+                os.makedirs(os.path.dirname(self.path))
+            with open(temp_path, 'wb') as f:
+                pickle.dump((entries, so_paths), f, 2)
+            if os.path.exists(self.path) and sys.platform == 'win32':
+                os.remove(self.path)
+            os.rename(temp_path, self.path)
+        except (IOError, OSError):
+            # the cache is only an optimisation
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        self.entries, self.so_paths = entries, so_paths
+        self._new_entries, self._new_so_paths = {}, {}
+
+    def get_dependencies(self, pyxfilename):
+        """Returns the files that the module depends upon according to its
+        .pyxdep file (including the .pyxdep file itself), or None.
+        """
+        dependfile = os.path.splitext(pyxfilename)[0] + PYXDEP_EXT
+        dependfile_stat = _stat(dependfile)
+        key = os.path.abspath(pyxfilename)
+        entry = self.entries.get(key)
+        if entry is not None:
+            old_dependfile_stat, directory_stats, files = entry
+            if old_dependfile_stat == dependfile_stat and directory_stats is not None and all(
+                    _stat(directory) == st for directory, st in directory_stats):
+                return files
+
+        if dependfile_stat is None:
+            files = None
+            directory_stats = ()
+        else:
+            depends = open(dependfile).readlines()
+            depends = [depend.strip() for depend in depends]
+
+            # gather dependencies in the "files" variable
+            # the dependency file is itself a dependency
+            files = [dependfile]
+            directories = set()
+            for depend in depends:
+                fullpath = os.path.join(os.path.dirname(dependfile),
+                                        depend)
+                files.extend(glob.glob(fullpath))
+                directories.add(os.path.dirname(fullpath))
+            if any(glob.has_magic(directory) for directory in directories):
+                directory_stats = None  # cannot watch, glob again next time
+            else:
+                directory_stats = [(directory, _stat(directory)) for directory in sorted(directories)]
+        self.entries[key] = self._new_entries[key] = (
+            dependfile_stat, directory_stats, files)
+        return files
+
+    def add_module(self, pyxfilename, so_path):
+        pyxfilename, so_path = os.path.abspath(pyxfilename), os.path.abspath(so_path)
+        if self.so_paths.get(pyxfilename) != so_path:
+            self.so_paths[pyxfilename] = self._new_so_paths[pyxfilename] = so_path
+
+    def is_up_to_date(self, pyxfilename):
+        """Returns True if the module was built after the last change of
+        its source files.  False means that it may need a rebuild.
+        """
+        so_path = self.so_paths.get(os.path.abspath(pyxfilename))
+        so_stat = so_path and _stat(so_path)
+        if not so_stat:
+            return False
+        files = [pyxfilename, os.path.splitext(pyxfilename)[0] + PYXBLD_EXT]
+        files.extend(self.get_dependencies(pyxfilename) or ())
+        for file in files:
+            st = _stat(file)
+            if st is not None and st[0] > so_stat[0]:
+                return False
+        return True
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime, st.st_size
+
+_dependency_cache = DependencyCache()
+
+
 def handle_dependencies(pyxfilename):
     testing = '_test_files' in globals()
-    dependfile = os.path.splitext(pyxfilename)[0] + PYXDEP_EXT
 
     # by default let distutils decide whether to rebuild on its own
     # (it has a better idea of what the output file will be)
 
     # but we know more about dependencies so force a rebuild if 
     # some of the dependencies are newer than the pyxfile.
-    if os.path.exists(dependfile):
-        depends = open(dependfile).readlines()
-        depends = [depend.strip() for depend in depends]
-
-        # gather dependencies in the "files" variable
-        # the dependency file is itself a dependency
-        files = [dependfile]
-        for depend in depends:
-            fullpath = os.path.join(os.path.dirname(dependfile),
-                                    depend) 
-            files.extend(glob.glob(fullpath))
-
+    files = _dependency_cache.get_dependencies(pyxfilename)
+    _dependency_cache.save()
+    if files:
         # only for unit testing to see we did the right thing
         if testing:
             _test_files[:] = []  #$pycheck_no
@@ -183,6 +298,9 @@ def build_module(name, pyxfilename, pyxbuild_dir=None, inplace=False, language_l
     sargs.update(setup_args)
     build_in_temp = sargs.pop('build_in_temp',build_in_temp)
 
+    old_so_path = _dependency_cache.so_paths.get(os.path.abspath(pyxfilename))
+    old_so_stat = old_so_path and _stat(old_so_path)
+
     from . import pyxbuild
     so_path = pyxbuild.pyx_to_dll(pyxfilename, extension_mod,
                                   build_in_temp=build_in_temp,
@@ -191,19 +309,171 @@ def build_module(name, pyxfilename, pyxbuild_dir=None, inplace=False, language_l
                                   inplace=inplace,
                                   reload_support=pyxargs.reload_support)
     assert os.path.exists(so_path), "Cannot find: %s" % so_path
-    
-    junkpath = os.path.join(os.path.dirname(so_path), name+"_*") #very dangerous with --inplace ? yes, indeed, trying to eat my files ;)
-    junkstuff = glob.glob(junkpath)
-    for path in junkstuff:
-        if path != so_path:
-            try:
-                os.remove(path)
-            except IOError:
-                _info("Couldn't remove %s", path)
 
+    if os.path.abspath(so_path) != old_so_path or _stat(so_path) != old_so_stat:
+        # only a new build can leave junk behind
+        junkpath = os.path.join(os.path.dirname(so_path), name+"_*") #very dangerous with --inplace ? yes, indeed, trying to eat my files ;)
+        junkstuff = glob.glob(junkpath)
+        for path in junkstuff:
+            if path != so_path:
+                try:
+                    os.remove(path)
+                except IOError:
+                    _info("Couldn't remove %s", path)
+
+    _dependency_cache.add_module(pyxfilename, so_path)
+    _dependency_cache.save()
     return so_path
 
 
+class ParallelBuilder(object):
+    """Builds the .pyx modules of a package in a number of processes.
+
+    When the first .pyx module of a package directory is imported, the
+    other .pyx modules next to it that are not known to be up to date
+    are distributed over the build processes as well.  They are built in
+    the background while the program continues, and their import only
+    waits for their own build.
+
+    The processes are started from the importing thread and report back
+    through pipes.  Helper threads cannot be used here, as they would
+    deadlock on the import lock of Python 2.
+    """
+    def __init__(self, processes):
+        self.processes = processes
+        self._directories = set()
+        self._processes = {}  # pyxfilename -> _BuildProcess
+        self._all_processes = []
+
+    def close(self):
+        for process in self._all_processes:
+            process.close()
+        self._all_processes = []
+        self._processes.clear()
+
+    def build_module(self, name, pyxfilename, pyxbuild_dir=None, inplace=False, language_level=None):
+        directory = os.path.dirname(pyxfilename)
+        if directory not in self._directories:
+            self._directories.add(directory)
+            if _can_fork_build_processes():
+                try:
+                    self._submit_package(name, pyxfilename, pyxbuild_dir, inplace, language_level)
+                except Exception:
+                    # no usable multiprocessing, build one by one
+                    _debug("Parallel build of %s failed, building modules sequentially", directory)
+        process = self._processes.pop(pyxfilename, None)
+        if process is None:
+            return build_module(name, pyxfilename, pyxbuild_dir, inplace, language_level)
+        so_path = process.get_result(pyxfilename)
+        _dependency_cache.add_module(pyxfilename, so_path)
+        _dependency_cache.save()
+        return so_path
+
+    def _submit_package(self, name, pyxfilename, pyxbuild_dir, inplace, language_level):
+        package = name.rsplit('.', 1)[0]
+        directory = os.path.dirname(pyxfilename)
+        tasks = []
+        for filename in sorted(os.listdir(directory)):
+            module_name, ext = os.path.splitext(filename)
+            if ext != PYX_EXT or module_name == '__init__':
+                continue
+            path = os.path.join(directory, filename)
+            full_name = package + '.' + module_name
+            if full_name in sys.modules or _dependency_cache.is_up_to_date(path):
+                continue
+            _debug("Building %s in the background", full_name)
+            tasks.append((full_name, path, pyxbuild_dir, inplace, language_level))
+            # let the build processes inherit the dependencies
+            _dependency_cache.get_dependencies(path)
+        _dependency_cache.save()
+        if not tasks:
+            return
+
+        if not self._all_processes:
+            import atexit
+            # do not kill running builds at exit, that might leave broken modules behind
+            atexit.register(self.close)
+        processes = min(self.processes, len(tasks))
+        for i in range(processes):
+            process = _BuildProcess(tasks[i::processes])
+            self._all_processes.append(process)
+            for task in tasks[i::processes]:
+                self._processes[task[1]] = process
+
+
+def _can_fork_build_processes():
+    """Build processes are only started if they can be forked from the
+    importing process.  Other start methods would re-import the main
+    module in the children, and daemonic processes (e.g. the workers of a
+    multiprocessing pool) cannot have children at all.
+    """
+    try:
+        import multiprocessing
+    except ImportError:
+        return False
+    if multiprocessing.current_process().daemon:
+        return False
+    if hasattr(multiprocessing, 'get_start_method'):
+        method = multiprocessing.get_start_method(allow_none=True)
+        if method is None:
+            # not set yet, the first one is the default
+            method = multiprocessing.get_all_start_methods()[0]
+        return method == 'fork'
+    return sys.platform != 'win32'  # Py<3.4 always forks on POSIX
+
+
+class _BuildProcess(object):
+    def __init__(self, tasks):
+        import multiprocessing
+        self._connection, child_connection = multiprocessing.Pipe(False)
+        self._results = {}
+        self._process = multiprocessing.Process(
+            target=_build_modules, args=(pyxargs, tasks, child_connection))
+        self._process.start()
+        child_connection.close()
+
+    def _receive(self):
+        pyxfilename, so_path, exc = self._connection.recv()
+        self._results[pyxfilename] = so_path, exc
+
+    def get_result(self, pyxfilename):
+        while pyxfilename not in self._results:
+            self._receive()
+        so_path, exc = self._results.pop(pyxfilename)
+        if exc is not None:
+            raise exc
+        return so_path
+
+    def close(self):
+        try:
+            while True:
+                self._receive()
+        except EOFError:
+            pass
+        self._connection.close()
+        self._process.join()
+
+
+def _build_modules(args, tasks, connection):
+    global pyxargs
+    pyxargs = args
+    # the importing process maintains the cache
+    _dependency_cache.path = None
+    for name, pyxfilename, pyxbuild_dir, inplace, language_level in tasks:
+        try:
+            so_path, exc = build_module(name, pyxfilename, pyxbuild_dir, inplace, language_level), None
+        except Exception:
+            so_path, exc = None, sys.exc_info()[1]
+        try:
+            connection.send((pyxfilename, so_path, exc))
+        except Exception:
+            # exception cannot be pickled
+            connection.send((pyxfilename, None, ImportError(str(exc))))
+    connection.close()
+
+_parallel_builder = None
+
+
 def load_module(name, pyxfilename, pyxbuild_dir=None, is_package=False,
                 build_inplace=False, language_level=None, so_path=None):
     try:
@@ -212,8 +482,14 @@ def load_module(name, pyxfilename, pyxbuild_dir=None, is_package=False,
                 module_name = name + '.__init__'
             else:
                 module_name = name
-            so_path = build_module(module_name, pyxfilename, pyxbuild_dir,
-                                   inplace=build_inplace, language_level=language_level)
+            if (_parallel_builder is not None and not is_package and '.' in name
+                    and pyxfilename.endswith(PYX_EXT)):
+                so_path = _parallel_builder.build_module(
+                    module_name, pyxfilename, pyxbuild_dir,
+                    inplace=build_inplace, language_level=language_level)
+            else:
+                so_path = build_module(module_name, pyxfilename, pyxbuild_dir,
+                                       inplace=build_inplace, language_level=language_level)
         mod = imp.load_dynamic(name, so_path)
         if is_package and not hasattr(mod, '__path__'):
             mod.__path__ = [os.path.dirname(so_path)]
@@ -471,7 +747,7 @@ def _have_importers():
 def install(pyximport=True, pyimport=False, build_dir=None, build_in_temp=True,
             setup_args=None, reload_support=False,
             load_py_module_on_import_failure=False, inplace=False,
-            language_level=None):
+            language_level=None, parallel=0):
     """Main entry point. Call this to install the .pyx import hook in
     your meta-path for a single Python process.  If you want it to be
     installed whenever you use Python, add it to your sitecustomize
@@ -515,6 +791,10 @@ def install(pyximport=True, pyimport=False, build_dir=None, build_in_temp=True,
     ``language_level``: The source language level to use: 2 or 3.
     The default is to use the language level of the current Python
     runtime for .py files and Py2 for .pyx files.
+
+    ``parallel``: When the first .pyx module of a package is imported,
+    build all other out of date .pyx modules of the package in the
+    background, using this number of processes.
     """
     if setup_args is None:
         setup_args = {}
@@ -529,6 +809,10 @@ def install(pyximport=True, pyimport=False, build_dir=None, build_in_temp=True,
     pyxargs.reload_support = reload_support
     pyxargs.load_py_module_on_import_failure = load_py_module_on_import_failure
 
+    global _dependency_cache, _parallel_builder
+    _dependency_cache = DependencyCache(os.path.join(build_dir, 'pyxdep.cache'))
+    _parallel_builder = ParallelBuilder(parallel) if parallel else None
+
     has_py_importer, has_pyx_importer = _have_importers()
     py_importer, pyx_importer = None, None
 
@@ -57,9 +57,9 @@ pxd_include_patterns = [
 
 setup_args['package_data'] = {
     'Cython.Plex'     : ['*.pxd'],
-    'Cython.Compiler' : ['*.pxd'],
+    'Cython.Compiler' : ['*.pxd', 'Lexicon.pickle'],
     'Cython.Runtime'  : ['*.pyx', '*.pxd'],
-    'Cython.Utility'  : ['*.pyx', '*.pxd', '*.c', '*.h', '*.cpp'],
+    'Cython.Utility'  : ['*.pyx', '*.pxd', '*.c', '*.h', '*.cpp', 'Utilities.pickle'],
     'Cython'          : [ p[7:] for p in pxd_include_patterns ],
     }
 
@@ -107,6 +107,11 @@ def compile_cython_modules(profile=False, compile_more=False, cython_with_refnan
         "Cython.Compiler.Visitor",
         "Cython.Compiler.FlowControl",
         "Cython.Compiler.Code",
+        "Cython.Compiler.ParseTreeTransforms",
+        "Cython.Compiler.Nodes",
+        "Cython.Compiler.ExprNodes",
+        "Cython.Compiler.ModuleNode",
+        "Cython.Compiler.Optimize",
         "Cython.Runtime.refnanny",
         # "Cython.Compiler.FusedNode",
         "Cython.Tempita._tempita",
@@ -114,11 +119,6 @@ def compile_cython_modules(profile=False, compile_more=False, cython_with_refnan
     if compile_more:
         compiled_modules.extend([
             "Cython.Build.Dependencies",
-            "Cython.Compiler.ParseTreeTransforms",
-            "Cython.Compiler.Nodes",
-            "Cython.Compiler.ExprNodes",
-            "Cython.Compiler.ModuleNode",
-            "Cython.Compiler.Optimize",
             ])
 
     from distutils.spawn import find_executable
@@ -224,6 +224,26 @@ def _defer_cython_import_in_py32(source_root, profile=False):
     return build_ext
 
 
+def generate_lexicon_tables():
+    # Pre-generate the state tables of the Cython scanner, so that the
+    # compiler does not have to build them at runtime.
+    from Cython.Compiler import Lexicon
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'Cython', 'Compiler', Lexicon.lexicon_file_name)
+    if Lexicon.load_lexicon(path, Lexicon.lexicon_key()) is None:
+        Lexicon.save_lexicon(Lexicon.make_lexicon(), path)
+
+
+def generate_utility_bundle():
+    # Pre-parse the utility code files and their Tempita templates.
+    from Cython.Compiler import Code
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'Cython', 'Utility', Code.utility_bundle_file_name)
+    key = Code.utility_bundle_key()
+    if Code.load_utility_bundle(path, key) is None:
+        Code.save_utility_bundle(Code.build_utility_bundle(), path, key)
+
+
 cython_profile = '--cython-profile' in sys.argv
 if cython_profile:
     sys.argv.remove('--cython-profile')
@@ -249,6 +269,27 @@ except ValueError:
 if compile_cython_itself and (is_cpython or cython_compile_more):
     compile_cython_modules(cython_profile, cython_compile_more, cython_with_refnanny)
 
+if sys.version_info[:2] != (3, 2):
+    # Py3.2 installs sources converted by 2to3, which would not match the tables
+    try:
+        from setuptools.command.build_py import build_py as build_py_orig
+    except ImportError:
+        from distutils.command.build_py import build_py as build_py_orig
+
+    class build_py(build_py_orig):
+        def run(self):
+            # generate the data files before they are collected as package data
+            generate_lexicon_tables()
+            generate_utility_bundle()
+            data_files = self.get_data_files()
+            if data_files is None:
+                # setuptools collects the package data lazily
+                data_files = self._get_data_files()
+            self.data_files = data_files
+            build_py_orig.run(self)
+
+    add_command_class("build_py", build_py)
+
 setup_args.update(setuptools_extra_args)
 
 from Cython import __version__ as version
@@ -0,0 +1,159 @@
+# mode: run
+# tag: getattr
+# cython: optimize.attribute_cache=True
+
+
+class PyClass(object):
+    scale = 2
+
+    def __init__(self):
+        self.x = 1
+
+    def meth(self, a):
+        return self.x + a
+
+    def meth0(self):
+        return self.x
+
+    def meth2(self, a, b):
+        return self.x + a + b
+
+    @property
+    def prop(self):
+        return self.x * 10
+
+
+class SubClass(PyClass):
+    def meth(self, a):
+        return -a
+
+
+class Slotted(object):
+    __slots__ = ('x',)
+
+    def __init__(self):
+        self.x = 5
+
+    def meth(self, a):
+        return a * 2
+
+
+class WithGetattr(object):
+    def __getattr__(self, name):
+        return name
+
+
+cdef class CdefClass:
+    cdef public int x
+
+    def __init__(self):
+        self.x = 7
+
+    def meth(self, a):
+        return a + 100
+
+
+def call_meth(obj, a):
+    return obj.meth(a)
+
+
+def call_meth0(obj):
+    return obj.meth0()
+
+
+def call_meth2(obj, a, b):
+    return obj.meth2(a, b)
+
+
+def get_x(obj):
+    return obj.x
+
+
+def get_prop(obj):
+    return obj.prop
+
+
+def get_scale(obj):
+    return obj.scale
+
+
+def get_anything(obj):
+    return obj.anything
+
+
+def test_lookups():
+    """
+    >>> test_lookups()
+    """
+    obj, sub, slotted, cdef_obj = PyClass(), SubClass(), Slotted(), CdefClass()
+    for _ in range(3):
+        assert call_meth(obj, 1) == 2
+        assert call_meth(sub, 1) == -1
+        assert call_meth(slotted, 1) == 2
+        assert call_meth(cdef_obj, 1) == 101
+        assert call_meth0(obj) == 1
+        assert call_meth2(obj, 1, 2) == 4
+        assert get_x(obj) == 1
+        assert get_x(slotted) == 5
+        assert get_x(cdef_obj) == 7
+        assert get_prop(obj) == 10
+        assert get_scale(obj) == 2
+        assert get_anything(WithGetattr()) == 'anything'
+
+
+def test_missing_attribute():
+    """
+    >>> test_missing_attribute()
+    Traceback (most recent call last):
+    AttributeError: 'object' object has no attribute 'x'
+    """
+    get_x(PyClass())
+    get_x(object())
+
+
+def test_instance_dict_shadowing():
+    """
+    >>> test_instance_dict_shadowing()
+    """
+    obj = PyClass()
+    assert call_meth(obj, 1) == 2
+    obj.meth = lambda a: 'shadowed'
+    assert call_meth(obj, 1) == 'shadowed'
+    del obj.meth
+    assert call_meth(obj, 1) == 2
+
+    assert get_scale(obj) == 2
+    obj.scale = 4
+    assert get_scale(obj) == 4
+
+
+def test_type_changes():
+    """
+    >>> test_type_changes()
+    """
+    class Changing(object):
+        value = 1
+
+        def meth(self, a):
+            return a
+
+    obj = Changing()
+    assert call_meth(obj, 1) == 1
+    assert get_x(type('X', (object,), {'x': 0})()) == 0
+    Changing.meth = lambda self, a: 'patched'
+    assert call_meth(obj, 1) == 'patched'
+    Changing.x = property(lambda self: 'property')
+    assert get_x(obj) == 'property'
+    Changing.x = 'class attribute'
+    assert get_x(obj) == 'class attribute'
+
+
+def test_megamorphic():
+    """
+    >>> test_megamorphic()
+    """
+    classes = [type('T%d' % i, (object,), {'meth': lambda self, a, i=i: i + a})
+               for i in range(40)]
+    for _ in range(3):
+        for i, cls in enumerate(classes):
+            assert call_meth(cls(), 1) == i + 1
@@ -0,0 +1,144 @@
+# mode: run
+# tag: fastcall
+# cython: fastcall=True
+
+cimport cython
+
+
+def add(a, b=2, *, c=3):
+    """
+    >>> add(1)
+    6
+    >>> add(1, 1)
+    5
+    >>> add(1, b=1, c=1)
+    3
+    >>> add(a=1, c=0)
+    3
+    >>> add(**{'a': 1, 'b': 0})
+    4
+    >>> add()
+    Traceback (most recent call last):
+    TypeError: add() takes at least 1 positional argument (0 given)
+    >>> add(1, 2, 3)
+    Traceback (most recent call last):
+    TypeError: add() takes at most 2 positional arguments (3 given)
+    >>> add(1, d=1)
+    Traceback (most recent call last):
+    TypeError: add() got an unexpected keyword argument 'd'
+    >>> add(1, a=1)
+    Traceback (most recent call last):
+    TypeError: add() got multiple values for keyword argument 'a'
+    """
+    return a + b + c
+
+
+def typed(int x, double y, z=None):
+    """
+    >>> typed(1, 2)
+    (1, 2.0, None)
+    >>> typed(1, y=2, z=3)
+    (1, 2.0, 3)
+    >>> typed('x', 2)  # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+    TypeError: ...
+    """
+    return (x, y, z)
+
+
+def kwonly(a, *, b, c=5, d=6):
+    """
+    >>> kwonly(1, b=2)
+    (1, 2, 5, 6)
+    >>> kwonly(1, d=0, b=2)
+    (1, 2, 5, 0)
+    >>> kwonly(1)
+    Traceback (most recent call last):
+    TypeError: kwonly() needs keyword-only argument b
+    """
+    return (a, b, c, d)
+
+
+def star(a, *args, **kwargs):
+    """
+    >>> star(1, 2, x=3)
+    (1, (2,), {'x': 3})
+    """
+    return (a, args, kwargs)
+
+
+@cython.fastcall(False)
+def not_fastcall(a, b=2):
+    """
+    >>> not_fastcall(1, b=3)
+    (1, 3)
+    """
+    return (a, b)
+
+
+@cython.binding(True)
+def binding_add(a, b=2):
+    """
+    >>> binding_add(1)
+    3
+    >>> binding_add(1, b=3)
+    4
+    >>> binding_add(b=3, a=2)
+    5
+    >>> binding_add(1, 2, 3)
+    Traceback (most recent call last):
+    TypeError: binding_add() takes at most 2 positional arguments (3 given)
+    """
+    return a + b
+
+
+cdef class C:
+    """
+    >>> c = C()
+    >>> c.meth(1)
+    (1, 1)
+    >>> C.meth(c, 2, b=3)
+    (2, 3)
+    >>> c.meth(b=4, a=5)
+    (5, 4)
+    >>> c.cp(1, 2)
+    3
+    >>> c.cp(x=1, y=3)
+    4
+    >>> C.cm(1, b=2)
+    (2, 1)
+    """
+    def meth(self, a, b=1):
+        return (a, b)
+
+    cpdef cp(self, x, y):
+        return x + y
+
+    @classmethod
+    def cm(cls, a, b=0):
+        assert cls is C
+        return (b, a)
+
+
+@cython.binding(True)
+cdef class BindingC:
+    """
+    >>> c = BindingC()
+    >>> c.meth(1)
+    (1, 1)
+    >>> BindingC.meth(c, 2, b=3)
+    (2, 3)
+    >>> c.meth(b=4, a=5)
+    (5, 4)
+    """
+    def meth(self, a, b=1):
+        return (a, b)
+
+
+class PyClass(object):
+    """
+    >>> PyClass().meth(1, b=5)
+    (1, 5)
+    """
+    def meth(self, a, b=1):
+        return (a, b)
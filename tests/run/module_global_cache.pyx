@@ -0,0 +1,88 @@
+# mode: run
+# tag: globals
+
+import sys
+if sys.version_info[0] >= 3:
+    import builtins
+else:
+    import __builtin__ as builtins
+
+CONST = 3
+some_name = None
+del some_name
+
+
+def read_const():
+    """
+    >>> read_const()
+    3
+    """
+    return CONST
+
+
+def read_some_name():
+    return some_name
+
+
+def loop_sum(n):
+    """
+    >>> loop_sum(5)
+    15
+    """
+    s = 0
+    for i in range(n):
+        s += CONST
+    return s
+
+
+def test_global_changes():
+    """
+    >>> test_global_changes()
+    """
+    global CONST
+    assert read_const() == 3
+    CONST = 5
+    assert read_const() == 5
+    assert loop_sum(2) == 10
+    del CONST
+    try:
+        read_const()
+    except NameError:
+        pass
+    else:
+        assert False, "NameError not raised"
+    CONST = 3
+    assert read_const() == 3
+
+
+def test_builtin_changes():
+    """
+    >>> test_builtin_changes()
+    """
+    global some_name
+    for _ in range(2):
+        try:
+            read_some_name()
+        except NameError:
+            pass
+        else:
+            assert False, "NameError not raised"
+
+    builtins.some_name = 'builtin'
+    try:
+        assert read_some_name() == 'builtin'
+        some_name = 'global'
+        assert read_some_name() == 'global'
+        del some_name
+        assert read_some_name() == 'builtin'
+        builtins.some_name = 'changed'
+        assert read_some_name() == 'changed'
+    finally:
+        del builtins.some_name
+
+    try:
+        read_some_name()
+    except NameError:
+        pass
+    else:
+        assert False, "NameError not raised"